@@ -24,6 +24,7 @@ contract AaveAStETHIncentivesController is IAaveIncentivesController, IStakingRe
     error RewardsPeriodNotFinishedError();
     error AlreadyInitializedError();
     error StakingTokenIsNotContractError();
+    error ClaimForNotAllowedError(address depositor);
 
     event RewardsDistributorChanged(
         address indexed oldRewardsDistributor,
@@ -35,6 +36,12 @@ contract AaveAStETHIncentivesController is IAaveIncentivesController, IStakingRe
     event Recovered(address indexed token, uint256 amount);
     event RewardsAccrued(address indexed depositor, uint256 earnedRewards);
     event Initialized(address indexed stakingToken);
+    event ClaimOperatorChanged(address indexed operator, bool isAuthorized);
+    event ClaimForAllowanceChanged(address indexed depositor, bool isAllowed);
+    event RewardsPaid(address indexed caller, uint256 depositorsCount, uint256 totalReward);
+
+    /// @dev Number of values returned by depositorsRewardsInfo() for each depositor
+    uint256 private constant DEPOSITOR_REWARDS_INFO_SIZE = 5;
 
     IERC20 public immutable REWARD_TOKEN;
 
@@ -42,6 +49,8 @@ contract AaveAStETHIncentivesController is IAaveIncentivesController, IStakingRe
     address public rewardsDistributor;
     uint256 public rewardsDuration;
     RewardsUtils.RewardsState internal rewardsState;
+    mapping(address => bool) public isClaimOperator;
+    mapping(address => bool) public isClaimForAllowed;
 
     constructor(
         address _rewardToken,
@@ -109,6 +118,53 @@ contract AaveAStETHIncentivesController is IAaveIncentivesController, IStakingRe
         }
     }
 
+    /// @notice Transfers all earned tokens to each of the given depositors and resets their rewards.
+    ///     Might be called by the authorized claim operator or for the depositors who allowed it
+    /// @dev Emits single RewardsPaid event with the number of the depositors and the total reward
+    ///     instead of RewardPaid event for each depositor
+    /// @param depositors Addresses of the depositors to pay rewards to
+    function claimRewardsFor(address[] calldata depositors) external {
+        bool isOperator = isClaimOperator[msg.sender];
+        uint256 totalStaked = stakingToken.internalTotalSupply();
+        uint256 totalReward = 0;
+        for (uint256 i = 0; i < depositors.length; ++i) {
+            address depositor = depositors[i];
+            if (!isOperator && !isClaimForAllowed[depositor]) {
+                revert ClaimForNotAllowedError(depositor);
+            }
+            (uint256 stakedByDepositor, ) = stakingToken.getInternalUserBalanceAndSupply(
+                depositor
+            );
+            uint256 reward = rewardsState.payDepositorReward(
+                totalStaked,
+                depositor,
+                stakedByDepositor
+            );
+            if (reward > 0) {
+                REWARD_TOKEN.safeTransfer(depositor, reward);
+                totalReward += reward;
+            }
+        }
+        emit RewardsPaid(msg.sender, depositors.length, totalReward);
+    }
+
+    /// @notice Allows or forbids anyone to claim rewards of the caller via claimRewardsFor
+    function setClaimForAllowed(bool isAllowed) external {
+        if (isClaimForAllowed[msg.sender] != isAllowed) {
+            isClaimForAllowed[msg.sender] = isAllowed;
+            emit ClaimForAllowanceChanged(msg.sender, isAllowed);
+        }
+    }
+
+    /// @notice Authorizes or deauthorizes the operator to claim rewards of any depositor
+    ///     via claimRewardsFor. Might be called only by the owner
+    function setClaimOperator(address operator, bool isAuthorized) external onlyOwner {
+        if (isClaimOperator[operator] != isAuthorized) {
+            isClaimOperator[operator] = isAuthorized;
+            emit ClaimOperatorChanged(operator, isAuthorized);
+        }
+    }
+
     /// @notice Starts reward period to distribute given amount of tokens from the current timestamp
     ///     during rewards duration. If the previous reward period hasn't finished, adds the given
     ///     reward to the previous reward. Might be called only by rewards distributor
@@ -164,6 +220,36 @@ contract AaveAStETHIncentivesController is IAaveIncentivesController, IStakingRe
         return rewardsState.earnedReward(totalStaked, depositor, staked);
     }
 
+    /// @notice Returns rewards data of the given depositors in a single call
+    /// @dev rewardPerToken() is computed once for all depositors. The result is the flat array
+    ///     [periodFinish, rewardPerSecond] followed by the columns of earned reward, staked amount,
+    ///     paidReward, upcomingReward and accumulatedRewardPerTokenPaid values. Each column has
+    ///     the length of depositors array and keeps values in the same order
+    /// @param depositors Addresses of the depositors
+    function depositorsRewardsInfo(address[] calldata depositors)
+        external
+        view
+        returns (uint256[] memory info)
+    {
+        uint256 depositorsCount = depositors.length;
+        info = new uint256[](2 + DEPOSITOR_REWARDS_INFO_SIZE * depositorsCount);
+        info[0] = rewardsState.endDate;
+        info[1] = rewardsState.rewardPerSecond;
+
+        uint256 currentRewardPerToken = rewardsState.rewardPerToken(
+            stakingToken.internalTotalSupply()
+        );
+        for (uint256 i = 0; i < depositorsCount; ++i) {
+            (uint256 staked, ) = stakingToken.getInternalUserBalanceAndSupply(depositors[i]);
+            RewardsUtils.Reward storage depositorReward = rewardsState.rewards[depositors[i]];
+            info[2 + i] = RewardsUtils.earnedReward(depositorReward, staked, currentRewardPerToken);
+            info[2 + depositorsCount + i] = staked;
+            info[2 + 2 * depositorsCount + i] = depositorReward.paidReward;
+            info[2 + 3 * depositorsCount + i] = depositorReward.upcomingReward;
+            info[2 + 4 * depositorsCount + i] = depositorReward.accumulatedRewardPerTokenPaid;
+        }
+    }
+
     /// @notice Returns end date of the reward period
     function periodFinish() external view returns (uint256) {
         return rewardsState.endDate;
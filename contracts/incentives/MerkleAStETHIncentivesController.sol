@@ -0,0 +1,216 @@
+// SPDX-FileCopyrightText: 2021 Lido <info@lido.fi>
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+import {IERC20} from "../dependencies/openzeppelin/IERC20.sol";
+import {Address} from "../dependencies/openzeppelin/Address.sol";
+import {Ownable} from "../dependencies/openzeppelin/Ownable.sol";
+import {SafeERC20} from "../dependencies/openzeppelin/SafeERC20.sol";
+import {MerkleProof} from "../dependencies/openzeppelin/MerkleProof.sol";
+import {RewardsUtils} from "../utils/RewardsUtils.sol";
+
+import {IAStETH} from "../interfaces/IAStETH.sol";
+import {IStakingRewards} from "../interfaces/IStakingRewards.sol";
+import {IAaveIncentivesController} from "../interfaces/IAaveIncentivesController.sol";
+
+/// @author psirex
+/// @notice Implementation for the IAaveIncentivesController which settles rewards off-chain.
+///     handleAction() does nothing, so the transfers of the staking token don't pay for
+///     the rewards accounting. Rewards are distributed with the same linear emission as in
+///     AaveAStETHIncentivesController, computed off-chain from the events of the staking
+///     token and the controller, and published in epochs as the Merkle root of the
+///     cumulative rewards of the depositors. Depositors claim the not yet claimed part
+///     of the cumulative reward with the Merkle proof.
+contract MerkleAStETHIncentivesController is IAaveIncentivesController, IStakingRewards, Ownable {
+    using RewardsUtils for RewardsUtils.RewardsState;
+    using SafeERC20 for IERC20;
+
+    error NotRewardsDistributorError();
+    error NotMerkleRootUpdaterError();
+    error RewardsPeriodNotFinishedError();
+    error AlreadyInitializedError();
+    error StakingTokenIsNotContractError();
+    error InvalidProofError();
+
+    event RewardsDistributorChanged(
+        address indexed oldRewardsDistributor,
+        address indexed newRewardsDistributor
+    );
+    event MerkleRootUpdaterChanged(
+        address indexed oldMerkleRootUpdater,
+        address indexed newMerkleRootUpdater
+    );
+    event RewardAdded(uint256 rewardAmount);
+    event RewardsDurationUpdated(uint256 newDuration);
+    event Recovered(address indexed token, uint256 amount);
+    event Initialized(address indexed stakingToken);
+    event MerkleRootUpdated(uint256 indexed epoch, bytes32 merkleRoot, uint256 settledAt);
+    event RewardClaimed(address indexed depositor, uint256 reward, uint256 cumulativeReward);
+
+    IERC20 public immutable REWARD_TOKEN;
+
+    IAStETH public stakingToken;
+    address public rewardsDistributor;
+    address public merkleRootUpdater;
+    uint256 public rewardsDuration;
+    RewardsUtils.RewardsState internal rewardsState;
+
+    /// @notice Number of the last published epoch
+    uint256 public epoch;
+    /// @notice Root of the Merkle tree of (depositor, cumulative reward) leaves
+    bytes32 public merkleRoot;
+    /// @notice Cumulative reward claimed by the depositor
+    mapping(address => uint256) public claimed;
+
+    constructor(
+        address _rewardToken,
+        uint256 _rewardsDuration,
+        address _rewardsDistributor,
+        address _merkleRootUpdater
+    ) {
+        REWARD_TOKEN = IERC20(_rewardToken);
+        _setRewardsDuration(_rewardsDuration);
+        _setRewardsDistributor(_rewardsDistributor);
+        _setMerkleRootUpdater(_merkleRootUpdater);
+    }
+
+    /// @notice Sets stakingToken variable if it wasn't set earlier
+    function initialize(address _stakingToken) external onlyOwner {
+        if (address(stakingToken) != address(0)) {
+            revert AlreadyInitializedError();
+        }
+        if (!Address.isContract(_stakingToken)) {
+            revert StakingTokenIsNotContractError();
+        }
+        stakingToken = IAStETH(_stakingToken);
+        emit Initialized(_stakingToken);
+    }
+
+    /// @notice Does nothing. Rewards of the depositors are computed off-chain
+    function handleAction(
+        address,
+        uint256,
+        uint256
+    ) external override {}
+
+    /// @notice Sets the value of rewards distributor. Might be called only by the owner
+    function setRewardsDistributor(address newRewardsDistributor) external onlyOwner {
+        _setRewardsDistributor(newRewardsDistributor);
+    }
+
+    /// @notice Sets the address allowed to publish Merkle roots. Might be called only by the owner
+    function setMerkleRootUpdater(address newMerkleRootUpdater) external onlyOwner {
+        _setMerkleRootUpdater(newMerkleRootUpdater);
+    }
+
+    /// @notice Sets the value of rewards duration. Might be called only by the owner
+    function setRewardsDuration(uint256 newRewardsDuration) external onlyOwner {
+        _setRewardsDuration(newRewardsDuration);
+    }
+
+    /// @notice Publishes the Merkle root of the cumulative rewards of the next epoch.
+    ///     Might be called only by the Merkle root updater
+    /// @param newMerkleRoot Root of the tree of keccak256(depositor, cumulativeReward) leaves
+    /// @param settledAt Timestamp at which the cumulative rewards were computed
+    function setMerkleRoot(bytes32 newMerkleRoot, uint256 settledAt) external {
+        if (msg.sender != merkleRootUpdater) {
+            revert NotMerkleRootUpdaterError();
+        }
+        merkleRoot = newMerkleRoot;
+        emit MerkleRootUpdated(++epoch, newMerkleRoot, settledAt);
+    }
+
+    /// @notice Transfers the not yet claimed part of the cumulative reward to the depositor.
+    ///     Might be called by anyone
+    /// @param depositor Address of the depositor
+    /// @param cumulativeReward Cumulative reward of the depositor in the current epoch
+    /// @param proof Merkle proof of the (depositor, cumulativeReward) leaf
+    function claim(
+        address depositor,
+        uint256 cumulativeReward,
+        bytes32[] calldata proof
+    ) external {
+        bytes32 leaf = keccak256(abi.encodePacked(depositor, cumulativeReward));
+        if (!MerkleProof.verify(proof, merkleRoot, leaf)) {
+            revert InvalidProofError();
+        }
+        uint256 reward = cumulativeReward - claimed[depositor];
+        if (reward > 0) {
+            claimed[depositor] = cumulativeReward;
+            REWARD_TOKEN.safeTransfer(depositor, reward);
+            emit RewardClaimed(depositor, reward, cumulativeReward);
+        }
+    }
+
+    /// @notice Starts reward period to distribute given amount of tokens from the current timestamp
+    ///     during rewards duration. If the previous reward period hasn't finished, adds the given
+    ///     reward to the previous reward. Might be called only by rewards distributor
+    /// @param reward Amount of tokens to distribute on reward period
+    /// @param rewardHolder Address to retrieve reward tokens from
+    function notifyRewardAmount(uint256 reward, address rewardHolder) external {
+        if (msg.sender != rewardsDistributor) {
+            revert NotRewardsDistributorError();
+        }
+        REWARD_TOKEN.safeTransferFrom(rewardHolder, address(this), reward);
+        uint256 _periodFinish = rewardsState.endDate;
+        uint256 _rewardsDuration = rewardsDuration;
+        uint256 _rewardPerSecond = 0;
+        if (block.timestamp >= _periodFinish) {
+            _rewardPerSecond = reward / _rewardsDuration;
+        } else {
+            uint256 remaining = _periodFinish - block.timestamp;
+            uint256 leftover = remaining * rewardsState.rewardPerSecond;
+            _rewardPerSecond = (reward + leftover) / _rewardsDuration;
+        }
+        uint256 totalStaked = stakingToken.internalTotalSupply();
+        rewardsState.updateRewardPeriod(
+            totalStaked,
+            _rewardPerSecond,
+            block.timestamp + _rewardsDuration
+        );
+        emit RewardAdded(reward);
+    }
+
+    /// @notice Allows recovering ERC20 tokens from incentives controller to the owner address.
+    ///     Might be called only by the owner
+    /// @param tokenAddress Address of ERC20 token to recover
+    /// @param tokenAmount Number of tokens to recover
+    function recoverERC20(address tokenAddress, uint256 tokenAmount) external onlyOwner {
+        IERC20(tokenAddress).safeTransfer(owner(), tokenAmount);
+        emit Recovered(tokenAddress, tokenAmount);
+    }
+
+    /// @notice Returns end date of the reward period
+    function periodFinish() external view returns (uint256) {
+        return rewardsState.endDate;
+    }
+
+    /// @notice Returns current reward per second
+    function rewardPerSecond() external view returns (uint256) {
+        return rewardsState.rewardPerSecond;
+    }
+
+    function _setRewardsDistributor(address newRewardsDistributor) internal {
+        address oldRewardsDistributor = rewardsDistributor;
+        if (oldRewardsDistributor != newRewardsDistributor) {
+            rewardsDistributor = newRewardsDistributor;
+            emit RewardsDistributorChanged(oldRewardsDistributor, newRewardsDistributor);
+        }
+    }
+
+    function _setMerkleRootUpdater(address newMerkleRootUpdater) internal {
+        address oldMerkleRootUpdater = merkleRootUpdater;
+        if (oldMerkleRootUpdater != newMerkleRootUpdater) {
+            merkleRootUpdater = newMerkleRootUpdater;
+            emit MerkleRootUpdaterChanged(oldMerkleRootUpdater, newMerkleRootUpdater);
+        }
+    }
+
+    function _setRewardsDuration(uint256 _rewardsDuration) internal {
+        if (block.timestamp <= rewardsState.endDate) {
+            revert RewardsPeriodNotFinishedError();
+        }
+        rewardsDuration = _rewardsDuration;
+        emit RewardsDurationUpdated(_rewardsDuration);
+    }
+}
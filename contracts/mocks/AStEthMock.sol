@@ -6,16 +6,38 @@ import {IAStETH} from "../interfaces/IAStETH.sol";
 import {IAaveIncentivesController} from "../interfaces/IAaveIncentivesController.sol";
 
 /// @author psirex
-/// @notice Mock of AStETH for testing purposes
+/// @notice Mock of AStETH for testing purposes. Like in AStETH, balances are kept in the
+///     internal units and the amounts of mint(), burn(), transfer() and Transfer event are
+///     converted to them by the rebasing index
 contract AStEthMock is IAStETH {
+    event Transfer(address indexed from, address indexed to, uint256 value);
+
+    uint256 private constant RAY = 1e27;
+
     uint256 public totalSupply;
     mapping(address => uint256) public balances;
     address public incentivesController;
+    /// @notice Ratio of the external amount to the internal one in rays
+    uint256 public index = RAY;
 
     function setIncentivesController(address _incentivesController) external {
         incentivesController = _incentivesController;
     }
 
+    /// @notice Sets the rebasing index. Internal balances stay unchanged
+    function setIndex(uint256 _index) external {
+        index = _index;
+    }
+
+    /// @notice Sets balances without triggering the incentives controller.
+    ///     Used to seed large amount of holders in benchmarks
+    function setBalances(address[] calldata users, uint256[] calldata amounts) external {
+        for (uint256 i = 0; i < users.length; ++i) {
+            totalSupply = totalSupply - balances[users[i]] + amounts[i];
+            balances[users[i]] = amounts[i];
+        }
+    }
+
     function getInternalUserBalanceAndSupply(address user)
         external
         view
@@ -30,6 +52,7 @@ contract AStEthMock is IAStETH {
     }
 
     function mint(address user, uint256 amount) external {
+        uint256 internalAmount = _toInternal(amount);
         uint256 oldBalance = balances[user];
         uint256 oldTotalSupply = totalSupply;
         IAaveIncentivesController(incentivesController).handleAction(
@@ -37,11 +60,13 @@ contract AStEthMock is IAStETH {
             oldTotalSupply,
             oldBalance
         );
-        balances[user] += amount;
-        totalSupply += amount;
+        balances[user] += internalAmount;
+        totalSupply += internalAmount;
+        emit Transfer(address(0), user, amount);
     }
 
     function burn(address user, uint256 amount) external {
+        uint256 internalAmount = _toInternal(amount);
         uint256 oldBalance = balances[user];
         uint256 oldTotalSupply = totalSupply;
         IAaveIncentivesController(incentivesController).handleAction(
@@ -49,7 +74,38 @@ contract AStEthMock is IAStETH {
             oldTotalSupply,
             oldBalance
         );
-        balances[user] -= amount;
-        totalSupply += amount;
+        balances[user] -= internalAmount;
+        totalSupply -= internalAmount;
+        emit Transfer(user, address(0), amount);
+    }
+
+    function transfer(
+        address from,
+        address to,
+        uint256 amount
+    ) external {
+        uint256 internalAmount = _toInternal(amount);
+        uint256 oldFromBalance = balances[from];
+        uint256 oldToBalance = balances[to];
+        uint256 oldTotalSupply = totalSupply;
+        IAaveIncentivesController(incentivesController).handleAction(
+            from,
+            oldTotalSupply,
+            oldFromBalance
+        );
+        if (from != to) {
+            IAaveIncentivesController(incentivesController).handleAction(
+                to,
+                oldTotalSupply,
+                oldToBalance
+            );
+        }
+        balances[from] -= internalAmount;
+        balances[to] += internalAmount;
+        emit Transfer(from, to, amount);
+    }
+
+    function _toInternal(uint256 amount) internal view returns (uint256) {
+        return (amount * RAY) / index;
     }
 }
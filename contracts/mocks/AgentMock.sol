@@ -0,0 +1,24 @@
+// SPDX-FileCopyrightText: 2021 Lido <info@lido.fi>
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+import {EVMScriptRunnerMock} from "./EVMScriptRunnerMock.sol";
+
+/// @author psirex
+/// @notice Stub of Lido's Aragon Agent for the local chain. Has no access control
+contract AgentMock is EVMScriptRunnerMock {
+    receive() external payable {}
+
+    function forward(bytes memory evmScript) external {
+        _runScript(evmScript);
+    }
+
+    function execute(
+        address target,
+        uint256 ethValue,
+        bytes memory data
+    ) external {
+        (bool success, ) = target.call{value: ethValue}(data);
+        require(success, "EXECUTION_FAILED");
+    }
+}
@@ -0,0 +1,40 @@
+// SPDX-FileCopyrightText: 2021 Lido <info@lido.fi>
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+/// @author psirex
+/// @notice Executes EVM scripts in the format of Aragon's CallsScript executor:
+///     4 bytes of spec id followed by the list of (address, uint32 calldata length, calldata)
+abstract contract EVMScriptRunnerMock {
+    uint256 private constant SPEC_ID_LENGTH = 4;
+    uint256 private constant ADDRESS_LENGTH = 20;
+    uint256 private constant CALLDATA_LENGTH_LENGTH = 4;
+
+    function _runScript(bytes memory script) internal {
+        uint256 location = SPEC_ID_LENGTH;
+        while (location < script.length) {
+            address target = address(uint160(_wordAt(script, location) >> 96));
+            location += ADDRESS_LENGTH;
+            uint256 calldataLength = _wordAt(script, location) >> 224;
+            location += CALLDATA_LENGTH_LENGTH;
+            bytes memory data = new bytes(calldataLength);
+            for (uint256 i = 0; i < calldataLength; ++i) {
+                data[i] = script[location + i];
+            }
+            location += calldataLength;
+
+            (bool success, bytes memory result) = target.call(data);
+            if (!success) {
+                assembly {
+                    revert(add(result, 32), mload(result))
+                }
+            }
+        }
+    }
+
+    function _wordAt(bytes memory data, uint256 location) private pure returns (uint256 word) {
+        assembly {
+            word := mload(add(add(data, 32), location))
+        }
+    }
+}
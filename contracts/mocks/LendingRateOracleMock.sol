@@ -0,0 +1,27 @@
+// SPDX-FileCopyrightText: 2021 Lido <info@lido.fi>
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+/// @author psirex
+/// @notice Mock of AAVE's lending rate oracle used by the interest rate strategy
+///     of the reserve deployed on the local chain
+contract LendingRateOracleMock {
+    mapping(address => uint256) internal borrowRates;
+    mapping(address => uint256) internal liquidityRates;
+
+    function getMarketBorrowRate(address asset) external view returns (uint256) {
+        return borrowRates[asset];
+    }
+
+    function setMarketBorrowRate(address asset, uint256 rate) external {
+        borrowRates[asset] = rate;
+    }
+
+    function getMarketLiquidityRate(address asset) external view returns (uint256) {
+        return liquidityRates[asset];
+    }
+
+    function setMarketLiquidityRate(address asset, uint256 rate) external {
+        liquidityRates[asset] = rate;
+    }
+}
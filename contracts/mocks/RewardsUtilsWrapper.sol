@@ -10,6 +10,28 @@ contract RewardsUtilsWrapper {
     using RewardsUtils for RewardsUtils.RewardsState;
     RewardsUtils.RewardsState public rewardsState;
 
+    enum ActionType {
+        UpdateRewardPeriod,
+        UpdateDepositorReward,
+        PayDepositorReward
+    }
+
+    /// @notice Call of the wrapper's method executed by executeActions()
+    /// @param actionType Type of the called method
+    /// @param totalStaked The total staked amount of tokens
+    /// @param depositor Address of the depositor. Not used by UpdateRewardPeriod action
+    /// @param staked Staked amount of the depositor. Not used by UpdateRewardPeriod action
+    /// @param rewardPerSecond Used by UpdateRewardPeriod action only
+    /// @param endDate Used by UpdateRewardPeriod action only
+    struct Action {
+        ActionType actionType;
+        uint256 totalStaked;
+        address depositor;
+        uint256 staked;
+        uint256 rewardPerSecond;
+        uint256 endDate;
+    }
+
     function depositorRewards(address depositor)
         external
         view
@@ -53,4 +75,35 @@ contract RewardsUtilsWrapper {
     function rewardPerToken(uint256 totalStaked) external view returns (uint256) {
         return rewardsState.rewardPerToken(totalStaked);
     }
+
+    /// @notice Executes the sequence of actions in a single transaction
+    /// @return results Values returned by the actions. Zero for UpdateRewardPeriod action
+    function executeActions(Action[] calldata actions)
+        external
+        returns (uint256[] memory results)
+    {
+        results = new uint256[](actions.length);
+        for (uint256 i = 0; i < actions.length; ++i) {
+            Action calldata action = actions[i];
+            if (action.actionType == ActionType.UpdateRewardPeriod) {
+                rewardsState.updateRewardPeriod(
+                    action.totalStaked,
+                    action.rewardPerSecond,
+                    action.endDate
+                );
+            } else if (action.actionType == ActionType.UpdateDepositorReward) {
+                results[i] = rewardsState.updateDepositorReward(
+                    action.totalStaked,
+                    action.depositor,
+                    action.staked
+                );
+            } else {
+                results[i] = rewardsState.payDepositorReward(
+                    action.totalStaked,
+                    action.depositor,
+                    action.staked
+                );
+            }
+        }
+    }
 }
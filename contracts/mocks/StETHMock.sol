@@ -0,0 +1,111 @@
+// SPDX-FileCopyrightText: 2021 Lido <info@lido.fi>
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+/// @author psirex
+/// @notice Mock of stETH token for testing purposes. Implements shares based
+///     accounting used by AStETH with the ability to simulate rebases
+/// @dev The contract has no state initialized in the constructor, so its runtime code
+///     might be placed at the address of the stETH token on the local chain
+contract StETHMock {
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(address indexed owner, address indexed spender, uint256 value);
+    event Submitted(address indexed sender, uint256 amount, address referral);
+
+    string public constant name = "Liquid staked Ether 2.0";
+    string public constant symbol = "stETH";
+    uint8 public constant decimals = 18;
+
+    uint256 internal totalPooledEther;
+    uint256 internal totalShares;
+    mapping(address => uint256) internal shares;
+    mapping(address => mapping(address => uint256)) public allowance;
+
+    receive() external payable {
+        _submit(address(0));
+    }
+
+    function submit(address referral) external payable returns (uint256) {
+        return _submit(referral);
+    }
+
+    /// @notice Changes amount of pooled ether without changing of shares
+    function setTotalPooledEther(uint256 _totalPooledEther) external {
+        totalPooledEther = _totalPooledEther;
+    }
+
+    function totalSupply() external view returns (uint256) {
+        return totalPooledEther;
+    }
+
+    function getTotalPooledEther() external view returns (uint256) {
+        return totalPooledEther;
+    }
+
+    function getTotalShares() external view returns (uint256) {
+        return totalShares;
+    }
+
+    function sharesOf(address account) external view returns (uint256) {
+        return shares[account];
+    }
+
+    function balanceOf(address account) external view returns (uint256) {
+        return getPooledEthByShares(shares[account]);
+    }
+
+    function getPooledEthByShares(uint256 sharesAmount) public view returns (uint256) {
+        if (totalShares == 0) {
+            return sharesAmount;
+        }
+        return (sharesAmount * totalPooledEther) / totalShares;
+    }
+
+    function getSharesByPooledEth(uint256 ethAmount) public view returns (uint256) {
+        if (totalPooledEther == 0) {
+            return ethAmount;
+        }
+        return (ethAmount * totalShares) / totalPooledEther;
+    }
+
+    function approve(address spender, uint256 amount) external returns (bool) {
+        allowance[msg.sender][spender] = amount;
+        emit Approval(msg.sender, spender, amount);
+        return true;
+    }
+
+    function transfer(address to, uint256 amount) external returns (bool) {
+        _transfer(msg.sender, to, amount);
+        return true;
+    }
+
+    function transferFrom(
+        address from,
+        address to,
+        uint256 amount
+    ) external returns (bool) {
+        allowance[from][msg.sender] -= amount;
+        _transfer(from, to, amount);
+        return true;
+    }
+
+    function _submit(address referral) internal returns (uint256 sharesAmount) {
+        sharesAmount = getSharesByPooledEth(msg.value);
+        totalShares += sharesAmount;
+        totalPooledEther += msg.value;
+        shares[msg.sender] += sharesAmount;
+        emit Transfer(address(0), msg.sender, msg.value);
+        emit Submitted(msg.sender, msg.value, referral);
+    }
+
+    function _transfer(
+        address from,
+        address to,
+        uint256 amount
+    ) internal {
+        uint256 sharesAmount = getSharesByPooledEth(amount);
+        shares[from] -= sharesAmount;
+        shares[to] += sharesAmount;
+        emit Transfer(from, to, amount);
+    }
+}
@@ -0,0 +1,14 @@
+// SPDX-FileCopyrightText: 2021 Lido <info@lido.fi>
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+import {EVMScriptRunnerMock} from "./EVMScriptRunnerMock.sol";
+
+/// @author psirex
+/// @notice Stub of Lido's Aragon TokenManager for the local chain. Forwards
+///     EVM scripts of any sender
+contract TokenManagerMock is EVMScriptRunnerMock {
+    function forward(bytes memory evmScript) external {
+        _runScript(evmScript);
+    }
+}
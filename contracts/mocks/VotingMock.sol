@@ -0,0 +1,104 @@
+// SPDX-FileCopyrightText: 2021 Lido <info@lido.fi>
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+import {EVMScriptRunnerMock} from "./EVMScriptRunnerMock.sol";
+
+/// @author psirex
+/// @notice Stub of Lido's Aragon Voting for the local chain. Every vote is decided
+///     by the single "yes" vote and might be executed after the vote time has passed
+contract VotingMock is EVMScriptRunnerMock {
+    event StartVote(uint256 indexed voteId, address indexed creator, string metadata);
+    event CastVote(uint256 indexed voteId, address indexed voter, bool supports, uint256 stake);
+    event ExecuteVote(uint256 indexed voteId);
+
+    struct Vote {
+        bool executed;
+        uint64 startDate;
+        uint64 snapshotBlock;
+        uint256 yea;
+        uint256 nay;
+        bytes script;
+    }
+
+    uint64 public constant voteTime = 72 hours;
+
+    uint256 public votesLength;
+    mapping(uint256 => Vote) internal votes;
+
+    function newVote(bytes memory executionScript, string memory metadata)
+        external
+        returns (uint256 voteId)
+    {
+        voteId = votesLength++;
+        Vote storage vote_ = votes[voteId];
+        vote_.startDate = uint64(block.timestamp);
+        vote_.snapshotBlock = uint64(block.number - 1);
+        vote_.script = executionScript;
+        emit StartVote(voteId, msg.sender, metadata);
+    }
+
+    function vote(
+        uint256 voteId,
+        bool supports,
+        bool
+    ) external {
+        require(_isOpen(votes[voteId]), "VOTING_CAN_NOT_VOTE");
+        if (supports) {
+            votes[voteId].yea += 1;
+        } else {
+            votes[voteId].nay += 1;
+        }
+        emit CastVote(voteId, msg.sender, supports, 1);
+    }
+
+    function canExecute(uint256 voteId) public view returns (bool) {
+        Vote storage vote_ = votes[voteId];
+        return
+            !vote_.executed &&
+            block.timestamp >= vote_.startDate + voteTime &&
+            vote_.yea > vote_.nay;
+    }
+
+    function executeVote(uint256 voteId) external {
+        require(canExecute(voteId), "VOTING_CAN_NOT_EXECUTE");
+        votes[voteId].executed = true;
+        _runScript(votes[voteId].script);
+        emit ExecuteVote(voteId);
+    }
+
+    function getVote(uint256 voteId)
+        external
+        view
+        returns (
+            bool open,
+            bool executed,
+            uint64 startDate,
+            uint64 snapshotBlock,
+            uint64 supportRequired,
+            uint64 minAcceptQuorum,
+            uint256 yea,
+            uint256 nay,
+            uint256 votingPower,
+            bytes memory script
+        )
+    {
+        Vote storage vote_ = votes[voteId];
+        return (
+            _isOpen(vote_),
+            vote_.executed,
+            vote_.startDate,
+            vote_.snapshotBlock,
+            0,
+            0,
+            vote_.yea,
+            vote_.nay,
+            vote_.yea + vote_.nay,
+            vote_.script
+        );
+    }
+
+    function _isOpen(Vote storage vote_) internal view returns (bool) {
+        return !vote_.executed && block.timestamp < vote_.startDate + voteTime;
+    }
+}
@@ -0,0 +1,36 @@
+// SPDX-FileCopyrightText: 2021 Lido <info@lido.fi>
+// SPDX-License-Identifier: GPL-3.0
+pragma solidity 0.8.10;
+
+/// @author psirex
+/// @notice Aggregates results of multiple view calls into one eth_call
+contract Multicall {
+    /// @notice Call to execute
+    /// @param target Address of the contract to call
+    /// @param callData ABI encoded calldata of the call
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    /// @notice Result of the executed call
+    /// @param success Whether the call was successful
+    /// @param returnData ABI encoded data returned by the call
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    /// @notice Executes the given calls via staticcall and returns their results
+    ///     in the same order. Failed calls don't revert the whole batch
+    /// @param calls List of calls to execute
+    function aggregate(Call[] calldata calls) external view returns (Result[] memory results) {
+        results = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; ++i) {
+            (bool success, bytes memory returnData) = calls[i].target.staticcall(
+                calls[i].callData
+            );
+            results[i] = Result(success, returnData);
+        }
+    }
+}
@@ -32,6 +32,37 @@ library RewardsUtils {
         mapping(address => Reward) rewards;
     }
 
+    /// @notice Keeps reward data for depositor packed into two storage slots
+    /// @param accumulatedRewardPerTokenPaid The value of PackedRewardsState.accumulatedRewardPerToken
+    ///   has used to calculate the upcomingReward last time.
+    /// @param upcomingReward The upcoming depositor's reward
+    /// @param paidReward The reward paid to the depositor
+    /// @dev accumulatedRewardPerTokenPaid and upcomingReward share one slot, so
+    ///   updateDepositorReward() writes only one slot of the depositor
+    struct PackedReward {
+        uint160 accumulatedRewardPerTokenPaid;
+        uint96 upcomingReward;
+        uint96 paidReward;
+    }
+
+    /// @notice Stores state of rewards program packed into two storage slots
+    /// @param accumulatedRewardPerToken Sum of historical values
+    ///   (PRECISION * timeDelta * rewardPerSecond) / totalStaked where timeDelta is a time passed from last update
+    /// @param updatedAt Last update timestamp
+    /// @param endDate End date of the reward program
+    /// @param rewardPerSecond Amount of tokens distributed in one second
+    /// @param rewards Rewards info of depositors
+    /// @dev accumulatedRewardPerToken and updatedAt are updated on every depositor's action
+    ///   and share one slot with endDate. rewardPerSecond is only read on that path and
+    ///   kept in the separate slot without range limitations
+    struct PackedRewardsState {
+        uint160 accumulatedRewardPerToken;
+        uint48 updatedAt;
+        uint48 endDate;
+        uint256 rewardPerSecond;
+        mapping(address => PackedReward) rewards;
+    }
+
     uint256 private constant PRECISION = 1e18;
 
     /// @notice Updates current state of the reward program
@@ -64,12 +95,22 @@ library RewardsUtils {
         address depositor,
         uint256 staked
     ) internal view returns (uint256) {
-        Reward storage depositorReward = state.rewards[depositor];
+        return earnedReward(state.rewards[depositor], staked, rewardPerToken(state, totalStaked));
+    }
+
+    /// @notice Returns reward depositor earned and able to retrieve for the given value of
+    ///   reward per token. Allows to compute rewardPerToken() once for many depositors
+    /// @param depositorReward Reward data of the depositor
+    /// @param staked Amount of tokens staked by the depositor at the current block timestamp
+    /// @param currentRewardPerToken Value of rewardPerToken() at the current block timestamp
+    function earnedReward(
+        Reward storage depositorReward,
+        uint256 staked,
+        uint256 currentRewardPerToken
+    ) internal view returns (uint256) {
         return
             depositorReward.upcomingReward +
-            (staked *
-                (rewardPerToken(state, totalStaked) -
-                    depositorReward.accumulatedRewardPerTokenPaid)) /
+            (staked * (currentRewardPerToken - depositorReward.accumulatedRewardPerTokenPaid)) /
             PRECISION;
     }
 
@@ -148,4 +189,139 @@ library RewardsUtils {
     function _blockTimestampOrEndDate(RewardsState storage state) private view returns (uint256) {
         return state.endDate > block.timestamp ? block.timestamp : state.endDate;
     }
+
+    /// @notice Updates current state of the reward program stored in the packed layout
+    /// @param state State of the reward program
+    /// @param totalStaked The total staked amount of tokens
+    /// @param rewardPerSecond Amount of tokens to distribute in one second
+    /// @param endDate End date of the reward program
+    /// @dev endDate value must be greater or equal to the current block.timestamp value
+    function updateRewardPeriod(
+        PackedRewardsState storage state,
+        uint256 totalStaked,
+        uint256 rewardPerSecond,
+        uint256 endDate
+    ) internal {
+        require(endDate >= block.timestamp, "END_DATE_TOO_LOW");
+        state.accumulatedRewardPerToken = _toUint160(rewardPerToken(state, totalStaked));
+        state.endDate = _toUint48(endDate);
+        state.updatedAt = _toUint48(block.timestamp);
+        state.rewardPerSecond = rewardPerSecond;
+    }
+
+    /// @notice Returns reward depositor earned and able to retrieve
+    /// @param state State of the reward program
+    /// @param totalStaked The total staked amount of tokens at the current block timestamp
+    /// @param depositor Address of the depositor
+    /// @param staked Amount of tokens staked by the depositor at the current block timestamp
+    function earnedReward(
+        PackedRewardsState storage state,
+        uint256 totalStaked,
+        address depositor,
+        uint256 staked
+    ) internal view returns (uint256) {
+        PackedReward storage depositorReward = state.rewards[depositor];
+        return
+            depositorReward.upcomingReward +
+            (staked *
+                (rewardPerToken(state, totalStaked) -
+                    depositorReward.accumulatedRewardPerTokenPaid)) /
+            PRECISION;
+    }
+
+    /// @notice Updates reward of depositor stores this value in the upcoming reward and return
+    ///   the new value of unpaid earned reward
+    /// @param state State of the reward program
+    /// @param prevTotalStaked The total amount of tokens has staked by all depositors before the current update
+    /// @param depositor Address of the depositor
+    /// @param prevStaked The amount of tokens staked by the depositor before the current update
+    /// @return depositorReward The new value of unpaid reward earned by the depositor
+    function updateDepositorReward(
+        PackedRewardsState storage state,
+        uint256 prevTotalStaked,
+        address depositor,
+        uint256 prevStaked
+    ) internal returns (uint256 depositorReward) {
+        uint256 newRewardPerToken = _updateRewardPerToken(state, prevTotalStaked);
+        depositorReward = earnedReward(state, prevTotalStaked, depositor, prevStaked);
+        PackedReward storage packedReward = state.rewards[depositor];
+        packedReward.accumulatedRewardPerTokenPaid = uint160(newRewardPerToken);
+        packedReward.upcomingReward = _toUint96(depositorReward);
+        return depositorReward;
+    }
+
+    /// @notice Marks upcoming reward as paid resets its value and return amount of paid reward
+    /// @param state State of the reward program
+    /// @param totalStaked The total staked amount of tokens at the current block timestamp
+    /// @param depositor Address of the depositor
+    /// @param staked Amount of tokens staked by the depositor at the current block timestamp
+    /// @return paidReward The amount of reward paid to the depositor
+    function payDepositorReward(
+        PackedRewardsState storage state,
+        uint256 totalStaked,
+        address depositor,
+        uint256 staked
+    ) internal returns (uint256 paidReward) {
+        paidReward = updateDepositorReward(state, totalStaked, depositor, staked);
+        PackedReward storage packedReward = state.rewards[depositor];
+        packedReward.upcomingReward = 0;
+        packedReward.paidReward = _toUint96(packedReward.paidReward + paidReward);
+    }
+
+    /// @notice Returns value of accumulated reward per token at the time equal to
+    /// minimum between current block timestamp or reward period end date
+    /// @param state State of the reward program
+    /// @param totalStaked The total staked amount of tokens at the current block timestamp
+    function rewardPerToken(PackedRewardsState storage state, uint256 totalStaked)
+        internal
+        view
+        returns (uint256)
+    {
+        if (totalStaked == 0) {
+            return state.accumulatedRewardPerToken;
+        }
+        uint256 timeDelta = _blockTimestampOrEndDate(state) - state.updatedAt;
+        uint256 unaccountedRewardPerToken = (PRECISION * timeDelta * state.rewardPerSecond) /
+            totalStaked;
+        return state.accumulatedRewardPerToken + unaccountedRewardPerToken;
+    }
+
+    /// @notice Updates the accumulated reward per token value
+    /// @param state State of the reward program
+    /// @param totalStaked The total staked amount of tokens at the current block timestamp
+    function _updateRewardPerToken(PackedRewardsState storage state, uint256 totalStaked)
+        private
+        returns (uint256)
+    {
+        uint256 newRewardPerToken = rewardPerToken(state, totalStaked);
+        state.accumulatedRewardPerToken = _toUint160(newRewardPerToken);
+        state.updatedAt = uint48(_blockTimestampOrEndDate(state));
+        return newRewardPerToken;
+    }
+
+    /// @notice Returns the minimum between block.timestamp and endDate
+    /// @param state State of the reward program
+    function _blockTimestampOrEndDate(PackedRewardsState storage state)
+        private
+        view
+        returns (uint256)
+    {
+        uint256 endDate = state.endDate;
+        return endDate > block.timestamp ? block.timestamp : endDate;
+    }
+
+    function _toUint160(uint256 value) private pure returns (uint160) {
+        require(value <= type(uint160).max, "UINT160_OVERFLOW");
+        return uint160(value);
+    }
+
+    function _toUint96(uint256 value) private pure returns (uint96) {
+        require(value <= type(uint96).max, "UINT96_OVERFLOW");
+        return uint96(value);
+    }
+
+    function _toUint48(uint256 value) private pure returns (uint48) {
+        require(value <= type(uint48).max, "UINT48_OVERFLOW");
+        return uint48(value);
+    }
 }
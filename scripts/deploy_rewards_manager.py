@@ -1,3 +1,4 @@
+import sys
 from brownie import Wei
 from utils import lido, deployment, config, constants
 
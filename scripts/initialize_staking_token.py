@@ -1,4 +1,5 @@
-from brownie import Wei, AaveAStETHIncentivesController
+import sys
+from brownie import Wei
 from utils import lido, config
 
 
@@ -18,6 +19,9 @@ def main():
         print("Aborting")
         return
 
+    # contract containers are imported after the prompt to show it faster
+    from brownie import AaveAStETHIncentivesController
+
     tx_params = {"from": deployer, "gas_price": Wei("100 gwei")}
 
     incentives_controller = AaveAStETHIncentivesController.at(
@@ -0,0 +1,55 @@
+from brownie import interface
+from utils import config, monitor
+
+# names of the contract containers by the type of the controller
+CONTROLLER_CONTRACTS = {
+    "aave": "AaveAStETHIncentivesController",
+    "merkle": "MerkleAStETHIncentivesController",
+}
+
+
+def main():
+    incentives_controller_address = config.get_env("INCENTIVES_CONTROLLER")
+    controller_type = config.get_env("MONITOR_CONTROLLER_TYPE", "aave")
+    if controller_type not in CONTROLLER_CONTRACTS:
+        raise ValueError(
+            f"Unknown MONITOR_CONTROLLER_TYPE {controller_type}, "
+            f"expected one of {', '.join(CONTROLLER_CONTRACTS)}"
+        )
+    poll_interval = int(
+        config.get_env("MONITOR_POLL_INTERVAL", str(monitor.DEFAULT_POLL_INTERVAL))
+    )
+    metrics_port = int(
+        config.get_env("MONITOR_METRICS_PORT", str(monitor.DEFAULT_METRICS_PORT))
+    )
+    # by default the rewards distributor at the start of the monitor is expected
+    expected_rewards_distributor = (
+        config.get_env("MONITOR_REWARDS_DISTRIBUTOR", "") or None
+    )
+    allowed_recovered_tokens = [
+        token
+        for token in config.get_env("MONITOR_ALLOWED_RECOVERED_TOKENS", "").split(",")
+        if token
+    ]
+
+    # contract containers are imported here to not load them for the other scripts
+    import brownie
+
+    controller_contract = getattr(brownie, CONTROLLER_CONTRACTS[controller_type])
+    incentives_controller = controller_contract.at(incentives_controller_address)
+    reward_token = interface.ERC20(incentives_controller.REWARD_TOKEN())
+
+    print("Incentives Controller:", incentives_controller)
+    print("Controller Type:", controller_type)
+    print("Reward Token:", reward_token)
+    print("Metrics Port:", metrics_port)
+
+    controller_monitor = monitor.ControllerMonitor(
+        incentives_controller,
+        reward_token,
+        storage_layout=monitor.STORAGE_LAYOUTS[controller_type],
+        expected_rewards_distributor=expected_rewards_distributor,
+        allowed_recovered_tokens=allowed_recovered_tokens,
+    )
+    monitor.serve_metrics(controller_monitor, metrics_port)
+    controller_monitor.run(poll_interval)
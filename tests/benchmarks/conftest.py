@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+import pytest
+from brownie import chain
+from utils import config, gas
+from utils.constants import ONE_WEEK, DEFAULT_REWARDS_DURATION
+
+# benchmarks are slow, they are collected only when RUN_BENCHMARKS env variable is set
+collect_ignore_glob = [] if os.environ.get("RUN_BENCHMARKS") else ["test_*.py"]
+
+GAS_BASELINE_PATH = Path(__file__).parent / "gas_baseline.json"
+
+
+@pytest.fixture(scope="session")
+def gas_baseline():
+    """
+    Gas usage baseline of the benchmarked actions. The regression threshold is set
+    via GAS_REGRESSION_THRESHOLD env variable. When UPDATE_GAS_BASELINE env variable
+    is set, the measured values are written into the baseline at the end of session
+    and the actions missing in the baseline don't fail. Without the baseline file
+    the gas checks are skipped.
+    """
+    baseline = gas.GasBaseline(
+        config.get_env("GAS_BASELINE_PATH", str(GAS_BASELINE_PATH)),
+        threshold=float(
+            config.get_env(
+                "GAS_REGRESSION_THRESHOLD", str(gas.DEFAULT_REGRESSION_THRESHOLD)
+            )
+        ),
+    )
+    yield baseline
+    if os.environ.get("UPDATE_GAS_BASELINE"):
+        baseline.save()
+
+
+@pytest.fixture(scope="function")
+def assert_gas(gas_baseline):
+    """Checks the gas of the transaction or of each of its actions_count actions"""
+
+    def check(name, tx, actions_count=1):
+        gas_baseline.record(name, tx.gas_used // actions_count)
+        if os.environ.get("UPDATE_GAS_BASELINE"):
+            if name not in gas_baseline.baseline:
+                return
+        elif not gas_baseline.path.exists():
+            pytest.skip(
+                f"Gas baseline {gas_baseline.path} is missing, "
+                "write it with UPDATE_GAS_BASELINE=1"
+            )
+        regression = gas_baseline.regression(name)
+        assert regression is None, regression
+
+    return check
+
+
+@pytest.fixture(scope="function")
+def run_scenario():
+    """
+    Prepares the state for the given scenario of utils.gas and returns the
+    transaction of the measured action. action() is called to warm up the
+    depositor in the repeat scenarios and once more to make the measured transaction
+    """
+
+    def run(scenario, start_rewards_period, action):
+        if scenario not in gas.WITHOUT_REWARDS_SCENARIOS:
+            start_rewards_period()
+        if scenario in gas.REPEAT_ACTION_SCENARIOS:
+            action()
+
+        if scenario in (
+            gas.REPEAT_ACTION_AFTER_PERIOD,
+            gas.REPEAT_ACTION_AFTER_SETTLED_PERIOD,
+        ):
+            chain.sleep(DEFAULT_REWARDS_DURATION + ONE_WEEK)
+        else:
+            chain.sleep(ONE_WEEK)
+        if scenario == gas.REPEAT_ACTION_AFTER_SETTLED_PERIOD:
+            action()
+            chain.sleep(ONE_WEEK)
+        chain.mine()
+        return action()
+
+    return run
@@ -0,0 +1,61 @@
+import time
+import pytest
+from brownie import web3
+from utils import config
+from utils.multicall import BatchReader, earned, internal_balances_and_supply
+
+DEPOSITORS_COUNT = int(config.get_env("BENCHMARK_DEPOSITORS_COUNT", "10000"))
+SEED_BATCH_SIZE = 500
+
+
+@pytest.fixture(scope="module")
+def seeded_depositors(asteth_mock, incentives_controller, deployer):
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    depositors = [
+        web3.toChecksumAddress(web3.keccak(i.to_bytes(32, "big"))[-20:])
+        for i in range(DEPOSITORS_COUNT)
+    ]
+    for i in range(0, DEPOSITORS_COUNT, SEED_BATCH_SIZE):
+        batch = depositors[i : i + SEED_BATCH_SIZE]
+        asteth_mock.setBalances(
+            batch,
+            [10 ** 15 * (i + j + 1) for j in range(len(batch))],
+            {"from": deployer},
+        )
+    return depositors
+
+
+def measure(fn):
+    started_at = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started_at
+
+
+def test_batch_reader_vs_per_call_loop(
+    multicall, incentives_controller, asteth_mock, seeded_depositors
+):
+    reader = BatchReader(multicall)
+
+    batched, batched_time = measure(
+        lambda: (
+            earned(reader, incentives_controller, seeded_depositors),
+            internal_balances_and_supply(reader, asteth_mock, seeded_depositors),
+        )
+    )
+    looped, looped_time = measure(
+        lambda: (
+            [incentives_controller.earned(d) for d in seeded_depositors],
+            [asteth_mock.getInternalUserBalanceAndSupply(d) for d in seeded_depositors],
+        )
+    )
+
+    reads_count = 2 * DEPOSITORS_COUNT
+    print(
+        f"\n{DEPOSITORS_COUNT} depositors: per-call loop {looped_time:.2f}s "
+        f"({reads_count / looped_time:.0f} reads/s), batched {batched_time:.2f}s "
+        f"({reads_count / batched_time:.0f} reads/s, chunk size {reader.chunk_size})"
+    )
+    assert batched[0] == looped[0]
+    assert [tuple(r) for r in batched[1]] == [tuple(r) for r in looped[1]]
+    assert batched_time < looped_time
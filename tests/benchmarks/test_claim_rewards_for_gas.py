@@ -0,0 +1,106 @@
+import pytest
+from brownie import Wei, chain, web3
+from utils.constants import DEFAULT_TOTAL_REWARD, ONE_DAY
+
+BATCH_SIZES = [1, 10, 100, 500]
+# holders seeded and warmed up by a single transaction, the first claim of the
+# holder costs more than the measured one, so the largest batch doesn't fit at once
+SETUP_CHUNK_SIZE = 100
+# share of the block gas limit the batched claim might use
+BLOCK_GAS_LIMIT_RATIO = 0.5
+# the batch which the claim operator must be able to pay in a single transaction
+MIN_MAX_BATCH_SIZE = 100
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initialize_incentives_controller(incentives_controller, asteth_mock, deployer):
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    incentives_controller.setClaimOperator(deployer, True, {"from": deployer})
+
+
+def seed_holders(asteth_mock, count, deployer):
+    holders = [f"0x{0x10000 + i:040x}" for i in range(count)]
+    for i in range(0, count, SETUP_CHUNK_SIZE):
+        chunk = holders[i : i + SETUP_CHUNK_SIZE]
+        asteth_mock.setBalances(
+            chunk, [Wei("1 ether")] * len(chunk), {"from": deployer}
+        )
+    return holders
+
+
+@pytest.fixture(scope="module")
+def holders(asteth_mock, deployer):
+    return seed_holders(asteth_mock, max(BATCH_SIZES), deployer)
+
+
+@pytest.fixture(scope="function")
+def start_rewards_period(incentives_controller, rewards_manager, ldo, agent):
+    ldo.approve(incentives_controller, DEFAULT_TOTAL_REWARD, {"from": agent})
+    incentives_controller.notifyRewardAmount(
+        DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+    )
+
+
+def measured_claim(incentives_controller, batch, deployer):
+    # the first claim initializes storage slots of the holders, the repeated
+    # claim is measured as the steady state of the batched claims
+    chain.sleep(ONE_DAY)
+    for i in range(0, len(batch), SETUP_CHUNK_SIZE):
+        incentives_controller.claimRewardsFor(
+            batch[i : i + SETUP_CHUNK_SIZE], {"from": deployer}
+        )
+    chain.sleep(ONE_DAY)
+    tx = incentives_controller.claimRewardsFor(batch, {"from": deployer})
+    assert tx.events["RewardsPaid"]["depositorsCount"] == len(batch)
+    assert tx.events["RewardsPaid"]["totalReward"] > 0
+    return tx
+
+
+@pytest.mark.usefixtures("start_rewards_period")
+@pytest.mark.parametrize("batch_size", BATCH_SIZES)
+def test_claim_rewards_for_gas(
+    batch_size, incentives_controller, holders, deployer, assert_gas
+):
+    tx = measured_claim(incentives_controller, holders[:batch_size], deployer)
+    print(
+        f"\nclaimRewardsFor({batch_size}): {tx.gas_used} gas, "
+        f"{tx.gas_used // batch_size} gas per user"
+    )
+    assert_gas(
+        f"AaveAStETHIncentivesController.claimRewardsFor/{batch_size}/per_user",
+        tx,
+        actions_count=batch_size,
+    )
+
+
+@pytest.mark.usefixtures("start_rewards_period")
+def test_claim_rewards_for_max_batch_fits_block(
+    incentives_controller, asteth_mock, holders, deployer
+):
+    # the max batch is derived from the per-user gas of the largest measured
+    # batch, which includes the share of the transaction's base cost
+    tx = measured_claim(incentives_controller, holders, deployer)
+    gas_limit = int(web3.eth.get_block("latest")["gasLimit"] * BLOCK_GAS_LIMIT_RATIO)
+    max_batch_size = gas_limit // (tx.gas_used // len(holders))
+    print(f"\nclaimRewardsFor max batch within {gas_limit} gas: {max_batch_size}")
+    assert max_batch_size >= MIN_MAX_BATCH_SIZE
+
+    batch = seed_holders(asteth_mock, max_batch_size, deployer)
+    tx = measured_claim(incentives_controller, batch, deployer)
+    assert tx.gas_used <= gas_limit
+
+
+@pytest.mark.usefixtures("start_rewards_period")
+def test_claim_reward_gas(
+    incentives_controller, asteth_mock, depositors, deployer, assert_gas
+):
+    depositor = depositors[0]
+    asteth_mock.mint(depositor, Wei("1 ether"), {"from": deployer})
+    chain.sleep(ONE_DAY)
+    incentives_controller.claimReward({"from": depositor})
+    chain.sleep(ONE_DAY)
+    tx = incentives_controller.claimReward({"from": depositor})
+
+    assert tx.events["RewardPaid"]["reward"] > 0
+    assert_gas("AaveAStETHIncentivesController.claimReward", tx)
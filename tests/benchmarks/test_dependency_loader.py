@@ -0,0 +1,43 @@
+import sys
+import subprocess
+from pathlib import Path
+
+PROJECT_PATH = Path(__file__).parent.parent.parent
+
+# loads contracts of the dependencies in the fresh process and prints the time spent
+LOAD_DEPENDENCIES_SCRIPT = """
+import sys
+import time
+from brownie import project
+
+project.load(".")._add_to_main_namespace()
+from utils import deployment
+
+deployment.DependencyLoader.cache_dir = sys.argv[1]
+started_at = time.perf_counter()
+for dependency_name, contract_names in deployment.CACHED_CONTRACTS.items():
+    for contract_name in contract_names:
+        deployment.DependencyLoader.load(dependency_name, contract_name)
+print(time.perf_counter() - started_at)
+"""
+
+
+def load_dependencies(cache_dir):
+    result = subprocess.run(
+        [sys.executable, "-c", LOAD_DEPENDENCIES_SCRIPT, str(cache_dir)],
+        cwd=PROJECT_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def test_dependency_loader_startup(tmp_path):
+    cold_load_time = load_dependencies(tmp_path)
+    cached_load_time = load_dependencies(tmp_path)
+    print(
+        f"\ndependencies load time: {cold_load_time:.2f}s without cache, "
+        f"{cached_load_time:.2f}s with cache"
+    )
+    assert cached_load_time < cold_load_time
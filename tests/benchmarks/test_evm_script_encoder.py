@@ -0,0 +1,31 @@
+import random
+import time
+from utils import config
+from utils.evm_script import decode_call_script, encode_call_script_bytes
+
+ACTIONS_COUNT = int(config.get_env("BENCHMARK_ACTIONS_COUNT", "5000"))
+CALLDATA_SIZE = 68  # transfer(address,uint256)
+MAX_ENCODING_TIME = 0.05
+
+
+def test_evm_script_encoder_speed():
+    rnd = random.Random(42)
+    actions = [
+        ("0x" + rnd.randbytes(20).hex(), "0x" + rnd.randbytes(CALLDATA_SIZE).hex())
+        for _ in range(ACTIONS_COUNT)
+    ]
+
+    started_at = time.perf_counter()
+    script = encode_call_script_bytes(actions)
+    encoding_time = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    _, decoded_actions = decode_call_script(script)
+    decoding_time = time.perf_counter() - started_at
+
+    print(
+        f"{ACTIONS_COUNT} actions ({len(script)} bytes) encoded in "
+        f"{encoding_time * 1000:.2f}ms and decoded in {decoding_time * 1000:.2f}ms"
+    )
+    assert len(decoded_actions) == ACTIONS_COUNT
+    assert encoding_time <= MAX_ENCODING_TIME
@@ -0,0 +1,60 @@
+import pytest
+from brownie import Wei
+from utils import gas
+from utils.constants import DEFAULT_TOTAL_REWARD
+
+# the setup touches the depositor before withdraw and transfer
+ACTION_SCENARIOS = {
+    "deposit": gas.SCENARIOS,
+    "withdraw": gas.REPEAT_ACTION_SCENARIOS,
+    "transfer": gas.TRANSFER_SCENARIOS,
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def set_rewards_contract(steth_reserve, rewards_manager, incentives_controller, owner):
+    rewards_manager.set_rewards_contract(incentives_controller, {"from": owner})
+
+
+@pytest.fixture(scope="function")
+def start_rewards_period(rewards_manager, ldo, agent, owner):
+    def start():
+        ldo.transfer(rewards_manager, DEFAULT_TOTAL_REWARD, {"from": agent})
+        rewards_manager.start_next_rewards_period({"from": owner})
+
+    return start
+
+
+@pytest.mark.parametrize(
+    "action,scenario",
+    [
+        (action, scenario)
+        for action, scenarios in ACTION_SCENARIOS.items()
+        for scenario in scenarios
+    ],
+)
+def test_handle_action_gas(
+    action,
+    scenario,
+    steth_reserve,
+    depositors,
+    start_rewards_period,
+    run_scenario,
+    assert_gas,
+):
+    [depositor, recipient] = depositors[0:2]
+    if action != "deposit":
+        steth_reserve.deposit(depositor, Wei("0.5 ether"))
+
+    actions = {
+        "deposit": lambda: steth_reserve.deposit(depositor, Wei("0.1 ether")),
+        "withdraw": lambda: steth_reserve.withdraw(depositor, Wei("0.1 ether")),
+        "transfer": lambda: steth_reserve.transfer(
+            depositor, recipient, Wei("0.1 ether")
+        ),
+    }
+    tx = run_scenario(scenario, start_rewards_period, actions[action])
+
+    if scenario in gas.REPEAT_ACTION_EARNS:
+        assert ("RewardsAccrued" in tx.events) == gas.REPEAT_ACTION_EARNS[scenario]
+    assert_gas(f"AaveReserve.{action}/{scenario}", tx)
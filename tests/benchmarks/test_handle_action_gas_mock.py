@@ -0,0 +1,68 @@
+import pytest
+from brownie import Wei
+from utils import gas
+from utils.constants import DEFAULT_TOTAL_REWARD
+
+# the setup touches the depositor before burn and transfer
+ACTION_SCENARIOS = {
+    "mint": gas.SCENARIOS,
+    "burn": gas.REPEAT_ACTION_SCENARIOS,
+    "transfer": gas.TRANSFER_SCENARIOS,
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initialize_incentives_controller(incentives_controller, asteth_mock, deployer):
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+
+
+@pytest.fixture(scope="function")
+def start_rewards_period(incentives_controller, rewards_manager, ldo, agent):
+    def start():
+        ldo.approve(incentives_controller, DEFAULT_TOTAL_REWARD, {"from": agent})
+        incentives_controller.notifyRewardAmount(
+            DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+        )
+
+    return start
+
+
+@pytest.mark.parametrize(
+    "action,scenario",
+    [
+        (action, scenario)
+        for action, scenarios in ACTION_SCENARIOS.items()
+        for scenario in scenarios
+    ],
+)
+def test_handle_action_gas(
+    action,
+    scenario,
+    asteth_mock,
+    depositors,
+    deployer,
+    start_rewards_period,
+    run_scenario,
+    assert_gas,
+):
+    [depositor, recipient] = depositors[0:2]
+    if action != "mint":
+        asteth_mock.mint(depositor, Wei("1 ether"), {"from": deployer})
+
+    actions = {
+        "mint": lambda: asteth_mock.mint(
+            depositor, Wei("0.1 ether"), {"from": deployer}
+        ),
+        "burn": lambda: asteth_mock.burn(
+            depositor, Wei("0.1 ether"), {"from": deployer}
+        ),
+        "transfer": lambda: asteth_mock.transfer(
+            depositor, recipient, Wei("0.1 ether"), {"from": deployer}
+        ),
+    }
+    tx = run_scenario(scenario, start_rewards_period, actions[action])
+
+    if scenario in gas.REPEAT_ACTION_EARNS:
+        assert ("RewardsAccrued" in tx.events) == gas.REPEAT_ACTION_EARNS[scenario]
+    assert_gas(f"AStEthMock.{action}/{scenario}", tx)
@@ -0,0 +1,34 @@
+import time
+from utils import config, simulator
+from utils.constants import ONE_WEEK, DEFAULT_REWARDS_DURATION, DEFAULT_TOTAL_REWARD
+
+DEPOSITORS_COUNT = int(config.get_env("BENCHMARK_DEPOSITORS_COUNT", "10000"))
+EVENTS_COUNT = 1_000_000
+MIN_HANDLE_ACTIONS_PER_MINUTE = 1_000_000
+START_TIMESTAMP = 1_600_000_000
+END_TIMESTAMP = START_TIMESTAMP + 52 * ONE_WEEK
+
+
+def test_simulator_throughput():
+    events = list(
+        simulator.merge_events(
+            simulator.random_activity(
+                DEPOSITORS_COUNT, START_TIMESTAMP, END_TIMESTAMP, EVENTS_COUNT
+            ),
+            simulator.top_ups(
+                START_TIMESTAMP, END_TIMESTAMP, ONE_WEEK, DEFAULT_TOTAL_REWARD
+            ),
+        )
+    )
+    sim = simulator.RewardsSimulator(DEPOSITORS_COUNT, DEFAULT_REWARDS_DURATION)
+
+    started_at = time.perf_counter()
+    sim.run(events)
+    elapsed = time.perf_counter() - started_at
+
+    handle_actions_per_minute = sim.handle_actions_count * 60 / elapsed
+    print(
+        f"{sim.handle_actions_count} handleAction events in {elapsed:.2f}s "
+        f"({handle_actions_per_minute:.0f}/min)"
+    )
+    assert handle_actions_per_minute >= MIN_HANDLE_ACTIONS_PER_MINUTE
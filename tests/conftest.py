@@ -1,11 +1,67 @@
+import time
+from pathlib import Path
 import pytest
-from utils import lido, aave, deployment
+from brownie import network
+from utils import lido, aave, config, deployment, gas_profile, local_backend
+
+GAS_PROFILES_DIR = Path(__file__).parent.parent / "build" / "gas_profiles"
+# wall-clock time of the deployment and of the tests reported after the session
+SESSION_TIMINGS = {}
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "gas_profile: trace the deposits, withdrawals and transfers of AaveReserve "
+        "made by the test and write their folded gas stacks into GAS_PROFILES_DIR",
+    )
+
+
+def pytest_collection_finish(session):
+    SESSION_TIMINGS["started_at"] = time.perf_counter()
+
+
+def pytest_terminal_summary(terminalreporter):
+    if "deployed_at" not in SESSION_TIMINGS:
+        return
+    deployment_time = SESSION_TIMINGS["deployed_at"] - SESSION_TIMINGS["started_at"]
+    tests_time = time.perf_counter() - SESSION_TIMINGS["deployed_at"]
+    terminalreporter.write_line(
+        f"{SESSION_TIMINGS['network']}: deployment {deployment_time:.1f}s, "
+        f"tests {tests_time:.1f}s"
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def module_deployment_isolation(deployment_snapshot):
+    """Reverts ganache to the state with deployed contracts before every test module."""
+    deployment_snapshot.revert()
 
 
 @pytest.fixture(autouse=True)
-def isolation(fn_isolation):
+def isolation(chain, module_deployment_isolation):
     """Snapshot ganache before every test function call."""
-    pass
+    chain.snapshot()
+    yield
+    chain.revert()
+
+
+@pytest.fixture(autouse=True)
+def gas_profiler(request, monkeypatch):
+    """
+    Profiler of the AaveReserve actions of the tests marked with gas_profile.
+    The folded stacks are written into <GAS_PROFILES_DIR>/<test name>.folded
+    """
+    if request.node.get_closest_marker("gas_profile") is None:
+        yield None
+        return
+    profiler = gas_profile.GasProfiler()
+    monkeypatch.setattr(deployment.AaveReserve, "gas_profiler", profiler)
+    yield profiler
+    profiler.write_folded(
+        Path(config.get_env("GAS_PROFILES_DIR", str(GAS_PROFILES_DIR)))
+        / f"{request.node.name}.folded"
+    )
 
 
 ############
@@ -13,12 +69,12 @@ def isolation(fn_isolation):
 ############
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def deployer(accounts):
     return accounts[0]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def owner(accounts):
     return accounts[1]
 
@@ -31,23 +87,23 @@ def depositors(accounts, steth):
     return depositors
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def stranger(accounts):
     return accounts[6]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def pool_admin(accounts):
     return accounts.at(aave.POOL_ADMIN_ADDRESS, force=True)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def rewards_distributor(accounts):
     return accounts[5]
 
 
-@pytest.fixture(scope="module")
-def agent(accounts):
+@pytest.fixture(scope="session")
+def agent(accounts, lido_contracts):
     return accounts.at(lido.AGENT_ADDRESS, force=True)
 
 
@@ -56,17 +112,42 @@ def agent(accounts):
 ############
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
+def deployment_snapshot(
+    lido_contracts,
+    aave_market,
+    rewards_utils_wrapper,
+    packed_rewards_utils_wrapper,
+    rewards_manager,
+    incentives_controller,
+    asteth_impl,
+    variable_debt_steth_impl,
+    stable_debt_steth_impl,
+    asteth_mock,
+    multicall,
+):
+    """Snapshot of ganache taken after all contracts are deployed."""
+    SESSION_TIMINGS["network"] = network.show_active()
+    SESSION_TIMINGS["deployed_at"] = time.perf_counter()
+    return deployment.ChainSnapshot()
+
+
+@pytest.fixture(scope="session")
 def rewards_utils_wrapper(RewardsUtilsWrapper, deployer):
     return RewardsUtilsWrapper.deploy({"from": deployer})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
+def packed_rewards_utils_wrapper(PackedRewardsUtilsWrapper, deployer):
+    return PackedRewardsUtilsWrapper.deploy({"from": deployer})
+
+
+@pytest.fixture(scope="session")
 def rewards_manager(owner):
     return deployment.deploy_rewards_manager({"from": owner})
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def incentives_controller(ldo, owner, deployer, rewards_manager):
     return deployment.deploy_incentives_controller(
         reward_token=ldo,
@@ -75,28 +156,42 @@ def incentives_controller(ldo, owner, deployer, rewards_manager):
     )
 
 
-@pytest.fixture(scope="module")
-def ldo(interface):
+@pytest.fixture(scope="session")
+def lido_contracts(deployer):
+    """Places mocks of Lido contracts at their mainnet addresses on the local chain"""
+    if config.get_is_local_backend():
+        local_backend.deploy_lido(deployer)
+
+
+@pytest.fixture(scope="session")
+def ldo(interface, lido_contracts):
     return lido.ldo(interface)
 
 
-@pytest.fixture(scope="module")
-def steth(interface):
+@pytest.fixture(scope="session")
+def steth(interface, lido_contracts):
     return lido.steth(interface)
 
 
-@pytest.fixture(scope="module")
-def lending_pool(interface):
-    return aave.lending_pool(interface)
+@pytest.fixture(scope="session")
+def aave_market(interface, pool_admin, deployer):
+    if config.get_is_local_backend():
+        return local_backend.deploy_aave_market(pool_admin, deployer)
+    return aave.market(interface)
 
 
-@pytest.fixture(scope="module")
-def lending_pool_configurator(interface):
-    return aave.lending_pool_configurator(interface)
+@pytest.fixture(scope="session")
+def lending_pool(aave_market):
+    return aave_market.lending_pool
 
 
-@pytest.fixture(scope="module")
-def asteth_impl(Contract, incentives_controller, lending_pool, steth, deployer):
+@pytest.fixture(scope="session")
+def lending_pool_configurator(aave_market):
+    return aave_market.lending_pool_configurator
+
+
+@pytest.fixture(scope="session")
+def asteth_impl(incentives_controller, lending_pool, steth, deployer):
     return deployment.deploy_asteth_impl(
         lending_pool=lending_pool,
         steth=steth,
@@ -105,20 +200,22 @@ def asteth_impl(Contract, incentives_controller, lending_pool, steth, deployer):
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def variable_debt_steth_impl(lending_pool, steth, deployer):
     return deployment.deploy_variable_debt_steth_impl(
         lending_pool=lending_pool, steth=steth, deployer=deployer
     )
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def stable_debt_steth_impl(lending_pool, steth, deployer):
     return deployment.deploy_stable_debt_steth_impl(
         lending_pool=lending_pool, steth=steth, deployer=deployer
     )
 
 
+# adding of the reserve initializes the incentives controller, so it's done per module
+# on top of the deployment snapshot to keep the controller uninitialized in the rest
 @pytest.fixture(scope="module")
 def steth_reserve(
     lending_pool,
@@ -127,6 +224,7 @@ def steth_reserve(
     stable_debt_steth_impl,
     variable_debt_steth_impl,
     incentives_controller,
+    aave_market,
     pool_admin,
     steth,
     deployer,
@@ -140,11 +238,17 @@ def steth_reserve(
         underlying_asset=steth,
         pool_admin=pool_admin,
         deployer=deployer,
+        interest_rate_strategy=aave_market.interest_rate_strategy,
     )
     incentives_controller.initialize(reserve.atoken, {"from": deployer})
     return reserve
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def asteth_mock(AStEthMock, deployer):
     return AStEthMock.deploy({"from": deployer})
+
+
+@pytest.fixture(scope="session")
+def multicall(deployer):
+    return deployment.deploy_multicall({"from": deployer})
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from brownie import Wei, chain, web3
+from utils.async_rpc import AsyncRPCClient, RPCError, rpc_client
+
+READS_COUNT = 2000
+
+
+@pytest.fixture(scope="module", params=["http", "ws"])
+def endpoint_uri(request):
+    # ganache serves WebSocket connections on the same port
+    return web3.provider.endpoint_uri.replace("http", request.param, 1)
+
+
+def test_sync_read_matches_brownie_calls(ldo, steth, accounts, agent):
+    holders = list(accounts) + [agent]
+    calls = [(ldo.balanceOf, [holder]) for holder in holders]
+    calls += [(steth.balanceOf, [holder]) for holder in holders]
+    calls.append((ldo.totalSupply, []))
+
+    assert rpc_client().read(calls) == [method(*args) for method, args in calls]
+
+
+def test_async_fan_out(endpoint_uri, ldo, agent, accounts):
+    block_number = chain.height
+    ldo.transfer(accounts[0], Wei("1 ether"), {"from": agent})
+    agent_balance_before = ldo.balanceOf(agent, block_identifier=block_number)
+
+    async def read():
+        async with AsyncRPCClient(endpoint_uri, max_batch_size=50) as client:
+            balances = await asyncio.gather(
+                *[client.call(ldo.balanceOf, agent) for _ in range(READS_COUNT)]
+            )
+            historical_balances = await client.read(
+                [(ldo.balanceOf, [agent])] * 10, block_identifier=block_number
+            )
+            return balances, historical_balances, await client.block_number()
+
+    balances, historical_balances, latest_block = asyncio.run(read())
+    assert balances == [ldo.balanceOf(agent)] * READS_COUNT
+    assert historical_balances == [agent_balance_before] * 10
+    assert latest_block == chain.height
+
+
+def test_rpc_errors_are_raised_per_request(endpoint_uri, ldo):
+    async def read():
+        async with AsyncRPCClient(endpoint_uri) as client:
+            return await asyncio.gather(
+                client.call(ldo.totalSupply),
+                client.request("eth_unknownMethod"),
+                return_exceptions=True,
+            )
+
+    total_supply, error = asyncio.run(read())
+    assert total_supply == ldo.totalSupply()
+    assert isinstance(error, RPCError)
+
+
+def test_reads_at_own_blocks(ldo, agent, accounts):
+    block_number = chain.height
+    ldo.transfer(accounts[0], Wei("1 ether"), {"from": agent})
+    calls = [
+        (ldo.balanceOf, [agent], block_number),
+        (ldo.balanceOf, [agent]),
+        (ldo.balanceOf, [accounts[0]], block_number),
+    ]
+    assert rpc_client().read(calls) == [
+        ldo.balanceOf(agent, block_identifier=block_number),
+        ldo.balanceOf(agent),
+        ldo.balanceOf(accounts[0], block_identifier=block_number),
+    ]
+    assert rpc_client().get_storage_at(ldo.address, 0, block_number) == (
+        int.from_bytes(web3.eth.get_storage_at(ldo.address, 0, block_number), "big")
+    )
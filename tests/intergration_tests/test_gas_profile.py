@@ -0,0 +1,40 @@
+import pytest
+from brownie import Wei
+from utils.constants import DEFAULT_TOTAL_REWARD
+
+
+@pytest.mark.gas_profile
+def test_handle_action_gas_attribution(
+    incentives_controller,
+    steth_reserve,
+    rewards_manager,
+    owner,
+    agent,
+    ldo,
+    depositors,
+    gas_profiler,
+):
+    rewards_manager.set_rewards_contract(incentives_controller, {"from": owner})
+    ldo.transfer(rewards_manager, DEFAULT_TOTAL_REWARD, {"from": agent})
+    rewards_manager.start_next_rewards_period({"from": owner})
+
+    [depositor1, depositor2] = depositors[:2]
+    steth_reserve.deposit(depositor1, Wei("1 ether"))
+    steth_reserve.transfer(depositor1, depositor2, Wei("0.5 ether"))
+    steth_reserve.withdraw(depositor2)
+
+    assert [profile.name for profile in gas_profiler.profiles] == [
+        "deposit",
+        "transfer",
+        "withdraw",
+    ]
+    for profile in gas_profiler.profiles:
+        summary = profile.summary()
+        assert 0 < summary["RewardsUtils"] < summary["handleAction"]
+        assert 0 < summary["handleAction SSTORE"] <= summary["SSTORE"]
+        assert summary["external calls"] > 0
+
+
+def test_gas_profiler_is_opt_in(steth_reserve, depositors, gas_profiler):
+    assert gas_profiler is None
+    steth_reserve.deposit(depositors[0], Wei("1 ether"))
@@ -0,0 +1,204 @@
+import random
+import pytest
+from brownie import Wei, chain, reverts
+from utils import deployment, merkle_rewards
+from utils.common import typed_solidity_error
+from utils.constants import DEFAULT_REWARDS_DURATION, DEFAULT_TOTAL_REWARD, ONE_DAY
+from utils.evm_script import encode_call_script
+
+ACTIONS_PER_EPOCH = 12
+RAY = 10 ** 27
+
+
+@pytest.fixture(scope="function")
+def merkle_incentives_controller(ldo, deployer):
+    return deployment.deploy_merkle_incentives_controller(
+        reward_token=ldo,
+        rewards_distributor=deployer,
+        merkle_root_updater=deployer,
+        tx_params={"from": deployer},
+    )
+
+
+@pytest.fixture(scope="function")
+def distributor(
+    AgentMock, incentives_controller, merkle_incentives_controller, ldo, agent, deployer
+):
+    """
+    Starts the reward periods of both controllers in the same transaction, so
+    they have equal emission
+    """
+    executor = AgentMock.deploy({"from": deployer})
+    incentives_controller.setRewardsDistributor(executor, {"from": deployer})
+    merkle_incentives_controller.setRewardsDistributor(executor, {"from": deployer})
+
+    def notify_reward_amount(reward):
+        ldo.transfer(executor, 2 * reward, {"from": agent})
+        calls = []
+        for controller in [incentives_controller, merkle_incentives_controller]:
+            calls.append((ldo.address, ldo.approve.encode_input(controller, reward)))
+            calls.append(
+                (
+                    controller.address,
+                    controller.notifyRewardAmount.encode_input(reward, executor),
+                )
+            )
+        executor.forward(encode_call_script(calls), {"from": deployer})
+
+    return notify_reward_amount
+
+
+def random_actions(asteth_mock, depositors, deployer, seed):
+    rnd = random.Random(seed)
+    for _ in range(ACTIONS_PER_EPOCH):
+        depositor = rnd.choice(depositors)
+        balance = asteth_mock.balances(depositor)
+        amount = Wei(f"{rnd.randint(1, 100)} ether") // 100
+        if balance == 0 or rnd.random() < 0.4:
+            asteth_mock.mint(depositor, amount, {"from": deployer})
+        elif rnd.random() < 0.5:
+            asteth_mock.burn(depositor, min(amount, balance), {"from": deployer})
+        else:
+            recipient = rnd.choice(depositors)
+            asteth_mock.transfer(
+                depositor, recipient, min(amount, balance), {"from": deployer}
+            )
+        chain.sleep(rnd.randint(1, 3 * ONE_DAY))
+
+
+@pytest.mark.parametrize("index_growth", [0, RAY // 20])
+def test_merkle_rewards_match_accrual_mode(
+    index_growth,
+    incentives_controller,
+    merkle_incentives_controller,
+    distributor,
+    asteth_mock,
+    ldo,
+    accounts,
+    deployer,
+    stranger,
+    tmp_path,
+):
+    depositors = list(accounts[2:6])
+    start_block = merkle_incentives_controller.tx.block_number
+    # the accrual controller receives handleAction() calls and serves as the reference
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    merkle_incentives_controller.initialize(asteth_mock, {"from": deployer})
+
+    claimed = {depositor: 0 for depositor in depositors}
+    for epoch in range(1, 4):
+        distributor(DEFAULT_TOTAL_REWARD)
+        # external amounts of the Transfer events diverge from the internal balances
+        asteth_mock.setIndex(RAY + epoch * index_growth, {"from": deployer})
+        random_actions(asteth_mock, depositors, deployer, seed=epoch)
+        if epoch == 3:
+            # the last epoch ends after the reward period
+            chain.sleep(DEFAULT_REWARDS_DURATION)
+        chain.mine()
+
+        block_number = chain.height
+        distribution = merkle_rewards.settle_epoch(
+            merkle_incentives_controller,
+            asteth_mock,
+            tmp_path,
+            block_number,
+            start_block=start_block,
+        )
+        for depositor in depositors:
+            expected = incentives_controller.earned(
+                depositor, block_identifier=block_number
+            )
+            position = distribution.position(depositor)
+            actual = 0 if position is None else distribution.leaf(position)[1]
+            assert actual == expected
+
+        merkle_incentives_controller.setMerkleRoot(
+            distribution.root,
+            distribution.meta["timestamp"],
+            {"from": deployer},
+        )
+        assert merkle_incentives_controller.epoch() == epoch
+        for depositor, cumulative_reward, proof in distribution.iter_claims():
+            balance_before = ldo.balanceOf(depositor)
+            merkle_incentives_controller.claim(
+                depositor, cumulative_reward, proof, {"from": stranger}
+            )
+            assert ldo.balanceOf(depositor) - balance_before == (
+                cumulative_reward - claimed[depositor]
+            )
+            claimed[depositor] = cumulative_reward
+            assert merkle_incentives_controller.claimed(depositor) == cumulative_reward
+
+    # everything but the division remainder is claimed in the last epoch
+    total_claimed = sum(claimed.values())
+    assert total_claimed <= 3 * DEFAULT_TOTAL_REWARD
+    assert ldo.balanceOf(merkle_incentives_controller) == (
+        3 * DEFAULT_TOTAL_REWARD - total_claimed
+    )
+
+
+def test_merkle_claim_checks_proof(
+    merkle_incentives_controller, asteth_mock, ldo, agent, accounts, deployer, tmp_path
+):
+    [depositor1, depositor2, depositor3] = accounts[2:5]
+    ldo.transfer(merkle_incentives_controller, Wei("3 ether"), {"from": agent})
+    rewards = sorted(
+        [(depositor1.address, Wei("1 ether")), (depositor2.address, Wei("2 ether"))],
+        key=lambda reward: int(reward[0], 16),
+    )
+    distribution = merkle_rewards.write_distribution(tmp_path / "epoch", rewards)
+
+    with reverts(typed_solidity_error("NotMerkleRootUpdaterError()")):
+        merkle_incentives_controller.setMerkleRoot(
+            distribution.root, 0, {"from": depositor1}
+        )
+    merkle_incentives_controller.setMerkleRoot(distribution.root, 0, {"from": deployer})
+
+    _, reward, proof = distribution.claim(depositor1.address)
+    with reverts(typed_solidity_error("InvalidProofError()")):
+        merkle_incentives_controller.claim(
+            depositor1, reward + 1, proof, {"from": depositor1}
+        )
+    with reverts(typed_solidity_error("InvalidProofError()")):
+        merkle_incentives_controller.claim(
+            depositor3, reward, proof, {"from": depositor3}
+        )
+
+    merkle_incentives_controller.claim(depositor1, reward, proof, {"from": depositor1})
+    assert ldo.balanceOf(depositor1) == reward
+    # repeated claim pays nothing
+    tx = merkle_incentives_controller.claim(
+        depositor1, reward, proof, {"from": depositor1}
+    )
+    assert "RewardClaimed" not in tx.events
+    assert ldo.balanceOf(depositor1) == reward
+
+
+def test_merkle_handle_action_is_cheaper(
+    AStEthMock,
+    incentives_controller,
+    merkle_incentives_controller,
+    distributor,
+    asteth_mock,
+    accounts,
+    deployer,
+):
+    merkle_asteth_mock = AStEthMock.deploy({"from": deployer})
+    for controller, token in [
+        (incentives_controller, asteth_mock),
+        (merkle_incentives_controller, merkle_asteth_mock),
+    ]:
+        token.setIncentivesController(controller, {"from": deployer})
+        controller.initialize(token, {"from": deployer})
+        token.mint(accounts[2], Wei("1 ether"), {"from": deployer})
+    distributor(DEFAULT_TOTAL_REWARD)
+    chain.sleep(ONE_DAY)
+
+    accrual_tx = asteth_mock.transfer(
+        accounts[2], accounts[3], Wei("0.5 ether"), {"from": deployer}
+    )
+    merkle_tx = merkle_asteth_mock.transfer(
+        accounts[2], accounts[3], Wei("0.5 ether"), {"from": deployer}
+    )
+    assert merkle_tx.gas_used < accrual_tx.gas_used
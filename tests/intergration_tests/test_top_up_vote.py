@@ -0,0 +1,50 @@
+from brownie import chain
+from utils import lido, top_up_planner
+from utils.constants import ONE_DAY, ONE_WEEK, DEFAULT_TOTAL_REWARD
+
+# time passed from the creation of the vote till its execution
+VOTE_EXECUTION_DELAY = 3 * ONE_DAY
+
+
+def test_planned_top_up_via_vote(
+    incentives_controller,
+    asteth_mock,
+    rewards_manager,
+    ldo,
+    agent,
+    owner,
+    deployer,
+):
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    incentives_controller.transferOwnership(agent, {"from": deployer})
+    rewards_manager.set_rewards_contract(incentives_controller, {"from": owner})
+    rewards_manager.transfer_ownership(agent, {"from": owner})
+
+    # the first period starts when the vote is executed, so the leftover is zero
+    # and the amount doesn't depend on the exact execution time
+    state, rewards_duration = top_up_planner.read_rewards_state(incentives_controller)
+    execution_time = chain.time() + VOTE_EXECUTION_DELAY
+    plan = top_up_planner.plan_top_ups(
+        state,
+        rewards_duration,
+        DEFAULT_TOTAL_REWARD,
+        [[execution_time, execution_time + rewards_duration + ONE_DAY]],
+    )
+    assert plan.dust == 0
+
+    # the first period is shortened by a week
+    period_finish = execution_time + rewards_duration - ONE_WEEK
+    evm_script = top_up_planner.top_up_evm_script(
+        plan.top_ups[0], ldo, incentives_controller, rewards_manager, period_finish
+    )
+    agent_balance_before = ldo.balanceOf(agent)
+    vote_id, _ = lido.create_voting(
+        evm_script, "Top up the astETH rewards", {"from": agent}
+    )
+    lido.execute_voting(vote_id)
+
+    assert ldo.balanceOf(agent) == agent_balance_before - plan.top_ups[0].amount
+    assert ldo.balanceOf(incentives_controller) == plan.top_ups[0].amount
+    assert incentives_controller.rewardPerSecond() == plan.rewards_per_second[0]
+    assert incentives_controller.periodFinish() == period_finish
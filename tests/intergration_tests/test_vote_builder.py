@@ -0,0 +1,85 @@
+from brownie import chain
+from utils import deployment, lido
+from utils.constants import ONE_DAY, ONE_WEEK
+from utils.vote_builder import VoteBuilder
+
+CONTROLLERS_COUNT = 4
+RECOVERED_AMOUNT = 10 ** 18
+# small enough to split the actions of all controllers across several votes
+GAS_LIMIT = 500_000
+
+
+def test_vote_builder_splits_actions_across_votes(
+    incentives_controller,
+    asteth_mock,
+    rewards_manager,
+    ldo,
+    agent,
+    deployer,
+    stranger,
+):
+    controllers = [incentives_controller] + [
+        deployment.deploy_incentives_controller(
+            reward_token=ldo,
+            rewards_distributor=rewards_manager,
+            tx_params={"from": deployer},
+        )
+        for _ in range(CONTROLLERS_COUNT - 1)
+    ]
+    for controller in controllers:
+        controller.initialize(asteth_mock, {"from": deployer})
+        controller.transferOwnership(agent, {"from": deployer})
+        ldo.transfer(controller, RECOVERED_AMOUNT, {"from": agent})
+
+    period_finish = chain.time() + 10 * ONE_WEEK
+    builder = VoteBuilder("Update the astETH rewards parameters", GAS_LIMIT)
+    for controller in controllers:
+        builder.set_rewards_duration(controller, ONE_WEEK)
+        builder.set_rewards_distributor(controller, stranger)
+        builder.update_period_finish(controller, period_finish)
+        builder.recover_erc20(controller, ldo, RECOVERED_AMOUNT)
+
+    # the dry run doesn't change the state of the chain
+    block_number = chain.height
+    votes = builder.build({"from": agent})
+    assert chain.height == block_number
+    assert controllers[0].rewardsDuration() != ONE_WEEK
+
+    assert len(votes) > 1
+    assert [action for vote in votes for action in vote.actions] == builder.actions
+    assert all(vote.gas_used <= GAS_LIMIT for vote in votes)
+    assert votes[-1].description.endswith(f"({len(votes)}/{len(votes)})")
+
+    agent_balance_before = ldo.balanceOf(agent)
+    vote_ids = builder.create_votes({"from": agent})
+    assert len(vote_ids) == len(votes)
+    for vote_id, vote in zip(vote_ids, votes):
+        assert lido.voting().getVote(vote_id)["script"] == vote.evm_script
+    # all votes are open only till the voting time passes since their creation
+    for tx in lido.execute_votings(vote_ids):
+        # the votes are executed later than in the dry run, so the gas is close
+        assert tx.gas_used <= GAS_LIMIT
+
+    assert ldo.balanceOf(agent) == agent_balance_before + CONTROLLERS_COUNT * (
+        RECOVERED_AMOUNT
+    )
+    for controller in controllers:
+        assert controller.rewardsDuration() == ONE_WEEK
+        assert controller.rewardsDistributor() == stranger
+        assert controller.periodFinish() == period_finish
+        assert ldo.balanceOf(controller) == 0
+
+
+def test_vote_builder_single_vote(incentives_controller, asteth_mock, agent, deployer):
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    incentives_controller.transferOwnership(agent, {"from": deployer})
+
+    builder = VoteBuilder("Update the astETH rewards duration")
+    builder.set_rewards_duration(incentives_controller, 2 * ONE_WEEK)
+    builder.update_period_finish(incentives_controller, chain.time() + ONE_DAY * 10)
+    [vote] = builder.build({"from": agent})
+    assert vote.description == "Update the astETH rewards duration"
+
+    [vote_id] = builder.create_votes({"from": agent})
+    lido.execute_voting(vote_id)
+    assert incentives_controller.rewardsDuration() == 2 * ONE_WEEK
@@ -0,0 +1,70 @@
+import re
+import sys
+import subprocess
+from pathlib import Path
+import pytest
+from utils import config
+
+PROJECT_PATH = Path(__file__).parent.parent.parent
+
+SCRIPTS = [
+    "scripts.deploy",
+    "scripts.deploy_incentives_controller",
+    "scripts.deploy_rewards_manager",
+    "scripts.initialize_staking_token",
+]
+# modules which aren't needed until the operator confirms the deployment
+LAZY_MODULES = [
+    "utils.local_backend",
+    "utils.multicall",
+    "utils.indexer",
+    "utils.async_rpc",
+]
+
+# brownie is imported by `brownie run` before the script, so only the time spent
+# on the imports of the script itself is limited
+IMPORT_TIME_BUDGET_US = 100_000
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def profile_imports(module_name):
+    """
+    Returns cumulative import time in microseconds of the modules imported by
+    the given module and not imported by brownie before
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import brownie; import {module_name}",
+        ],
+        cwd=PROJECT_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        # nested imports are reported before the module which imports them
+        if match.group(3) == "" and match.group(4) == "brownie":
+            import_times = {}
+        else:
+            import_times[match.group(4)] = int(match.group(2))
+    return import_times
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_script_import_time(script):
+    import_times = profile_imports(script)
+    budget = int(config.get_env("IMPORT_TIME_BUDGET_US", str(IMPORT_TIME_BUDGET_US)))
+    assert import_times[script] <= budget
+    imported_lazy_modules = [
+        module_name for module_name in LAZY_MODULES if module_name in import_times
+    ]
+    assert imported_lazy_modules == []
@@ -0,0 +1,87 @@
+import pytest
+from brownie import Wei, chain
+from utils.constants import DEFAULT_REWARDS_DURATION, DEFAULT_TOTAL_REWARD, ONE_WEEK
+
+
+@pytest.fixture(scope="function")
+def rewards_history(
+    incentives_controller,
+    asteth_mock,
+    rewards_manager,
+    depositors,
+    ldo,
+    agent,
+    deployer,
+):
+    """
+    Makes the actions of the depositors over two reward periods, including the
+    batched claim. Returns the start block of the history and blocks after its steps
+    """
+    # RewardsDurationUpdated is emitted on deployment of the incentives controller
+    start_block = incentives_controller.tx.block_number
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    incentives_controller.setClaimOperator(deployer, True, {"from": deployer})
+    ldo.approve(incentives_controller, 2 * DEFAULT_TOTAL_REWARD, {"from": agent})
+
+    [depositor1, depositor2, depositor3] = depositors
+    # steps are pairs of the action and the time passed after it
+    steps = [
+        (
+            lambda: incentives_controller.notifyRewardAmount(
+                DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+            ),
+            0,
+        ),
+        (
+            lambda: asteth_mock.mint(depositor1, Wei("1 ether"), {"from": deployer}),
+            ONE_WEEK,
+        ),
+        (
+            lambda: asteth_mock.mint(depositor2, Wei("0.5 ether"), {"from": deployer}),
+            ONE_WEEK,
+        ),
+        (
+            lambda: asteth_mock.transfer(
+                depositor1, depositor3, Wei("0.25 ether"), {"from": deployer}
+            ),
+            ONE_WEEK // 3,
+        ),
+        (lambda: incentives_controller.claimReward({"from": depositor2}), ONE_WEEK),
+        # top up the rewards before the end of the current period
+        (
+            lambda: incentives_controller.notifyRewardAmount(
+                DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+            ),
+            0,
+        ),
+        (
+            lambda: asteth_mock.burn(depositor2, Wei("0.2 ether"), {"from": deployer}),
+            0,
+        ),
+        (
+            lambda: asteth_mock.mint(depositor3, Wei("2 ether"), {"from": deployer}),
+            DEFAULT_REWARDS_DURATION // 2,
+        ),
+        (
+            lambda: asteth_mock.transfer(
+                depositor3, depositor2, Wei("1 ether"), {"from": deployer}
+            ),
+            0,
+        ),
+        (lambda: incentives_controller.claimReward({"from": depositor1}), ONE_WEEK),
+        (
+            lambda: incentives_controller.claimRewardsFor(
+                [depositor2, depositor3], {"from": deployer}
+            ),
+            DEFAULT_REWARDS_DURATION,
+        ),
+    ]
+    blocks = []
+    for step, duration in steps:
+        step()
+        blocks.append(chain.height)
+        chain.sleep(duration)
+    chain.mine()
+    blocks.append(chain.height)
+    return start_block, blocks
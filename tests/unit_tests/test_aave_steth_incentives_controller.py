@@ -274,3 +274,96 @@ def test_handle_action(
         depositor1, Wei("1 ether"), Wei("1 ether"), {"from": depositor1}
     )
     assert "RewardsAccrued" not in tx.events
+
+
+def test_set_claim_operator(incentives_controller, deployer, stranger):
+    # must revert when called by stranger
+    with reverts("Ownable: caller is not the owner"):
+        incentives_controller.setClaimOperator(stranger, True, {"from": stranger})
+
+    tx = incentives_controller.setClaimOperator(stranger, True, {"from": deployer})
+    assert incentives_controller.isClaimOperator(stranger)
+    assert tx.events["ClaimOperatorChanged"]["operator"] == stranger
+    assert tx.events["ClaimOperatorChanged"]["isAuthorized"]
+
+    # must not emit event when the value isn't changed
+    tx = incentives_controller.setClaimOperator(stranger, True, {"from": deployer})
+    assert "ClaimOperatorChanged" not in tx.events
+
+    tx = incentives_controller.setClaimOperator(stranger, False, {"from": deployer})
+    assert not incentives_controller.isClaimOperator(stranger)
+    assert not tx.events["ClaimOperatorChanged"]["isAuthorized"]
+
+
+def test_set_claim_for_allowed(incentives_controller, stranger):
+    tx = incentives_controller.setClaimForAllowed(True, {"from": stranger})
+    assert incentives_controller.isClaimForAllowed(stranger)
+    assert tx.events["ClaimForAllowanceChanged"]["depositor"] == stranger
+    assert tx.events["ClaimForAllowanceChanged"]["isAllowed"]
+
+    # must not emit event when the value isn't changed
+    tx = incentives_controller.setClaimForAllowed(True, {"from": stranger})
+    assert "ClaimForAllowanceChanged" not in tx.events
+
+    tx = incentives_controller.setClaimForAllowed(False, {"from": stranger})
+    assert not incentives_controller.isClaimForAllowed(stranger)
+
+
+@pytest.mark.usefixtures(
+    "initialize_incentives_controller", "set_incentives_controller"
+)
+def test_claim_rewards_for(
+    incentives_controller,
+    asteth_mock,
+    rewards_manager,
+    depositors,
+    ldo,
+    agent,
+    deployer,
+    stranger,
+):
+    ldo.approve(incentives_controller, DEFAULT_TOTAL_REWARD, {"from": agent})
+    incentives_controller.notifyRewardAmount(
+        DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+    )
+    for depositor in depositors:
+        asteth_mock.mint(depositor, Wei("1 ether"), {"from": deployer})
+    chain.sleep(DEFAULT_REWARDS_DURATION // 2)
+    chain.mine()
+
+    # must revert when the depositor didn't allow to claim for him
+    incentives_controller.setClaimForAllowed(True, {"from": depositors[0]})
+    with reverts(
+        common.typed_solidity_error("ClaimForNotAllowedError(address)")
+        + "000000000000000000000000"
+        + depositors[1].address[2:].lower()
+    ):
+        incentives_controller.claimRewardsFor(depositors, {"from": stranger})
+
+    # claim operator might claim for any depositor
+    incentives_controller.setClaimOperator(stranger, True, {"from": deployer})
+    balances_before = [ldo.balanceOf(depositor) for depositor in depositors]
+    earned = [incentives_controller.earned(depositor) for depositor in depositors]
+    tx = incentives_controller.claimRewardsFor(depositors, {"from": stranger})
+
+    # all depositors have the same stake, so they earned the same amount of tokens
+    paid = [
+        ldo.balanceOf(depositor) - balance_before
+        for depositor, balance_before in zip(depositors, balances_before)
+    ]
+    assert paid[0] == paid[1] == paid[2]
+    for depositor_paid, depositor_earned in zip(paid, earned):
+        assert is_almost_equal(
+            depositor_paid, depositor_earned, incentives_controller.rewardPerSecond()
+        )
+    for depositor in depositors:
+        assert is_almost_equal(
+            incentives_controller.earned(depositor),
+            0,
+            incentives_controller.rewardPerSecond(),
+        )
+
+    assert "RewardPaid" not in tx.events
+    assert tx.events["RewardsPaid"]["caller"] == stranger
+    assert tx.events["RewardsPaid"]["depositorsCount"] == len(depositors)
+    assert tx.events["RewardsPaid"]["totalReward"] == sum(paid)
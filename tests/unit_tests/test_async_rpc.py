@@ -0,0 +1,55 @@
+import asyncio
+import json
+import pytest
+from utils.async_rpc import RPCError, WebsocketConnection
+
+
+class FakeWebsocket:
+    def __init__(self, messages):
+        self.messages = messages
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        # lets the requests get pending before the response arrives
+        await asyncio.sleep(0)
+        if not self.messages:
+            await asyncio.Event().wait()
+        return json.dumps(self.messages.pop(0))
+
+
+def test_batch_error_fails_pending_requests():
+    error = {"code": -32600, "message": "Invalid request"}
+
+    async def send():
+        connection = WebsocketConnection(
+            FakeWebsocket([{"jsonrpc": "2.0", "id": None, "error": error}])
+        )
+        future = asyncio.get_running_loop().create_future()
+        connection.pending.update({1: future, 2: future})
+        try:
+            return await asyncio.wait_for(future, 1)
+        finally:
+            connection.reader.cancel()
+
+    with pytest.raises(RPCError) as error_info:
+        asyncio.run(send())
+    assert error_info.value.error == error
+
+
+def test_batch_response_releases_its_ids():
+    async def send():
+        connection = WebsocketConnection(
+            FakeWebsocket([[{"jsonrpc": "2.0", "id": 1, "result": "0x1"}]])
+        )
+        future = asyncio.get_running_loop().create_future()
+        connection.pending.update({1: future, 2: future})
+        try:
+            return await asyncio.wait_for(future, 1), connection.pending
+        finally:
+            connection.reader.cancel()
+
+    responses, pending = asyncio.run(send())
+    assert responses == [{"jsonrpc": "2.0", "id": 1, "result": "0x1"}]
+    assert pending == {}
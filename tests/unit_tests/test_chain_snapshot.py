@@ -0,0 +1,29 @@
+from brownie import chain, history
+from utils.deployment import ChainSnapshot
+
+
+def test_chain_snapshot_reverts_repeatedly(ldo, agent, stranger):
+    balance = ldo.balanceOf(stranger)
+    timestamp = chain.time()
+    snapshot = ChainSnapshot()
+    for _ in range(2):
+        tx = ldo.transfer(stranger, 1, {"from": agent})
+        chain.sleep(1000)
+        snapshot.revert()
+        assert ldo.balanceOf(stranger) == balance
+        # history and time offset of brownie are synced with the reverted chain
+        assert tx not in history
+        assert chain.time() < timestamp + 1000
+
+
+def test_chain_snapshot_keeps_isolation_snapshot(ldo, agent, stranger):
+    # chain.snapshot() is taken by the isolation fixture before the test
+    balance = ldo.balanceOf(stranger)
+    ldo.transfer(stranger, 1, {"from": agent})
+    snapshot = ChainSnapshot()
+    ldo.transfer(stranger, 1, {"from": agent})
+    snapshot.revert()
+    assert ldo.balanceOf(stranger) == balance + 1
+
+    chain.revert()
+    assert ldo.balanceOf(stranger) == balance
@@ -0,0 +1,166 @@
+import threading
+import urllib.request
+import pytest
+from brownie import Wei, chain
+from utils.constants import DEFAULT_REWARDS_DURATION, DEFAULT_TOTAL_REWARD, ONE_WEEK
+from utils import deployment
+from utils.monitor import (
+    MERKLE_CONTROLLER_STORAGE_LAYOUT,
+    ControllerMonitor,
+    serve_metrics,
+)
+
+
+@pytest.fixture(scope="function")
+def alerts():
+    return []
+
+
+@pytest.fixture(scope="function")
+def controller_monitor(incentives_controller, asteth_mock, ldo, deployer, alerts):
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    return ControllerMonitor(
+        incentives_controller,
+        ldo,
+        period_ending_threshold=ONE_WEEK,
+        on_alert=lambda name, message: alerts.append(name),
+    )
+
+
+def assert_state_matches(controller_monitor, incentives_controller, ldo):
+    assert controller_monitor.last_block == chain.height
+    assert controller_monitor.period_finish == incentives_controller.periodFinish()
+    assert controller_monitor.reward_per_second == (
+        incentives_controller.rewardPerSecond()
+    )
+    assert controller_monitor.rewards_distributor == (
+        incentives_controller.rewardsDistributor()
+    )
+    assert controller_monitor.balance == ldo.balanceOf(incentives_controller)
+
+
+def test_monitor_rewards_period_cycle(
+    controller_monitor,
+    incentives_controller,
+    asteth_mock,
+    ldo,
+    agent,
+    rewards_manager,
+    depositors,
+    deployer,
+    stranger,
+    alerts,
+):
+    assert controller_monitor.poll()
+    assert_state_matches(controller_monitor, incentives_controller, ldo)
+    assert not any(controller_monitor.alerts.values())
+    # nothing is read until the new block is mined
+    assert not controller_monitor.poll()
+
+    ldo.approve(incentives_controller, DEFAULT_TOTAL_REWARD, {"from": agent})
+    incentives_controller.notifyRewardAmount(
+        DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+    )
+    asteth_mock.mint(depositors[0], Wei("1 ether"), {"from": deployer})
+    assert controller_monitor.poll()
+    assert_state_matches(controller_monitor, incentives_controller, ldo)
+    assert controller_monitor.reward_left <= controller_monitor.balance
+    assert alerts == []
+
+    # the period is close to the end
+    chain.sleep(DEFAULT_REWARDS_DURATION - ONE_WEEK // 2)
+    chain.mine()
+    controller_monitor.poll()
+    assert alerts == ["period_ending"]
+
+    # updatePeriodFinish() doesn't emit events, the new end date is read from storage
+    period_finish = chain.time() + 2 * DEFAULT_REWARDS_DURATION
+    incentives_controller.updatePeriodFinish(period_finish, {"from": deployer})
+    controller_monitor.poll()
+    assert_state_matches(controller_monitor, incentives_controller, ldo)
+    assert controller_monitor.period_finish == period_finish
+    assert not controller_monitor.alerts["period_ending"]
+    assert controller_monitor.alerts["insufficient_balance"]
+    assert alerts == ["period_ending", "insufficient_balance"]
+
+    # the top up covers the prolonged period
+    ldo.transfer(incentives_controller, 2 * DEFAULT_TOTAL_REWARD, {"from": agent})
+    controller_monitor.poll()
+    assert_state_matches(controller_monitor, incentives_controller, ldo)
+    assert not controller_monitor.alerts["insufficient_balance"]
+
+    incentives_controller.setRewardsDistributor(stranger, {"from": deployer})
+    incentives_controller.recoverERC20(ldo, Wei("1 ether"), {"from": deployer})
+    controller_monitor.poll()
+    assert_state_matches(controller_monitor, incentives_controller, ldo)
+    assert alerts == [
+        "period_ending",
+        "insufficient_balance",
+        "rewards_distributor_changed",
+        "unexpected_recovery",
+    ]
+    assert controller_monitor.rewards_distributor_changes == 1
+    assert controller_monitor.unexpected_recovered == 1
+
+
+def test_monitor_serves_metrics(controller_monitor, incentives_controller):
+    controller_monitor.poll()
+    server = serve_metrics(controller_monitor, port=0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            metrics = response.read().decode()
+    finally:
+        server.shutdown()
+    labels = f'controller="{incentives_controller.address}"'
+    assert f"incentives_controller_block_number{{{labels}}} {chain.height}" in metrics
+    assert f'incentives_controller_alert{{{labels},alert="period_ending"}} 0' in metrics
+
+
+def test_monitor_merkle_controller(ldo, agent, deployer, alerts):
+    merkle_incentives_controller = deployment.deploy_merkle_incentives_controller(
+        reward_token=ldo,
+        rewards_distributor=deployer,
+        merkle_root_updater=deployer,
+        tx_params={"from": deployer},
+    )
+    controller_monitor = ControllerMonitor(
+        merkle_incentives_controller,
+        ldo,
+        storage_layout=MERKLE_CONTROLLER_STORAGE_LAYOUT,
+        # the expected address is compared in the checksum form
+        expected_rewards_distributor=deployer.address.lower(),
+        period_ending_threshold=ONE_WEEK,
+        on_alert=lambda name, message: alerts.append(name),
+    )
+    ldo.transfer(deployer, DEFAULT_TOTAL_REWARD, {"from": agent})
+    ldo.approve(merkle_incentives_controller, DEFAULT_TOTAL_REWARD, {"from": deployer})
+    merkle_incentives_controller.notifyRewardAmount(
+        DEFAULT_TOTAL_REWARD, deployer, {"from": deployer}
+    )
+
+    assert controller_monitor.poll()
+    assert_state_matches(controller_monitor, merkle_incentives_controller, ldo)
+    assert controller_monitor.period_finish > chain.time()
+    assert controller_monitor.reward_per_second > 0
+    assert alerts == []
+
+
+def test_monitor_run_survives_poll_errors(controller_monitor, monkeypatch):
+    stop_event = threading.Event()
+    polls = []
+
+    def poll():
+        polls.append(len(polls))
+        if len(polls) == 1:
+            raise ConnectionError("node is unavailable")
+        stop_event.set()
+        return ControllerMonitor.poll(controller_monitor)
+
+    monkeypatch.setattr(controller_monitor, "poll", poll)
+    controller_monitor.run(poll_interval=0, stop_event=stop_event)
+    assert len(polls) == 2
+    assert controller_monitor.last_block == chain.height
+    assert controller_monitor.metrics["poll_errors_total"] == 1
+    assert controller_monitor.metrics["last_success_timestamp_seconds"] > 0
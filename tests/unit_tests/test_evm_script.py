@@ -0,0 +1,79 @@
+import random
+import pytest
+from brownie import web3
+from eth_utils import to_checksum_address
+from utils.evm_script import (
+    create_executor_id,
+    decode_call_script,
+    encode_call_script,
+    encode_call_script_bytes,
+    strip_byte_prefix,
+)
+
+ACTIONS_COUNT = 1000
+
+
+def legacy_encode_call_script(actions, spec_id=1):
+    import eth_abi
+
+    result = create_executor_id(spec_id)
+    for to, calldata in actions:
+        addr_bytes = web3.toBytes(hexstr=to).hex()
+        calldata_bytes = strip_byte_prefix(calldata)
+        length = eth_abi.encode_single("int256", len(calldata_bytes) // 2).hex()
+        result += addr_bytes + length[56:] + calldata_bytes
+    return result
+
+
+def random_actions(count, seed=42):
+    rnd = random.Random(seed)
+    return [
+        (
+            to_checksum_address(rnd.randbytes(20)),
+            "0x" + rnd.randbytes(rnd.choice([0, 4, 36, 68, 1000])).hex(),
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("spec_id", [1, 2, 10])
+def test_encode_call_script_matches_legacy_encoder(spec_id):
+    actions = random_actions(ACTIONS_COUNT)
+    script = encode_call_script(actions, spec_id)
+    assert script == legacy_encode_call_script(actions, spec_id)
+    assert script == "0x" + encode_call_script_bytes(actions, spec_id).hex()
+    assert encode_call_script([], spec_id) == legacy_encode_call_script([], spec_id)
+
+
+def test_encode_call_script_accepts_bytes_calldata():
+    actions = random_actions(10)
+    assert encode_call_script(
+        [(to, bytes.fromhex(calldata[2:])) for to, calldata in actions]
+    ) == encode_call_script(actions)
+    # calldata without 0x prefix
+    assert encode_call_script(
+        [(to, calldata[2:]) for to, calldata in actions]
+    ) == encode_call_script(actions)
+
+
+def test_decode_call_script_roundtrip():
+    actions = random_actions(ACTIONS_COUNT)
+    script = encode_call_script(actions, spec_id=1)
+    assert decode_call_script(script) == (1, actions)
+    assert decode_call_script(bytes.fromhex(script[2:])) == (1, actions)
+    assert decode_call_script(encode_call_script([])) == (1, [])
+
+
+def test_decode_call_script_rejects_truncated_script():
+    script = encode_call_script_bytes(random_actions(3))
+    with pytest.raises(ValueError):
+        decode_call_script(script[:2])
+    with pytest.raises(ValueError):
+        decode_call_script(script[:10])
+    with pytest.raises(ValueError):
+        decode_call_script(script[:-1])
+
+
+def test_encode_call_script_rejects_invalid_address():
+    with pytest.raises(ValueError):
+        encode_call_script([("0x1234", "0x")])
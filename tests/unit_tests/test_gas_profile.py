@@ -0,0 +1,75 @@
+from utils.gas_profile import GasProfile, GasProfiler, fold_trace, read_folded
+
+TOKEN_TRANSFER = "AStETH.transfer"
+HANDLE_ACTION = "AaveAStETHIncentivesController.handleAction"
+UPDATE_DEPOSITOR_REWARD = "RewardsUtils.updateDepositorReward"
+
+
+def step(op, gas, gas_cost, depth, jump_depth, fn):
+    return {
+        "op": op,
+        "gas": gas,
+        "gasCost": gas_cost,
+        "depth": depth,
+        "jumpDepth": jump_depth,
+        "fn": fn,
+    }
+
+
+# AStETH.transfer calls handleAction of the controller, which updates the reward
+# of the depositor in the internal function of the RewardsUtils library
+TRACE = [
+    step("PUSH1", 100_000, 3, 0, 0, TOKEN_TRANSFER),
+    step("CALL", 99_997, 97_000, 0, 0, TOKEN_TRANSFER),
+    step("PUSH1", 95_000, 3, 1, 0, HANDLE_ACTION),
+    step("JUMP", 94_997, 8, 1, 0, HANDLE_ACTION),
+    step("SLOAD", 94_989, 2_100, 1, 1, UPDATE_DEPOSITOR_REWARD),
+    step("SSTORE", 92_889, 20_000, 1, 1, UPDATE_DEPOSITOR_REWARD),
+    step("JUMP", 72_889, 8, 1, 1, UPDATE_DEPOSITOR_REWARD),
+    step("STOP", 72_881, 0, 1, 0, HANDLE_ACTION),
+    step("SSTORE", 72_500, 5_000, 0, 0, TOKEN_TRANSFER),
+    # call of the precompile has no steps of the callee
+    step("STATICCALL", 67_500, 3_000, 0, 0, TOKEN_TRANSFER),
+    step("STOP", 64_400, 0, 0, 0, TOKEN_TRANSFER),
+]
+
+
+def test_fold_trace():
+    folded = fold_trace(TRACE)
+    assert folded == {
+        TOKEN_TRANSFER: 3,
+        f"{TOKEN_TRANSFER};SSTORE": 5_000,
+        f"{TOKEN_TRANSFER};STATICCALL": 3_100,
+        # gas of the call minus the gas used by the callee
+        f"{TOKEN_TRANSFER};CALL": 99_997 - 72_500 - (3 + 8 + 2_100 + 20_000 + 8),
+        f"{TOKEN_TRANSFER};{HANDLE_ACTION}": 3 + 8,
+        f"{TOKEN_TRANSFER};{HANDLE_ACTION};{UPDATE_DEPOSITOR_REWARD}": 2_100 + 8,
+        f"{TOKEN_TRANSFER};{HANDLE_ACTION};{UPDATE_DEPOSITOR_REWARD};SSTORE": 20_000,
+    }
+    # the whole traced gas is attributed
+    assert sum(folded.values()) == TRACE[0]["gas"] - TRACE[-1]["gas"]
+
+
+def test_gas_profile_summary():
+    profile = GasProfile("transfer", 60_000, fold_trace(TRACE))
+    summary = profile.summary()
+    assert summary["gas_used"] == 60_000
+    assert summary["untraced"] == 60_000 - profile.traced_gas
+    assert summary["handleAction"] == 3 + 8 + 2_100 + 8 + 20_000
+    assert summary["RewardsUtils"] == 2_100 + 8 + 20_000
+    assert summary["SSTORE"] == 25_000
+    assert summary["handleAction SSTORE"] == 20_000
+    assert summary["external calls"] == profile.leaf_gas({"CALL", "STATICCALL"})
+    assert profile.gas_of(UPDATE_DEPOSITOR_REWARD) == summary["RewardsUtils"]
+
+
+def test_write_folded(tmp_path):
+    profiler = GasProfiler()
+    profiler.profiles.append(GasProfile("transfer", 0, fold_trace(TRACE)))
+    profiler.profiles.append(GasProfile("transfer", 0, fold_trace(TRACE)))
+    profiler.write_folded(tmp_path / "profiles" / "test.folded")
+
+    folded = read_folded(tmp_path / "profiles" / "test.folded")
+    assert folded == {
+        f"transfer;{stack}": 2 * gas for stack, gas in fold_trace(TRACE).items()
+    }
@@ -0,0 +1,193 @@
+import pytest
+import eth_abi
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+from utils import log_fetcher
+from utils.log_fetcher import EventDecoder, LogCache, LogFetcher
+
+ADDRESS = to_checksum_address("0x" + "11" * 20)
+DEPOSITOR = to_checksum_address("0x" + "22" * 20)
+
+TRANSFER_ABI = {
+    "type": "event",
+    "name": "Transfer",
+    "anonymous": False,
+    "inputs": [
+        {"name": "from", "type": "address", "indexed": True},
+        {"name": "to", "type": "address", "indexed": True},
+        {"name": "value", "type": "uint256", "indexed": False},
+    ],
+}
+REWARDS_PAID_ABI = {
+    "type": "event",
+    "name": "RewardsPaid",
+    "anonymous": False,
+    "inputs": [
+        {"name": "depositors", "type": "address[]", "indexed": False},
+        {"name": "totalReward", "type": "uint256", "indexed": False},
+    ],
+}
+
+
+class NodeMock:
+    """Serves logs in one per block and rejects requests with too many results"""
+
+    def __init__(self, blocks_with_logs, max_results, block_number=10_000):
+        self.blocks_with_logs = blocks_with_logs
+        self.block_number = block_number
+        self.max_results = max_results
+        self.requests = []
+
+    def get_logs(self, log_filter):
+        self.requests.append((log_filter["fromBlock"], log_filter["toBlock"]))
+        logs = [
+            make_log(block_number)
+            for block_number in self.blocks_with_logs
+            if log_filter["fromBlock"] <= block_number <= log_filter["toBlock"]
+        ]
+        if len(logs) > self.max_results:
+            raise ValueError(
+                {
+                    "code": -32005,
+                    "message": f"query returned more than {self.max_results} results",
+                }
+            )
+        return logs
+
+
+def make_log(block_number):
+    return {
+        "address": ADDRESS.lower(),
+        "topics": [event_abi_to_log_topic(TRANSFER_ABI)],
+        "data": "0x" + eth_abi.encode_single("uint256", block_number).hex(),
+        "blockNumber": block_number,
+        "blockHash": bytes(32),
+        "transactionHash": block_number.to_bytes(32, "big"),
+        "transactionIndex": 0,
+        "logIndex": 0,
+    }
+
+
+@pytest.fixture
+def node(monkeypatch):
+    node = NodeMock(blocks_with_logs=range(100, 200), max_results=10)
+    monkeypatch.setattr(log_fetcher, "web3", type("Web3Mock", (), {"eth": node}))
+    return node
+
+
+def test_block_range_adapts_to_response_size(node):
+    fetcher = LogFetcher(block_range=64, max_block_range=256, sparse_response_size=5)
+    logs = fetcher.get_logs(ADDRESS, 0, 999)
+    assert [log["blockNumber"] for log in logs] == list(range(100, 200))
+    # range shrinks in the dense part and grows back after it
+    assert max(to - start + 1 for start, to in node.requests if start >= 200) > 64
+    assert all(
+        to - start + 1 <= 16 for start, to in node.requests if 110 <= start < 190
+    )
+
+
+def test_not_splittable_error_is_raised(node):
+    node.max_results = 0
+    with pytest.raises(ValueError):
+        LogFetcher(block_range=8).get_logs(ADDRESS, 100, 120)
+
+
+def test_repeated_fetch_is_served_from_cache(node, tmp_path):
+    fetcher = LogFetcher(LogCache(tmp_path), block_range=32)
+    logs = fetcher.get_logs(ADDRESS, 50, 149)
+    requests_count = len(node.requests)
+
+    # the new cache instance reads the logs from disk
+    fetcher = LogFetcher(LogCache(tmp_path), block_range=32)
+    assert fetcher.get_logs(ADDRESS, 50, 149) == logs
+    assert fetcher.get_logs(ADDRESS, 120, 130) == logs[20:31]
+    assert len(node.requests) == requests_count
+
+    # only the missing ranges are requested
+    logs = fetcher.get_logs(ADDRESS, 0, 199)
+    assert [log["blockNumber"] for log in logs] == list(range(100, 200))
+    assert all(to < 50 or start > 149 for start, to in node.requests[requests_count:])
+    assert LogCache(tmp_path).plan(ADDRESS, None, 0, 250) == [
+        (0, 199, True),
+        (200, 250, False),
+    ]
+
+
+def test_partially_written_range_is_dropped(node, tmp_path):
+    LogFetcher(LogCache(tmp_path), block_range=1000).get_logs(ADDRESS, 0, 99)
+    LogFetcher(LogCache(tmp_path), block_range=1000).get_logs(ADDRESS, 100, 105)
+    file_path = LogCache(tmp_path).file_path(ADDRESS)
+    data = file_path.read_bytes()
+    file_path.write_bytes(data[:-10])
+
+    cache = LogCache(tmp_path)
+    assert cache.plan(ADDRESS, None, 0, 105) == [(0, 99, True), (100, 105, False)]
+    assert file_path.read_bytes() == data[: data.index(b"\n") + 1]
+
+
+def test_unconfirmed_blocks_are_not_cached(node, tmp_path):
+    node.block_number = 160
+    fetcher = LogFetcher(LogCache(tmp_path), block_range=1000, confirmations=20)
+    logs = fetcher.get_logs(ADDRESS, 100, 160)
+    assert [log["blockNumber"] for log in logs] == list(range(100, 161))
+    assert LogCache(tmp_path).plan(ADDRESS, None, 100, 160) == [
+        (100, 140, True),
+        (141, 160, False),
+    ]
+
+    # the reorganized logs of the unconfirmed blocks are requested again
+    requests_count = len(node.requests)
+    node.blocks_with_logs = [*range(100, 150), *range(155, 200)]
+    node.block_number = 170
+    logs = fetcher.get_logs(ADDRESS, 100, 170)
+    assert [log["blockNumber"] for log in logs] == [
+        *range(100, 150),
+        *range(155, 171),
+    ]
+    assert min(start for start, _ in node.requests[requests_count:]) == 141
+
+
+def test_block_timestamps_cache(tmp_path):
+    cache = LogCache(tmp_path)
+    assert cache.block_timestamp(1) is None
+    cache.append_block_timestamp(1, 1000)
+    cache.append_block_timestamp(2, 1015)
+    assert LogCache(tmp_path).block_timestamp(1) == 1000
+    assert LogCache(tmp_path).block_timestamp(2) == 1015
+
+
+def test_event_decoder():
+    decoder = EventDecoder([TRANSFER_ABI, REWARDS_PAID_ABI])
+    transfer_log = log_fetcher.serialize_log(
+        {
+            **make_log(1),
+            "topics": [
+                event_abi_to_log_topic(TRANSFER_ABI),
+                bytes(12) + bytes.fromhex(ADDRESS[2:]),
+                bytes(12) + bytes.fromhex(DEPOSITOR[2:]),
+            ],
+        }
+    )
+    rewards_paid_log = log_fetcher.serialize_log(
+        {
+            **make_log(2),
+            "topics": [event_abi_to_log_topic(REWARDS_PAID_ABI)],
+            "data": eth_abi.encode_abi(
+                ["address[]", "uint256"], [[ADDRESS, DEPOSITOR], 42]
+            ),
+        }
+    )
+    unknown_log = {**rewards_paid_log, "topics": ["0x" + "00" * 32]}
+
+    events = list(decoder.decode([transfer_log, unknown_log, rewards_paid_log]))
+    assert events == [
+        ("Transfer", {"from": ADDRESS, "to": DEPOSITOR, "value": 1}, transfer_log),
+        (
+            "RewardsPaid",
+            {"depositors": [ADDRESS, DEPOSITOR], "totalReward": 42},
+            rewards_paid_log,
+        ),
+    ]
+
+    decoder = EventDecoder([TRANSFER_ABI, REWARDS_PAID_ABI], ["RewardsPaid"])
+    events = list(decoder.decode([transfer_log, rewards_paid_log]))
+    assert [name for name, _, _ in events] == ["RewardsPaid"]
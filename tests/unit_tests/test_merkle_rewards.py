@@ -0,0 +1,108 @@
+import random
+import pytest
+from eth_utils import to_canonical_address, to_checksum_address
+from utils import merkle_rewards
+from utils.merkle_rewards import (
+    MerkleDistribution,
+    hash_pair,
+    leaf_hash,
+    verify_proof,
+    write_distribution,
+)
+
+
+def random_rewards(count, seed=42):
+    rnd = random.Random(seed)
+    depositors = sorted(
+        {to_checksum_address(rnd.randbytes(20)) for _ in range(count)},
+        key=to_canonical_address,
+    )
+    return [(depositor, rnd.randint(1, 10 ** 24)) for depositor in depositors]
+
+
+def merkle_root(rewards):
+    """Builds the tree in memory"""
+    level = [leaf_hash(depositor, reward) for depositor, reward in rewards]
+    if not level:
+        return "0x" + bytes(32).hex()
+    while len(level) > 1:
+        level = [
+            hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+    return "0x" + level[0].hex()
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 3, 7, 8, 9, 1000])
+def test_distribution_proofs(count, tmp_path, monkeypatch):
+    # small chunks to check the streaming over the chunk boundaries
+    monkeypatch.setattr(merkle_rewards, "CHUNK_SIZE", 3)
+    rewards = random_rewards(count)
+    write_distribution(tmp_path / "epoch", iter(rewards), {"epoch": 1})
+
+    with MerkleDistribution(tmp_path / "epoch") as distribution:
+        assert len(distribution) == count
+        assert distribution.root == merkle_root(rewards)
+        assert distribution.total == sum(reward for _, reward in rewards)
+        assert distribution.meta == {"epoch": 1}
+
+        claims = list(distribution.iter_claims())
+        assert [claim[:2] for claim in claims] == rewards
+        for depositor, reward, proof in claims:
+            assert verify_proof(distribution.root, depositor, reward, proof)
+            assert not verify_proof(distribution.root, depositor, reward + 1, proof)
+            assert distribution.claim(depositor) == (depositor, reward, proof)
+        with pytest.raises(KeyError):
+            distribution.claim(to_checksum_address(bytes(20)))
+
+
+def test_single_leaf_root_is_leaf_hash(tmp_path):
+    [(depositor, reward)] = random_rewards(1)
+    distribution = write_distribution(tmp_path / "epoch", [(depositor, reward)])
+    assert distribution.root == "0x" + leaf_hash(depositor, reward).hex()
+    assert distribution.proof(0) == []
+
+
+def test_distribution_requires_sorted_depositors(tmp_path):
+    rewards = random_rewards(10)
+    with pytest.raises(ValueError):
+        write_distribution(tmp_path / "epoch", reversed(rewards))
+    with pytest.raises(ValueError):
+        write_distribution(tmp_path / "epoch", rewards + rewards[-1:])
+    assert not (tmp_path / "epoch").exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_distribution_is_replaced(tmp_path):
+    previous_rewards = random_rewards(10, seed=1)
+    previous_distribution = write_distribution(tmp_path / "epoch", previous_rewards)
+    assert previous_distribution.leaf(0) == previous_rewards[0]
+    rewards = random_rewards(5, seed=2)
+    distribution = write_distribution(tmp_path / "epoch", rewards)
+    assert len(distribution) == 5
+    assert distribution.root == merkle_root(rewards)
+    # files of the opened previous version which weren't read before stay readable
+    assert previous_distribution.leaf(9) == previous_rewards[9]
+    assert verify_proof(
+        previous_distribution.root,
+        *previous_rewards[0],
+        previous_distribution.proof(0),
+    )
+    # the symlink points to the new version and the previous one is removed
+    assert (tmp_path / "epoch").is_symlink()
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        ["epoch", distribution.path.name]
+    )
+
+
+def test_distribution_directory_is_replaced_with_symlink(tmp_path):
+    # distributions written before the versioning are plain directories
+    (tmp_path / "epoch").mkdir()
+    (tmp_path / "epoch" / "meta.json").write_text("{}")
+    rewards = random_rewards(5)
+    distribution = write_distribution(tmp_path / "epoch", rewards)
+    assert distribution.root == merkle_root(rewards)
+    assert (tmp_path / "epoch").is_symlink()
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        ["epoch", distribution.path.name]
+    )
@@ -0,0 +1,173 @@
+import random
+import pytest
+from brownie import Wei, chain
+from utils import rewards
+from utils.constants import (
+    DEFAULT_REWARD_PER_SECOND,
+    DEFAULT_REWARDS_DURATION,
+    DEFAULT_TOTAL_REWARD,
+    ONE_DAY,
+    ONE_WEEK,
+)
+from utils.indexer import RewardsIndexer
+from utils.reward_timeline import RewardTimeline, build_timeline
+
+
+def record_wrapper_state(timeline, rewards_utils_wrapper, tx, total_staked):
+    timeline.add(
+        tx.timestamp,
+        rewards.RewardsState.from_tuple(rewards_utils_wrapper.rewardsState()),
+        total_staked,
+    )
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_reward_per_token_matches_rewards_utils_wrapper(
+    rewards_utils_wrapper, deployer, depositors, seed
+):
+    rnd = random.Random(seed)
+    timeline = RewardTimeline()
+    balances = {depositor.address: 0 for depositor in depositors}
+    total_staked = 0
+    # blocks with the total staked amount after them
+    samples = []
+
+    for _ in range(30):
+        chain.sleep(rnd.randint(1, 5 * ONE_DAY))
+        action = rnd.random()
+        if action < 0.15:
+            end_date = chain.time() + rnd.randint(ONE_DAY, DEFAULT_REWARDS_DURATION)
+            reward_per_second = rnd.randint(0, 2 * DEFAULT_REWARD_PER_SECOND)
+            tx = rewards_utils_wrapper.updateRewardPeriod(
+                total_staked, reward_per_second, end_date, {"from": deployer}
+            )
+            record_wrapper_state(timeline, rewards_utils_wrapper, tx, total_staked)
+        elif action < 0.8:
+            depositor = rnd.choice(list(balances))
+            staked = balances[depositor]
+            tx = rewards_utils_wrapper.updateDepositorReward(
+                total_staked, depositor, staked, {"from": deployer}
+            )
+            new_staked = rnd.randint(0, 10 * 10 ** 18)
+            balances[depositor] = new_staked
+            total_staked += new_staked - staked
+            record_wrapper_state(timeline, rewards_utils_wrapper, tx, total_staked)
+            timeline.add_depositor_update(
+                depositor,
+                tx.timestamp,
+                new_staked,
+                rewards.Reward(*rewards_utils_wrapper.depositorRewards(depositor)),
+            )
+        elif action < 0.9:
+            depositor = rnd.choice(list(balances))
+            tx = rewards_utils_wrapper.payDepositorReward(
+                total_staked, depositor, balances[depositor], {"from": deployer}
+            )
+            record_wrapper_state(timeline, rewards_utils_wrapper, tx, total_staked)
+            timeline.add_depositor_update(
+                depositor,
+                tx.timestamp,
+                balances[depositor],
+                rewards.Reward(*rewards_utils_wrapper.depositorRewards(depositor)),
+            )
+        else:
+            chain.mine()
+        samples.append((chain.height, total_staked, dict(balances)))
+
+    for block_number, total_staked, block_balances in samples:
+        timestamp = chain[block_number].timestamp
+        assert timeline.reward_per_token(timestamp) == (
+            rewards_utils_wrapper.rewardPerToken(
+                total_staked, block_identifier=block_number
+            )
+        )
+        for depositor, staked in block_balances.items():
+            earned = rewards_utils_wrapper.earnedReward(
+                total_staked, depositor, staked, block_identifier=block_number
+            )
+            paid = rewards_utils_wrapper.depositorRewards(
+                depositor, block_identifier=block_number
+            )[0]
+            assert timeline.earned(depositor, timestamp) == earned + paid
+
+    # the loaded timeline answers the same
+    timeline = RewardTimeline.from_dict(timeline.to_dict())
+    block_number, total_staked, _ = samples[len(samples) // 2]
+    assert timeline.reward_per_token(chain[block_number].timestamp) == (
+        rewards_utils_wrapper.rewardPerToken(
+            total_staked, block_identifier=block_number
+        )
+    )
+
+
+def test_transitions_must_be_chronological():
+    timeline = RewardTimeline()
+    timeline.add(100, rewards.RewardsState(200, 100, 1, 0), 10)
+    with pytest.raises(ValueError):
+        timeline.add(99, rewards.RewardsState(200, 99, 2, 0), 10)
+
+
+def test_timeline_built_from_controller_events(
+    incentives_controller,
+    asteth_mock,
+    rewards_manager,
+    depositors,
+    ldo,
+    agent,
+    deployer,
+    tmp_path,
+):
+    start_block = incentives_controller.tx.block_number
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    ldo.approve(incentives_controller, DEFAULT_TOTAL_REWARD, {"from": agent})
+    incentives_controller.notifyRewardAmount(
+        DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+    )
+
+    [depositor1, depositor2, depositor3] = depositors
+    steps = [
+        lambda: asteth_mock.mint(depositor1, Wei("1 ether"), {"from": deployer}),
+        lambda: asteth_mock.mint(depositor2, Wei("0.5 ether"), {"from": deployer}),
+        lambda: asteth_mock.transfer(
+            depositor1, depositor3, Wei("0.25 ether"), {"from": deployer}
+        ),
+        lambda: incentives_controller.claimReward({"from": depositor2}),
+        lambda: asteth_mock.burn(depositor1, Wei("0.5 ether"), {"from": deployer}),
+    ]
+    blocks = []
+    for step in steps:
+        step()
+        chain.sleep(ONE_WEEK // 3)
+        chain.mine()
+        blocks.append(chain.height)
+
+    timeline = build_timeline(
+        RewardsIndexer(
+            incentives_controller,
+            asteth_mock,
+            tmp_path / "ledger.json",
+            start_block=start_block,
+        )
+    )
+    cumulative_rewards = {}
+    for block_number in blocks:
+        timestamp = chain[block_number].timestamp
+        info = incentives_controller.depositorsRewardsInfo(
+            depositors, block_identifier=block_number
+        )
+        for i, depositor in enumerate(depositors):
+            earned, paid = info[2 + i], info[2 + 2 * len(depositors) + i]
+            cumulative_rewards[(depositor, block_number)] = earned + paid
+            assert timeline.earned(depositor.address, timestamp) == earned + paid
+
+    from_block, to_block = blocks[0], blocks[-1]
+    for depositor in depositors:
+        assert timeline.earned_between(
+            depositor.address,
+            chain[from_block].timestamp,
+            chain[to_block].timestamp,
+        ) == (
+            cumulative_rewards[(depositor, to_block)]
+            - cumulative_rewards[(depositor, from_block)]
+        )
@@ -0,0 +1,66 @@
+import pytest
+from brownie import chain
+from utils.checkpoints import RewardsCheckpoints
+from utils.indexer import RewardsLedger
+
+CHECKPOINT_INTERVAL = 4
+
+
+def test_earned_at_past_blocks_matches_controller(
+    incentives_controller, asteth_mock, depositors, rewards_history, tmp_path
+):
+    start_block, blocks = rewards_history
+    checkpoints = RewardsCheckpoints(
+        incentives_controller,
+        asteth_mock,
+        tmp_path,
+        start_block=start_block,
+        interval=CHECKPOINT_INTERVAL,
+        block_range=3,
+    )
+    checkpoints.update()
+
+    checkpoint_blocks = checkpoints.checkpoint_blocks()
+    assert checkpoint_blocks == list(
+        range(
+            start_block + CHECKPOINT_INTERVAL - 1, chain.height + 1, CHECKPOINT_INTERVAL
+        )
+    )
+    for block in checkpoint_blocks:
+        assert (
+            RewardsLedger.from_store(checkpoints.checkpoint_path(block)).last_block
+            == block
+        )
+
+    addresses = [depositor.address for depositor in depositors]
+    for block in blocks + checkpoint_blocks:
+        assert checkpoints.earned_at(block, addresses) == {
+            depositor.address: incentives_controller.earned(
+                depositor, block_identifier=block
+            )
+            for depositor in depositors
+        }
+
+
+def test_checkpoints_update_is_resumable(
+    incentives_controller, asteth_mock, depositors, rewards_history, tmp_path
+):
+    start_block, blocks = rewards_history
+    checkpoints_args = (incentives_controller, asteth_mock, tmp_path)
+    checkpoints_kwargs = {"start_block": start_block, "interval": CHECKPOINT_INTERVAL}
+    RewardsCheckpoints(*checkpoints_args, **checkpoints_kwargs).update(blocks[4])
+
+    checkpoints = RewardsCheckpoints(*checkpoints_args, **checkpoints_kwargs)
+    ledger = checkpoints.update()
+    assert ledger.last_block == chain.height
+    assert checkpoints.checkpoint_blocks() == list(
+        range(
+            start_block + CHECKPOINT_INTERVAL - 1, chain.height + 1, CHECKPOINT_INTERVAL
+        )
+    )
+
+    # the ledger restored at the last block is equal to the indexed one
+    assert checkpoints.ledger_at(chain.height).to_dict() == ledger.to_dict()
+
+    with pytest.raises(ValueError):
+        checkpoints.ledger_at(start_block - 1)
@@ -0,0 +1,161 @@
+import pytest
+from brownie import Wei, chain
+from utils.constants import DEFAULT_TOTAL_REWARD, ONE_WEEK
+from utils.indexer import RewardsIndexer
+
+
+def assert_ledger_matches(ledger, incentives_controller, asteth_mock, depositors):
+    timestamp = chain[-1].timestamp
+    assert ledger.mismatches == 0
+    assert ledger.total_supply == asteth_mock.totalSupply()
+    assert ledger.rewards_duration == incentives_controller.rewardsDuration()
+    assert ledger.state.end_date == incentives_controller.periodFinish()
+    assert ledger.state.reward_per_second == incentives_controller.rewardPerSecond()
+    for depositor in depositors:
+        assert ledger.balances[depositor.address] == asteth_mock.balances(depositor)
+        assert ledger.earned(depositor.address, timestamp) == (
+            incentives_controller.earned(depositor)
+        )
+
+
+def test_indexer_rebuilds_rewards_state(
+    incentives_controller, asteth_mock, depositors, rewards_history, tmp_path
+):
+    start_block, _ = rewards_history
+    indexer = RewardsIndexer(
+        incentives_controller,
+        asteth_mock,
+        tmp_path / "ledger.json",
+        start_block=start_block,
+        block_range=3,
+    )
+    ledger = indexer.run()
+    assert ledger.last_block == chain.height
+    assert_ledger_matches(ledger, incentives_controller, asteth_mock, depositors)
+
+
+def test_indexer_resumes_from_checkpoint(
+    incentives_controller, asteth_mock, depositors, rewards_history, tmp_path
+):
+    start_block, _ = rewards_history
+    checkpoint_path = tmp_path / "ledger.json"
+    middle_block = (start_block + chain.height) // 2
+
+    indexer = RewardsIndexer(
+        incentives_controller,
+        asteth_mock,
+        checkpoint_path,
+        start_block=start_block,
+        block_range=2,
+    )
+    indexer.run(to_block=middle_block)
+    assert indexer.ledger.last_block == middle_block
+
+    # new indexer instance must continue from the checkpointed block
+    resumed_indexer = RewardsIndexer(
+        incentives_controller,
+        asteth_mock,
+        checkpoint_path,
+        start_block=start_block,
+        block_range=2,
+    )
+    assert resumed_indexer.next_block == middle_block + 1
+    ledger = resumed_indexer.run()
+    assert_ledger_matches(ledger, incentives_controller, asteth_mock, depositors)
+
+    # checkpoint of other contracts can't be reused
+    with pytest.raises(ValueError):
+        RewardsIndexer(incentives_controller, incentives_controller, checkpoint_path)
+
+
+def test_indexer_reads_cached_logs(
+    incentives_controller, asteth_mock, depositors, rewards_history, tmp_path
+):
+    start_block, _ = rewards_history
+    indexer = RewardsIndexer(
+        incentives_controller,
+        asteth_mock,
+        tmp_path / "ledger.json",
+        start_block=start_block,
+        log_cache_path=tmp_path / "logs",
+        # all blocks of the local chain are cached
+        log_confirmations=0,
+    )
+    indexer.run()
+    assert indexer.log_fetcher.requests > 0
+
+    # indexing of the same history from scratch doesn't request logs from the node
+    cached_indexer = RewardsIndexer(
+        incentives_controller,
+        asteth_mock,
+        tmp_path / "cached_ledger.json",
+        start_block=start_block,
+        log_cache_path=tmp_path / "logs",
+        # all blocks of the local chain are cached
+        log_confirmations=0,
+    )
+    ledger = cached_indexer.run(indexer.ledger.last_block)
+    assert cached_indexer.log_fetcher.requests == 0
+    assert ledger.to_dict() == indexer.ledger.to_dict()
+    assert_ledger_matches(ledger, incentives_controller, asteth_mock, depositors)
+
+
+def test_indexer_tracks_internal_balances_of_rebased_token(
+    incentives_controller,
+    asteth_mock,
+    rewards_manager,
+    depositors,
+    ldo,
+    agent,
+    deployer,
+    tmp_path,
+):
+    start_block = incentives_controller.tx.block_number
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+    ldo.approve(incentives_controller, DEFAULT_TOTAL_REWARD, {"from": agent})
+    incentives_controller.notifyRewardAmount(
+        DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+    )
+
+    [depositor1, depositor2, depositor3] = depositors
+    asteth_mock.mint(depositor1, Wei("1 ether"), {"from": deployer})
+    chain.sleep(ONE_WEEK)
+    # external amounts are 1.5 times larger than the internal ones after the rebase
+    asteth_mock.setIndex(3 * 10 ** 27 // 2, {"from": deployer})
+    asteth_mock.mint(depositor2, Wei("1.5 ether"), {"from": deployer})
+    chain.sleep(ONE_WEEK)
+    asteth_mock.transfer(depositor1, depositor3, Wei("0.75 ether"), {"from": deployer})
+    chain.sleep(ONE_WEEK)
+    asteth_mock.burn(depositor2, Wei("0.3 ether"), {"from": deployer})
+    incentives_controller.claimReward({"from": depositor1})
+    chain.sleep(ONE_WEEK)
+    chain.mine()
+
+    ledger = RewardsIndexer(
+        incentives_controller,
+        asteth_mock,
+        tmp_path / "ledger.json",
+        start_block=start_block,
+        block_range=3,
+    ).run()
+    assert ledger.balances[depositor2.address] == Wei("0.8 ether")
+    assert_ledger_matches(ledger, incentives_controller, asteth_mock, depositors)
+
+
+def test_indexer_starts_after_first_transfers(
+    incentives_controller, asteth_mock, depositors, rewards_history, tmp_path
+):
+    history_start_block, _ = rewards_history
+    # the history of the depositors and RewardsDurationUpdated precede the start block
+    start_block = (history_start_block + chain.height) // 2
+    ledger = RewardsIndexer(
+        incentives_controller,
+        asteth_mock,
+        tmp_path / "ledger.json",
+        start_block=start_block,
+    ).run()
+    assert ledger.rewards_duration == incentives_controller.rewardsDuration()
+    assert ledger.total_supply == asteth_mock.totalSupply()
+    for depositor in depositors[1:]:
+        assert ledger.balances[depositor.address] == asteth_mock.balances(depositor)
@@ -0,0 +1,61 @@
+import pytest
+from brownie import Wei, chain
+from utils.constants import DEFAULT_TOTAL_REWARD, ONE_WEEK
+from utils.rewards_info import depositors_rewards_info
+
+
+@pytest.fixture(scope="module", autouse=True)
+def initialize_incentives_controller(incentives_controller, asteth_mock, deployer):
+    asteth_mock.setIncentivesController(incentives_controller, {"from": deployer})
+    incentives_controller.initialize(asteth_mock, {"from": deployer})
+
+
+def test_depositors_rewards_info(
+    incentives_controller,
+    asteth_mock,
+    rewards_manager,
+    depositors,
+    stranger,
+    ldo,
+    agent,
+    deployer,
+):
+    ldo.approve(incentives_controller, DEFAULT_TOTAL_REWARD, {"from": agent})
+    incentives_controller.notifyRewardAmount(
+        DEFAULT_TOTAL_REWARD, agent, {"from": rewards_manager}
+    )
+    [depositor1, depositor2, depositor3] = depositors
+    asteth_mock.mint(depositor1, Wei("1 ether"), {"from": deployer})
+    chain.sleep(ONE_WEEK)
+    asteth_mock.mint(depositor2, Wei("0.3 ether"), {"from": deployer})
+    asteth_mock.mint(depositor3, Wei("2 ether"), {"from": deployer})
+    chain.sleep(ONE_WEEK)
+    incentives_controller.claimReward({"from": depositor2})
+    asteth_mock.transfer(depositor3, depositor1, Wei("1 ether"), {"from": deployer})
+    chain.sleep(ONE_WEEK)
+    chain.mine()
+
+    # the stranger has no deposit, chunks are smaller than the list of addresses
+    addresses = [depositor1, depositor2, depositor3, stranger]
+    block = chain.height
+    info = depositors_rewards_info(
+        incentives_controller, addresses, block_identifier=block, chunk_size=3
+    )
+
+    assert info["period_finish"] == incentives_controller.periodFinish()
+    assert info["reward_per_second"] == incentives_controller.rewardPerSecond()
+    assert info["earned"] == [
+        incentives_controller.earned(a, block_identifier=block) for a in addresses
+    ]
+    assert info["staked"] == [asteth_mock.balances(a) for a in addresses]
+    assert info["earned"][3] == 0
+    assert info["paid_reward"][1] > 0
+    assert info["upcoming_reward"][0] > 0
+    assert info["upcoming_reward"][1] == 0
+    assert info["accumulated_reward_per_token_paid"][0] > 0
+    assert info["accumulated_reward_per_token_paid"][3] == 0
+
+    # empty list of depositors returns only the state of the reward period
+    info = depositors_rewards_info(incentives_controller, [])
+    assert info["period_finish"] == incentives_controller.periodFinish()
+    assert info["earned"] == []
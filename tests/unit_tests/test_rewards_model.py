@@ -0,0 +1,120 @@
+import pytest
+from brownie import Wei, chain
+from utils import rewards
+from utils.constants import (
+    ONE_WEEK,
+    DEFAULT_REWARDS_DURATION,
+    DEFAULT_TOTAL_STAKED,
+    DEFAULT_REWARD_PER_SECOND,
+)
+
+
+def read_rewards_state(rewards_utils_wrapper, depositors):
+    state = rewards.RewardsState.from_tuple(rewards_utils_wrapper.rewardsState())
+    for depositor in depositors:
+        state.rewards[depositor.address] = rewards.Reward(
+            *rewards_utils_wrapper.depositorRewards(depositor)
+        )
+    return state
+
+
+def assert_earned_matches(rewards_utils_wrapper, state, total_staked, balances):
+    timestamp = chain[-1].timestamp
+    depositors = list(balances.keys())
+    expected = [
+        rewards_utils_wrapper.earnedReward(total_staked, depositor, balances[depositor])
+        for depositor in depositors
+    ]
+    actual = rewards.earned_rewards(
+        state,
+        total_staked,
+        staked=[balances[d] for d in depositors],
+        upcoming_rewards=[state.reward(d.address).upcoming_reward for d in depositors],
+        accumulated_reward_per_token_paid=[
+            state.reward(d.address).accumulated_reward_per_token_paid
+            for d in depositors
+        ],
+        timestamp=timestamp,
+    )
+    assert actual == expected
+    for depositor in depositors:
+        assert rewards.earned_reward(
+            state, total_staked, depositor.address, balances[depositor], timestamp
+        ) == rewards_utils_wrapper.earnedReward(
+            total_staked, depositor, balances[depositor]
+        )
+
+
+@pytest.mark.parametrize(
+    "stakes",
+    [
+        [Wei("1 ether"), Wei("0.5 ether"), Wei("3 ether")],
+        [1, 3, 7],
+        [Wei("1000000 ether"), 1, Wei("0.333333333333333333 ether")],
+    ],
+)
+def test_model_matches_rewards_utils_wrapper(
+    rewards_utils_wrapper, deployer, depositors, stakes
+):
+    model = rewards.RewardsState()
+    total_staked = DEFAULT_TOTAL_STAKED
+    balances = {depositor: 0 for depositor in depositors}
+
+    end_date = chain[-1].timestamp + DEFAULT_REWARDS_DURATION
+    tx = rewards_utils_wrapper.updateRewardPeriod(
+        total_staked, DEFAULT_REWARD_PER_SECOND, end_date, {"from": deployer}
+    )
+    rewards.update_reward_period(
+        model, total_staked, DEFAULT_REWARD_PER_SECOND, end_date, tx.timestamp
+    )
+    assert model.as_tuple() == tuple(rewards_utils_wrapper.rewardsState())
+
+    # stake, wait and restake by each depositor to accumulate upcoming rewards
+    for _ in range(2):
+        for i, (depositor, stake) in enumerate(zip(depositors, stakes)):
+            chain.sleep(ONE_WEEK // (i + 1) + 7)
+            tx = rewards_utils_wrapper.updateDepositorReward(
+                total_staked, depositor, balances[depositor]
+            )
+            earned = rewards.update_depositor_reward(
+                model,
+                total_staked,
+                depositor.address,
+                balances[depositor],
+                tx.timestamp,
+            )
+            assert earned == tx.return_value
+            balances[depositor] += stake
+            total_staked += stake
+
+    chain.sleep(ONE_WEEK + 13)
+    chain.mine()
+    assert_earned_matches(rewards_utils_wrapper, model, total_staked, balances)
+
+    # pay reward to the first depositor
+    tx = rewards_utils_wrapper.payDepositorReward(
+        total_staked, depositors[0], balances[depositors[0]]
+    )
+    paid = rewards.pay_depositor_reward(
+        model,
+        total_staked,
+        depositors[0].address,
+        balances[depositors[0]],
+        tx.timestamp,
+    )
+    assert paid == tx.return_value
+
+    # wait till the end of the reward period to validate clamping by end date
+    chain.sleep(DEFAULT_REWARDS_DURATION)
+    chain.mine()
+    assert_earned_matches(rewards_utils_wrapper, model, total_staked, balances)
+
+    # model state must be equal to the state read from the chain
+    onchain = read_rewards_state(rewards_utils_wrapper, depositors)
+    assert model.as_tuple() == onchain.as_tuple()
+    for depositor in depositors:
+        assert (
+            model.reward(depositor.address).as_tuple()
+            == onchain.reward(depositor.address).as_tuple()
+        )
+    assert_earned_matches(rewards_utils_wrapper, onchain, total_staked, balances)
@@ -0,0 +1,187 @@
+import pytest
+from utils import rewards, simulator
+from utils.constants import ONE_WEEK, DEFAULT_REWARDS_DURATION, DEFAULT_TOTAL_REWARD
+
+DEPOSITORS_COUNT = 50
+START_TIMESTAMP = 1_600_000_000
+
+
+def replay_with_rewards_model(events, rewards_duration):
+    """Replays the events with the per-depositor functions of utils.rewards"""
+    state = rewards.RewardsState()
+    total_staked = 0
+    balances = [0] * DEPOSITORS_COUNT
+    for timestamp, kind, depositor, recipient, amount in events:
+        if kind == simulator.NOTIFY_REWARD_AMOUNT:
+            rewards.notify_reward_amount(
+                state, amount, rewards_duration, total_staked, timestamp
+            )
+        elif kind == simulator.UPDATE_PERIOD_FINISH:
+            rewards.update_reward_period(
+                state, total_staked, state.reward_per_second, amount, timestamp
+            )
+        elif kind == simulator.CLAIM:
+            rewards.pay_depositor_reward(
+                state, total_staked, depositor, balances[depositor], timestamp
+            )
+        else:
+            rewards.update_depositor_reward(
+                state, total_staked, depositor, balances[depositor], timestamp
+            )
+            if kind == simulator.DEPOSIT:
+                balances[depositor] += amount
+                total_staked += amount
+            elif kind == simulator.WITHDRAW:
+                balances[depositor] -= amount
+                total_staked -= amount
+            else:
+                if recipient != depositor:
+                    rewards.update_depositor_reward(
+                        state, total_staked, recipient, balances[recipient], timestamp
+                    )
+                balances[depositor] -= amount
+                balances[recipient] += amount
+    return state, balances
+
+
+def simulation_events(period_finish_update):
+    end_timestamp = START_TIMESTAMP + 4 * DEFAULT_REWARDS_DURATION
+    return list(
+        simulator.merge_events(
+            simulator.random_activity(
+                DEPOSITORS_COUNT, START_TIMESTAMP, end_timestamp, 5000, seed=42
+            ),
+            # top ups are made both before and after the end of the reward period
+            simulator.top_ups(
+                START_TIMESTAMP + ONE_WEEK,
+                end_timestamp,
+                DEFAULT_REWARDS_DURATION + ONE_WEEK,
+                DEFAULT_TOTAL_REWARD,
+            ),
+            simulator.top_ups(
+                START_TIMESTAMP + 3 * ONE_WEEK,
+                end_timestamp,
+                3 * DEFAULT_REWARDS_DURATION,
+                DEFAULT_TOTAL_REWARD,
+            ),
+            [period_finish_update],
+        )
+    )
+
+
+def assert_funds_accounted(report):
+    assert report["undistributed"] == report["funded"] - report["paid"] - report["owed"]
+    assert report["undistributed"] == (
+        report["rounding_dust"]
+        + report["emitted_while_unstaked"]
+        + report["division_remainder"]
+        + report["pending"]
+        + report["cancelled"]
+    )
+    assert report["rounding_dust"] >= 0
+
+
+def test_simulator_matches_rewards_model():
+    period_finish_update = (
+        START_TIMESTAMP + 2 * DEFAULT_REWARDS_DURATION,
+        simulator.UPDATE_PERIOD_FINISH,
+        0,
+        0,
+        START_TIMESTAMP + 2 * DEFAULT_REWARDS_DURATION + ONE_WEEK,
+    )
+    events = simulation_events(period_finish_update)
+    sim = simulator.RewardsSimulator(DEPOSITORS_COUNT, DEFAULT_REWARDS_DURATION)
+    sim.run(events)
+    state, balances = replay_with_rewards_model(events, DEFAULT_REWARDS_DURATION)
+
+    assert sim.state.as_tuple() == state.as_tuple()
+    assert sim.balances == balances
+    for depositor in range(DEPOSITORS_COUNT):
+        reward = state.reward(depositor)
+        assert sim.paid_rewards[depositor] == reward.paid_reward
+        assert sim.upcoming_rewards[depositor] == reward.upcoming_reward
+        assert (
+            sim.accumulated_reward_per_token_paid[depositor]
+            == reward.accumulated_reward_per_token_paid
+        )
+
+    report = sim.report()
+    assert report["events_count"] == len(events)
+    assert report["funded"] == sum(
+        amount
+        for _, kind, _, _, amount in events
+        if kind == simulator.NOTIFY_REWARD_AMOUNT
+    )
+    assert report["paid"] == sum(report["paid_rewards"]) > 0
+    assert report["earned_rewards"] == [
+        sim.earned(depositor) for depositor in range(DEPOSITORS_COUNT)
+    ]
+    assert report["cancelled"] > 0
+    assert_funds_accounted(report)
+
+
+def test_simulator_reports_emission_while_unstaked():
+    sim = simulator.RewardsSimulator(2, DEFAULT_REWARDS_DURATION)
+    sim.run(
+        [
+            (
+                START_TIMESTAMP,
+                simulator.NOTIFY_REWARD_AMOUNT,
+                0,
+                0,
+                DEFAULT_TOTAL_REWARD,
+            ),
+            (START_TIMESTAMP + ONE_WEEK, simulator.DEPOSIT, 0, 0, 10 ** 18),
+            (START_TIMESTAMP + ONE_WEEK, simulator.DEPOSIT, 1, 1, 3),
+        ]
+    )
+    reward_per_second = DEFAULT_TOTAL_REWARD // DEFAULT_REWARDS_DURATION
+
+    report = sim.report()
+    assert report["emitted_while_unstaked"] == ONE_WEEK * reward_per_second
+    assert (
+        report["division_remainder"] == DEFAULT_TOTAL_REWARD % DEFAULT_REWARDS_DURATION
+    )
+    assert (
+        report["pending"] == (DEFAULT_REWARDS_DURATION - ONE_WEEK) * reward_per_second
+    )
+    assert_funds_accounted(report)
+
+    sim.run([(START_TIMESTAMP + 2 * ONE_WEEK, simulator.CLAIM, 1, 1, 0)])
+    report = sim.report()
+    assert report["paid_rewards"][1] > 0
+    assert report["rounding_dust"] > 0
+    assert_funds_accounted(report)
+
+
+def test_simulator_rejects_unfunded_claims():
+    sim = simulator.RewardsSimulator(1, DEFAULT_REWARDS_DURATION)
+    sim.run(
+        [
+            (START_TIMESTAMP, simulator.DEPOSIT, 0, 0, 10 ** 18),
+            (
+                START_TIMESTAMP,
+                simulator.NOTIFY_REWARD_AMOUNT,
+                0,
+                0,
+                DEFAULT_TOTAL_REWARD,
+            ),
+            # extends the reward period without funding
+            (
+                START_TIMESTAMP + ONE_WEEK,
+                simulator.UPDATE_PERIOD_FINISH,
+                0,
+                0,
+                START_TIMESTAMP + 2 * DEFAULT_REWARDS_DURATION,
+            ),
+        ]
+    )
+    assert sim.report()["cancelled"] < 0
+
+    with pytest.raises(ArithmeticError):
+        sim.run(
+            [(START_TIMESTAMP + 2 * DEFAULT_REWARDS_DURATION, simulator.CLAIM, 0, 0, 0)]
+        )
+
+    with pytest.raises(ValueError):
+        sim.run([(START_TIMESTAMP, simulator.CLAIM, 0, 0, 0)])
@@ -0,0 +1,125 @@
+import pytest
+from brownie import ZERO_ADDRESS
+from eth_utils import to_checksum_address
+from utils import simulator
+from utils.constants import ONE_WEEK, DEFAULT_REWARDS_DURATION, DEFAULT_TOTAL_REWARD
+from utils.indexer import RewardsLedger
+from utils.rewards_store import DEPOSITOR_COLUMNS, RewardsStore, read_store
+
+DEPOSITORS_COUNT = 300
+START_TIMESTAMP = 1_600_000_000
+
+
+@pytest.fixture(scope="module")
+def simulation():
+    end_timestamp = START_TIMESTAMP + 2 * DEFAULT_REWARDS_DURATION
+    return simulator.RewardsSimulator(DEPOSITORS_COUNT, DEFAULT_REWARDS_DURATION).run(
+        simulator.merge_events(
+            simulator.random_activity(
+                DEPOSITORS_COUNT, START_TIMESTAMP, end_timestamp, 3000
+            ),
+            simulator.top_ups(
+                START_TIMESTAMP, end_timestamp, ONE_WEEK, DEFAULT_TOTAL_REWARD
+            ),
+        )
+    )
+
+
+def test_store_queries_match_written_data(simulation, tmp_path):
+    # addresses aren't sorted to check the address index
+    addresses = [
+        to_checksum_address(f"0x{(i * 7919) % 2 ** 160:040x}")
+        for i in range(DEPOSITORS_COUNT, 0, -1)
+    ]
+    simulation.write_store(tmp_path / "store", addresses)
+    columns = {
+        "balance": simulation.balances,
+        "paid_reward": simulation.paid_rewards,
+        "upcoming_reward": simulation.upcoming_rewards,
+        "accumulated_reward_per_token_paid": simulation.accumulated_reward_per_token_paid,
+    }
+
+    with RewardsStore(tmp_path / "store") as store:
+        assert len(store) == DEPOSITORS_COUNT
+        assert store.columns == DEPOSITOR_COLUMNS
+        assert store.meta["state"] == list(simulation.state.as_tuple())
+        assert store.addresses() == addresses
+        assert store.addresses(10, 20) == addresses[10:20]
+        for name, values in columns.items():
+            assert store.column(name) == values
+            assert store.column(name, 17, 230) == values[17:230]
+            assert list(store.iter_column(name, 5, 295, chunk_size=7)) == values[5:295]
+            assert store.sum(name) == sum(values)
+            assert store.sum(name, 100, 200) == sum(values[100:200])
+            assert store.min(name) == min(values)
+            assert store.max(name, 0, 50) == max(values[0:50])
+            assert store.count_nonzero(name) == sum(1 for v in values if v)
+            assert store.value(name, 42) == values[42]
+
+        for position, address in enumerate(addresses):
+            assert store.position(address) == position
+            assert store.address(position) == address
+        assert store.position(ZERO_ADDRESS) is None
+        assert store.row(addresses[3]) == {
+            name: values[3] for name, values in columns.items()
+        }
+        with pytest.raises(KeyError):
+            store.row(ZERO_ADDRESS)
+        with pytest.raises(IndexError):
+            store.value("balance", DEPOSITORS_COUNT)
+
+    # default addresses of the simulated depositors
+    simulation.write_store(tmp_path / "store")
+    addresses, read_columns, _ = read_store(tmp_path / "store")
+    assert addresses[0] == to_checksum_address(f"0x{1:040x}")
+    assert read_columns == columns
+
+
+def test_ledger_store_roundtrip(tmp_path):
+    [depositor1, depositor2] = [to_checksum_address(f"0x{i:040x}") for i in range(1, 3)]
+    ledger = RewardsLedger(ZERO_ADDRESS, ZERO_ADDRESS)
+    events = [
+        ("RewardsDurationUpdated", {"newDuration": DEFAULT_REWARDS_DURATION}),
+        ("RewardAdded", {"rewardAmount": DEFAULT_TOTAL_REWARD}),
+        ("Transfer", {"from": ZERO_ADDRESS, "to": depositor1, "value": 10 ** 18}),
+        ("Transfer", {"from": depositor1, "to": depositor2, "value": 3 * 10 ** 17}),
+    ]
+    for i, (name, args) in enumerate(events):
+        ledger.apply(name, args, START_TIMESTAMP + i * ONE_WEEK, f"0x{i:064x}")
+    ledger.end_block(100)
+
+    ledger.write_store(tmp_path / "ledger")
+    assert RewardsLedger.from_store(tmp_path / "ledger").to_dict() == ledger.to_dict()
+
+    # the store is replaced on write
+    ledger.end_block(101)
+    ledger.write_store(tmp_path / "ledger")
+    assert RewardsLedger.from_store(tmp_path / "ledger").last_block == 101
+
+
+def test_opened_store_survives_replace(simulation, tmp_path):
+    simulation.write_store(tmp_path / "store")
+    with RewardsStore(tmp_path / "store") as store:
+        simulator.RewardsSimulator(0, DEFAULT_REWARDS_DURATION).write_store(
+            tmp_path / "store"
+        )
+        # the previous version is removed, but its files are mapped on open
+        assert len(store) == DEPOSITORS_COUNT
+        assert store.column("balance") == simulation.balances
+        assert store.position(store.address(7)) == 7
+    with RewardsStore(tmp_path / "store") as store:
+        assert len(store) == 0
+    assert sorted(path.name for path in tmp_path.iterdir())[0] == "store"
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_empty_store(tmp_path):
+    simulator.RewardsSimulator(0, DEFAULT_REWARDS_DURATION).write_store(
+        tmp_path / "store"
+    )
+    with RewardsStore(tmp_path / "store") as store:
+        assert len(store) == 0
+        assert store.column("balance") == []
+        assert store.sum("balance") == 0
+        assert store.max("balance") is None
+        assert store.position(ZERO_ADDRESS) is None
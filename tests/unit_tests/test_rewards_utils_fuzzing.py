@@ -0,0 +1,170 @@
+"""
+Differential fuzzing of RewardsUtilsWrapper against the Python model from utils.rewards.
+Every generated case is a sequence of blocks. Each block moves the chain time forward
+and executes a batch of actions in a single transaction via executeActions().
+
+The size of the fuzzing is configured via env variables:
+    FUZZ_MAX_EXAMPLES - number of generated cases (50 by default)
+    FUZZ_MAX_BLOCKS - max number of blocks in the case (6 by default)
+    FUZZ_MAX_BLOCK_ACTIONS - max number of actions in the block (6 by default)
+    FUZZ_SHRINK - set to 0 to report the failed case without shrinking it
+Shrinking re-executes the failed case many times, so the cases are kept small to fit
+it into the CI time budget. On CI (CI env variable is set) the cases are derandomized.
+"""
+import copy
+import os
+import pytest
+from brownie import chain, history
+from brownie.exceptions import VirtualMachineError
+from brownie.test import given
+from hypothesis import HealthCheck, Phase, settings, strategies as st
+from utils import config, rewards
+from utils.constants import ONE_MONTH
+
+FUZZ_MAX_EXAMPLES = int(config.get_env("FUZZ_MAX_EXAMPLES", "50"))
+FUZZ_MAX_BLOCKS = int(config.get_env("FUZZ_MAX_BLOCKS", "6"))
+FUZZ_MAX_BLOCK_ACTIONS = int(config.get_env("FUZZ_MAX_BLOCK_ACTIONS", "6"))
+FUZZ_PHASES = (
+    [Phase.explicit, Phase.reuse, Phase.generate]
+    if config.get_env("FUZZ_SHRINK", "1") == "0"
+    else list(Phase)
+)
+
+# values of RewardsUtilsWrapper.ActionType enum
+UPDATE_REWARD_PERIOD = 0
+UPDATE_DEPOSITOR_REWARD = 1
+PAY_DEPOSITOR_REWARD = 2
+
+BATCH_GAS_LIMIT = 10_000_000
+DEPOSITORS = [f"0x{i:040x}" for i in range(1, 4)]
+
+# amounts around the precision of the reward per token are the most prone to rounding errors
+amounts = st.one_of(
+    st.sampled_from([0, 1, 2, 10 ** 18 - 1, 10 ** 18, 10 ** 18 + 1]),
+    st.integers(min_value=0, max_value=10 ** 27),
+)
+rewards_per_second = st.one_of(
+    st.sampled_from([0, 1, 3]), st.integers(min_value=0, max_value=10 ** 24)
+)
+# end date is set relative to the chain time before the block, low values make reverts
+end_date_shifts = st.integers(min_value=-2, max_value=2 * ONE_MONTH)
+time_jumps = st.one_of(
+    st.sampled_from([0, 1]), st.integers(min_value=0, max_value=2 * ONE_MONTH)
+)
+
+actions = st.one_of(
+    st.tuples(
+        st.just(UPDATE_REWARD_PERIOD),
+        amounts,
+        st.just(0),
+        st.just(0),
+        rewards_per_second,
+        end_date_shifts,
+    ),
+    st.tuples(
+        st.sampled_from([UPDATE_DEPOSITOR_REWARD, PAY_DEPOSITOR_REWARD]),
+        amounts,
+        st.integers(min_value=0, max_value=len(DEPOSITORS) - 1),
+        amounts,
+        st.just(0),
+        st.just(0),
+    ),
+)
+blocks = st.lists(
+    st.tuples(
+        time_jumps, st.lists(actions, min_size=1, max_size=FUZZ_MAX_BLOCK_ACTIONS)
+    ),
+    min_size=1,
+    max_size=FUZZ_MAX_BLOCKS,
+)
+
+
+def to_wrapper_actions(block_actions, timestamp):
+    return [
+        (
+            action_type,
+            total_staked,
+            DEPOSITORS[depositor],
+            staked,
+            reward_per_second,
+            timestamp + end_date_shift if action_type == UPDATE_REWARD_PERIOD else 0,
+        )
+        for (
+            action_type,
+            total_staked,
+            depositor,
+            staked,
+            reward_per_second,
+            end_date_shift,
+        ) in block_actions
+    ]
+
+
+def apply_actions(model, wrapper_actions, timestamp):
+    results = []
+    for (
+        action_type,
+        total_staked,
+        depositor,
+        staked,
+        reward_per_second,
+        end_date,
+    ) in wrapper_actions:
+        if action_type == UPDATE_REWARD_PERIOD:
+            rewards.update_reward_period(
+                model, total_staked, reward_per_second, end_date, timestamp
+            )
+            results.append(0)
+        elif action_type == UPDATE_DEPOSITOR_REWARD:
+            results.append(
+                rewards.update_depositor_reward(
+                    model, total_staked, depositor, staked, timestamp
+                )
+            )
+        else:
+            results.append(
+                rewards.pay_depositor_reward(
+                    model, total_staked, depositor, staked, timestamp
+                )
+            )
+    return results
+
+
+@given(blocks=blocks)
+@settings(
+    max_examples=FUZZ_MAX_EXAMPLES,
+    phases=FUZZ_PHASES,
+    deadline=None,
+    derandomize=bool(os.environ.get("CI")),
+    report_multiple_bugs=False,
+    # chain is reverted between the examples by brownie's given()
+    suppress_health_check=[HealthCheck.function_scoped_fixture, HealthCheck.too_slow],
+)
+def test_model_matches_rewards_utils_wrapper_on_random_actions(
+    rewards_utils_wrapper, deployer, blocks
+):
+    model = rewards.RewardsState()
+    for time_jump, block_actions in blocks:
+        chain.sleep(time_jump)
+        wrapper_actions = to_wrapper_actions(block_actions, chain.time())
+        try:
+            # gas limit is set explicitly to broadcast the reverted batches too
+            tx = rewards_utils_wrapper.executeActions(
+                wrapper_actions, {"from": deployer, "gas_limit": BATCH_GAS_LIMIT}
+            )
+        except VirtualMachineError:
+            # the whole batch is reverted, so the model must fail on the same timestamp
+            with pytest.raises((ArithmeticError, ValueError)):
+                apply_actions(
+                    copy.deepcopy(model), wrapper_actions, history[-1].timestamp
+                )
+            continue
+
+        assert apply_actions(model, wrapper_actions, tx.timestamp) == list(
+            tx.return_value
+        )
+        assert model.as_tuple() == tuple(rewards_utils_wrapper.rewardsState())
+        for depositor in DEPOSITORS:
+            assert model.reward(depositor).as_tuple() == tuple(
+                rewards_utils_wrapper.depositorRewards(depositor)
+            )
@@ -0,0 +1,107 @@
+from brownie import Wei, chain, reverts
+from utils import rewards
+from utils.constants import (
+    ONE_WEEK,
+    DEFAULT_REWARDS_DURATION,
+    DEFAULT_TOTAL_STAKED,
+    DEFAULT_REWARD_PER_SECOND,
+)
+
+MODEL_METHODS = {
+    "updateRewardPeriod": "update_reward_period",
+    "updateDepositorReward": "update_depositor_reward",
+    "payDepositorReward": "pay_depositor_reward",
+}
+
+
+def test_packed_rewards_state_layout(packed_rewards_utils_wrapper, deployer):
+    end_date = chain[-1].timestamp + DEFAULT_REWARDS_DURATION
+    tx = packed_rewards_utils_wrapper.updateRewardPeriod(
+        DEFAULT_TOTAL_STAKED, DEFAULT_REWARD_PER_SECOND, end_date, {"from": deployer}
+    )
+    rewards_state = packed_rewards_utils_wrapper.rewardsState().dict()
+    assert rewards_state["accumulatedRewardPerToken"] == 0
+    assert rewards_state["updatedAt"] == tx.timestamp
+    assert rewards_state["endDate"] == end_date
+    assert rewards_state["rewardPerSecond"] == DEFAULT_REWARD_PER_SECOND
+
+    # end date must fit into uint48
+    with reverts("UINT48_OVERFLOW"):
+        packed_rewards_utils_wrapper.updateRewardPeriod(
+            DEFAULT_TOTAL_STAKED, DEFAULT_REWARD_PER_SECOND, 2 ** 48, {"from": deployer}
+        )
+
+    # upcoming reward must fit into uint96. Reward per token of the large stake
+    # stays far below 2^160, while the reward of the depositor exceeds 2^96
+    total_staked = 2 ** 100
+    packed_rewards_utils_wrapper.updateRewardPeriod(
+        total_staked,
+        2 ** 96,
+        chain[-1].timestamp + DEFAULT_REWARDS_DURATION,
+        {"from": deployer},
+    )
+    chain.sleep(ONE_WEEK)
+    with reverts("UINT96_OVERFLOW"):
+        packed_rewards_utils_wrapper.updateDepositorReward(
+            total_staked, deployer, total_staked, {"from": deployer}
+        )
+
+
+def test_packed_layout_matches_and_saves_gas(
+    rewards_utils_wrapper, packed_rewards_utils_wrapper, deployer, depositors
+):
+    wrappers = [rewards_utils_wrapper, packed_rewards_utils_wrapper]
+    models = {wrapper: rewards.RewardsState() for wrapper in wrappers}
+    gas_used = {wrapper: {} for wrapper in wrappers}
+
+    def run(method, *args):
+        # both layouts must return the same values as the exact off-chain model
+        for wrapper in wrappers:
+            tx = getattr(wrapper, method)(*args, {"from": deployer})
+            gas_used[wrapper].setdefault(method, []).append(tx.gas_used)
+            model_args = [a.address if hasattr(a, "address") else a for a in args]
+            expected = getattr(rewards, MODEL_METHODS[method])(
+                models[wrapper], *model_args, tx.timestamp
+            )
+            assert tx.return_value == expected
+
+    end_date = chain[-1].timestamp + DEFAULT_REWARDS_DURATION
+    run("updateRewardPeriod", DEFAULT_TOTAL_STAKED, DEFAULT_REWARD_PER_SECOND, end_date)
+
+    total_staked = DEFAULT_TOTAL_STAKED
+    balances = {depositor: 0 for depositor in depositors}
+    stakes = [Wei("1 ether"), Wei("0.33 ether"), 7]
+    for _ in range(3):
+        for depositor, stake in zip(depositors, stakes):
+            chain.sleep(ONE_WEEK // 3)
+            run("updateDepositorReward", total_staked, depositor, balances[depositor])
+            balances[depositor] += stake
+            total_staked += stake
+    for depositor in depositors:
+        chain.sleep(ONE_WEEK // 5)
+        run("payDepositorReward", total_staked, depositor, balances[depositor])
+
+    # validate that the stored state matches the model
+    (
+        accumulated_reward_per_token,
+        updated_at,
+        end_date,
+        reward_per_second,
+    ) = packed_rewards_utils_wrapper.rewardsState()
+    assert models[packed_rewards_utils_wrapper].as_tuple() == (
+        end_date,
+        updated_at,
+        reward_per_second,
+        accumulated_reward_per_token,
+    )
+    for depositor in depositors:
+        model_reward = models[packed_rewards_utils_wrapper].reward(depositor.address)
+        assert (
+            tuple(packed_rewards_utils_wrapper.depositorRewards(depositor))[::-1]
+            == model_reward.as_tuple()
+        )
+
+    # updates of the depositor's reward must be cheaper in the packed layout
+    plain = gas_used[rewards_utils_wrapper]["updateDepositorReward"]
+    packed = gas_used[packed_rewards_utils_wrapper]["updateDepositorReward"]
+    assert all(p < u for p, u in zip(packed, plain))
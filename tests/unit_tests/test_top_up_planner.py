@@ -0,0 +1,127 @@
+import pytest
+from utils import rewards, simulator, top_up_planner
+from utils.constants import ONE_DAY, ONE_WEEK, DEFAULT_REWARDS_DURATION
+
+START_TIMESTAMP = 1_600_000_000
+BUDGET = 10 ** 24 + 12345
+CURRENT_REWARD_PER_SECOND = 123_456_789_123
+
+
+@pytest.fixture(scope="module")
+def state():
+    # the current rewards period ends in 10 days
+    return rewards.RewardsState(
+        end_date=START_TIMESTAMP + 10 * ONE_DAY,
+        updated_at=START_TIMESTAMP,
+        reward_per_second=CURRENT_REWARD_PER_SECOND,
+    )
+
+
+@pytest.fixture(scope="module")
+def schedules():
+    return [
+        [START_TIMESTAMP + i * interval for i in range(count)]
+        for interval in [ONE_WEEK, 2 * ONE_WEEK, DEFAULT_REWARDS_DURATION + ONE_DAY]
+        for count in [3, 6]
+    ]
+
+
+def test_constant_rate_top_ups_leave_no_dust(state, schedules):
+    plan = top_up_planner.plan_top_ups(
+        state, DEFAULT_REWARDS_DURATION, BUDGET, schedules
+    )
+    assert plan.dust == 0
+    assert plan.cancelled == 0
+    assert plan.spent <= BUDGET
+    assert len(set(plan.rewards_per_second)) == 1
+
+    # the best plan is never worse than the equal split of the budget
+    equal_split = top_up_planner.simulate_top_ups(
+        state,
+        DEFAULT_REWARDS_DURATION,
+        [
+            top_up_planner.TopUp(top_up.timestamp, BUDGET // len(plan.top_ups))
+            for top_up in plan.top_ups
+        ],
+    )
+    assert equal_split.dust > 0
+    assert plan.score(BUDGET) <= equal_split.score(BUDGET)
+
+    # spending any more breaks the budget
+    rate = top_up_planner.max_constant_rate(
+        state,
+        DEFAULT_REWARDS_DURATION,
+        [top_up.timestamp for top_up in plan.top_ups],
+        BUDGET,
+    )
+    assert rate == plan.rewards_per_second[0]
+    more_expensive = top_up_planner.constant_rate_top_ups(
+        state,
+        DEFAULT_REWARDS_DURATION,
+        [top_up.timestamp for top_up in plan.top_ups],
+        rate + 1,
+    )
+    assert sum(amount for _, amount in more_expensive) > BUDGET
+
+
+def test_plan_matches_simulator(state, schedules):
+    for plan in top_up_planner.candidate_plans(
+        state, DEFAULT_REWARDS_DURATION, BUDGET, schedules
+    ):
+        sim = simulator.RewardsSimulator(1, DEFAULT_REWARDS_DURATION)
+        sim.state = rewards.RewardsState(*state.as_tuple())
+        sim.run(
+            [
+                (timestamp, simulator.NOTIFY_REWARD_AMOUNT, 0, 0, amount)
+                for timestamp, amount in plan.top_ups
+            ]
+        )
+        assert sim.division_remainder == plan.dust
+        assert sim.state.reward_per_second == plan.rewards_per_second[-1]
+
+
+def test_rate_jumps(state):
+    # the second top-up is made after the end of the first period
+    timestamps = [START_TIMESTAMP, START_TIMESTAMP + DEFAULT_REWARDS_DURATION + 1]
+    top_ups = top_up_planner.constant_rate_top_ups(
+        state, DEFAULT_REWARDS_DURATION, timestamps, CURRENT_REWARD_PER_SECOND
+    )
+    plan = top_up_planner.simulate_top_ups(state, DEFAULT_REWARDS_DURATION, top_ups)
+    assert plan.rewards_per_second == (CURRENT_REWARD_PER_SECOND,) * 2
+    assert plan.dust == 0
+    # the rate drops to zero at the end of the period and restores on the top-up
+    assert plan.rate_jumps == 2 * CURRENT_REWARD_PER_SECOND
+    assert plan.max_rate_jump == CURRENT_REWARD_PER_SECOND
+
+
+def test_period_finish_update(state):
+    timestamps = [START_TIMESTAMP]
+    top_ups = top_up_planner.constant_rate_top_ups(
+        state, DEFAULT_REWARDS_DURATION, timestamps, CURRENT_REWARD_PER_SECOND
+    )
+    period_finish = START_TIMESTAMP + ONE_WEEK
+    plan = top_up_planner.simulate_top_ups(
+        state, DEFAULT_REWARDS_DURATION, top_ups, period_finish
+    )
+    assert plan.period_finish == period_finish
+    assert plan.cancelled == CURRENT_REWARD_PER_SECOND * (
+        DEFAULT_REWARDS_DURATION - ONE_WEEK
+    )
+
+    # unfunded extensions of the period are never planned
+    plans = top_up_planner.candidate_plans(
+        state,
+        DEFAULT_REWARDS_DURATION,
+        BUDGET,
+        [timestamps],
+        START_TIMESTAMP + 2 * DEFAULT_REWARDS_DURATION,
+    )
+    assert plans == []
+    with pytest.raises(ValueError):
+        top_up_planner.plan_top_ups(
+            state,
+            DEFAULT_REWARDS_DURATION,
+            BUDGET,
+            [timestamps],
+            START_TIMESTAMP + 2 * DEFAULT_REWARDS_DURATION,
+        )
@@ -0,0 +1,317 @@
+"""
+Asyncio read layer over JSON-RPC. Requests made concurrently are coalesced into
+JSON-RPC batches during the short batch window. The batches are sent concurrently
+over the pool of keep-alive HTTP connections or pipelined over WebSocket
+connections, where the responses are matched with the requests by their ids.
+
+RPCClient runs AsyncRPCClient on the event loop in the background thread, so the
+sync code may fan out the reads of brownie contracts in a single call:
+
+    rpc_client().read([(steth.balanceOf, [holder]) for holder in holders])
+
+The layer is used where the reads fan out: by RewardsIndexer, which reads the
+internal balances of all holders of the indexed block range at once, and by
+ControllerMonitor, which reads the storage slots and the balance of every poll at
+once.
+"""
+import asyncio
+import itertools
+import json
+import threading
+import aiohttp
+import websockets
+from brownie import web3
+
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_MAX_BATCH_SIZE = 100
+# time the request waits for the concurrent ones to be sent in the same batch
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_TIMEOUT = 120
+
+
+class RPCError(Exception):
+    def __init__(self, error):
+        super().__init__(f"{error.get('code')}: {error.get('message')}")
+        self.error = error
+
+
+class HTTPTransport:
+    def __init__(self, endpoint_uri, max_connections, timeout):
+        self.endpoint_uri = endpoint_uri
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.session = None
+
+    async def send(self, payload):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        async with self.session.post(self.endpoint_uri, json=payload) as response:
+            response.raise_for_status()
+            result = await response.json(content_type=None)
+        # the whole batch is rejected with the single error response
+        if isinstance(result, dict):
+            raise RPCError(result.get("error", result))
+        return result
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class WebsocketConnection:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.pending = {}
+        self.reader = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        try:
+            async for message in self.websocket:
+                responses = json.loads(message)
+                if isinstance(responses, dict):
+                    responses = [responses]
+                future = None
+                for response in responses:
+                    future = self.pending.pop(response.get("id"), future)
+                if future is None:
+                    # the batch rejected as a whole is answered by the error with null id
+                    error = responses[0].get("error") if responses else None
+                    self._fail(RPCError(error or {"message": "Unknown response"}))
+                    continue
+                # drop the ids of the batch missing in the response
+                self.pending = {
+                    request_id: pending_future
+                    for request_id, pending_future in self.pending.items()
+                    if pending_future is not future
+                }
+                if not future.done():
+                    future.set_result(responses)
+        except websockets.ConnectionClosed as error:
+            self._fail(error)
+        else:
+            self._fail(ConnectionError("WebSocket connection is closed"))
+
+    def _fail(self, error):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+
+
+class WebsocketTransport:
+    def __init__(self, endpoint_uri, max_connections, timeout):
+        self.endpoint_uri = endpoint_uri
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.connections = []
+        self._next_connection = itertools.count()
+        self._lock = None
+
+    async def send(self, payload):
+        connection = await self._connection()
+        future = asyncio.get_running_loop().create_future()
+        for request in payload:
+            connection.pending[request["id"]] = future
+        await connection.websocket.send(json.dumps(payload))
+        return await asyncio.wait_for(future, self.timeout)
+
+    async def close(self):
+        for connection in self.connections:
+            await connection.websocket.close()
+            await connection.reader
+        self.connections = []
+
+    async def _connection(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # connections are opened lazily and used in turn
+        async with self._lock:
+            self.connections = [
+                connection
+                for connection in self.connections
+                if not connection.reader.done()
+            ]
+            if len(self.connections) < self.max_connections:
+                websocket = await websockets.connect(self.endpoint_uri, max_size=None)
+                self.connections.append(WebsocketConnection(websocket))
+                return self.connections[-1]
+        return self.connections[next(self._next_connection) % len(self.connections)]
+
+
+class AsyncRPCClient:
+    def __init__(
+        self,
+        endpoint_uri=None,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        batch_window=DEFAULT_BATCH_WINDOW,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.endpoint_uri = endpoint_uri or web3.provider.endpoint_uri
+        transport_class = (
+            WebsocketTransport
+            if self.endpoint_uri.startswith(("ws://", "wss://"))
+            else HTTPTransport
+        )
+        self.transport = transport_class(self.endpoint_uri, max_connections, timeout)
+        self.max_connections = max_connections
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self._ids = itertools.count(1)
+        self._queue = []
+        self._flush_handle = None
+        # asyncio primitives are bound to the loop, so they are created on the first use
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def request(self, method, params=None):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        future = loop.create_future()
+        request = {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": params or [],
+        }
+        self._queue.append((request, future))
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    async def call(self, method, *args, block_identifier="latest"):
+        """Executes the view method of the brownie contract and decodes the result"""
+        result = await self.request(
+            "eth_call",
+            [
+                {"to": method._address, "data": method.encode_input(*args)},
+                _block_identifier(block_identifier),
+            ],
+        )
+        return method.decode_output(result)
+
+    async def read(self, calls, block_identifier="latest"):
+        """
+        Executes calls given as (contract_method, args) pairs concurrently. The call
+        given as (contract_method, args, block_identifier) is made at its own block
+        """
+        return await asyncio.gather(
+            *[
+                self.call(
+                    call[0],
+                    *call[1],
+                    block_identifier=call[2] if len(call) > 2 else block_identifier,
+                )
+                for call in calls
+            ]
+        )
+
+    async def get_storage_at(self, address, slot, block_identifier="latest"):
+        result = await self.request(
+            "eth_getStorageAt",
+            [address, hex(slot), _block_identifier(block_identifier)],
+        )
+        return int(result, 16)
+
+    async def block_number(self):
+        return int(await self.request("eth_blockNumber"), 16)
+
+    async def close(self):
+        if self._queue:
+            self._flush()
+        await self.transport.close()
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            asyncio.ensure_future(
+                self._send(queue[start : start + self.max_batch_size])
+            )
+
+    async def _send(self, batch):
+        async with self._semaphore:
+            try:
+                responses = await self.transport.send([request for request, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+        responses = {response.get("id"): response for response in responses}
+        for request, future in batch:
+            if future.done():
+                continue
+            response = responses.get(request["id"])
+            if response is None:
+                future.set_exception(RPCError({"message": "No response"}))
+            elif "error" in response:
+                future.set_exception(RPCError(response["error"]))
+            else:
+                future.set_result(response["result"])
+
+
+class RPCClient:
+    """Sync wrapper of AsyncRPCClient running on the event loop in the background thread"""
+
+    def __init__(self, endpoint_uri=None, **kwargs):
+        self.client = AsyncRPCClient(endpoint_uri, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def request(self, method, params=None):
+        return self.run(self.client.request(method, params))
+
+    def call(self, method, *args, block_identifier="latest"):
+        return self.run(
+            self.client.call(method, *args, block_identifier=block_identifier)
+        )
+
+    def read(self, calls, block_identifier="latest"):
+        return self.run(self.client.read(calls, block_identifier))
+
+    def get_storage_at(self, address, slot, block_identifier="latest"):
+        return self.run(self.client.get_storage_at(address, slot, block_identifier))
+
+    def close(self):
+        self.run(self.client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def rpc_client(endpoint_uri=None):
+    """Returns the shared RPCClient of the endpoint, by default of the one used by brownie"""
+    endpoint_uri = endpoint_uri or web3.provider.endpoint_uri
+    with _clients_lock:
+        if endpoint_uri not in _clients:
+            _clients[endpoint_uri] = RPCClient(endpoint_uri)
+        return _clients[endpoint_uri]
+
+
+def _block_identifier(block_identifier):
+    if isinstance(block_identifier, int):
+        return hex(block_identifier)
+    return block_identifier
@@ -0,0 +1,111 @@
+import bisect
+from pathlib import Path
+from brownie import web3
+from utils.indexer import DEFAULT_BLOCK_RANGE, RewardsIndexer, RewardsLedger
+from utils.log_fetcher import DEFAULT_CONFIRMATIONS
+
+# ~1 week of mainnet blocks
+DEFAULT_CHECKPOINT_INTERVAL = 45_000
+
+
+class RewardsCheckpoints:
+    """
+    Indexes the rewards of the depositors and snapshots the ledger every interval
+    blocks into the columnar store: rewardsState globals, Reward entries and
+    balances of the depositors. The ledger at any block is restored from the nearest
+    checkpoint at or before this block and the replay of the events after it, so
+    historical earned() replays at most interval blocks. The replay still reads the
+    internal balances of the holders at the blocks of the transfers, and the
+    ledger before the first checkpoint reads rewardsDuration at the start block,
+    so the node must serve the historical state of these blocks.
+
+    Note: replayed history has the same limitations as RewardsLedger
+    """
+
+    def __init__(
+        self,
+        incentives_controller,
+        staking_token,
+        path,
+        start_block=0,
+        interval=DEFAULT_CHECKPOINT_INTERVAL,
+        block_range=DEFAULT_BLOCK_RANGE,
+        log_cache_path=None,
+        log_confirmations=DEFAULT_CONFIRMATIONS,
+    ):
+        self.path = Path(path)
+        self.checkpoints_path = self.path / "checkpoints"
+        self.interval = interval
+        self.block_range = block_range
+        self.indexer = RewardsIndexer(
+            incentives_controller,
+            staking_token,
+            self.path / "ledger.json",
+            start_block=start_block,
+            block_range=block_range,
+            log_cache_path=log_cache_path,
+            log_confirmations=log_confirmations,
+        )
+
+    def update(self, to_block=None):
+        """Indexes the events till to_block and writes the checkpoints passed by"""
+        if to_block is None:
+            to_block = web3.eth.block_number
+        while self.indexer.next_block <= to_block:
+            # checkpoints are aligned to the start block to not depend on the update calls
+            next_block = self.indexer.next_block
+            offset = (next_block - self.indexer.start_block) % self.interval
+            interval_end = next_block + self.interval - 1 - offset
+            ledger = self.indexer.run(min(interval_end, to_block))
+            if ledger.last_block == interval_end:
+                ledger.write_store(self.checkpoint_path(interval_end))
+        return self.indexer.ledger
+
+    def checkpoint_blocks(self):
+        if not self.checkpoints_path.exists():
+            return []
+        return sorted(
+            int(path.name)
+            for path in self.checkpoints_path.iterdir()
+            if path.name.isdigit()
+        )
+
+    def checkpoint_path(self, block_number):
+        return self.checkpoints_path / f"{block_number:012d}"
+
+    def ledger_at(self, block_number):
+        """Returns the ledger with the state after the given block"""
+        if block_number < self.indexer.start_block:
+            raise ValueError(f"Block {block_number} precedes the indexed history")
+        checkpoint_blocks = self.checkpoint_blocks()
+        index = bisect.bisect_right(checkpoint_blocks, block_number)
+        if index == 0:
+            ledger = self.indexer.new_ledger()
+            from_block = self.indexer.start_block
+        else:
+            ledger = RewardsLedger.from_store(
+                self.checkpoint_path(checkpoint_blocks[index - 1])
+            )
+            from_block = ledger.last_block + 1
+
+        while from_block <= block_number:
+            range_end = min(from_block + self.block_range - 1, block_number)
+            for event in self.indexer.fetch_events(from_block, range_end):
+                ledger.apply(*event)
+            ledger.end_block(range_end)
+            from_block = range_end + 1
+        self.indexer.block_timestamps.clear()
+        return ledger
+
+    def earned_at(self, block_number, depositors=None):
+        """
+        Returns dict with earned rewards of the depositors at the given block. When
+        depositors aren't passed, returns rewards of all known depositors
+        """
+        ledger = self.ledger_at(block_number)
+        timestamp = self.indexer.block_timestamp(block_number)
+        if depositors is None:
+            depositors = sorted(set(ledger.balances) | set(ledger.state.rewards))
+        return {
+            depositor: ledger.earned(depositor, timestamp) for depositor in depositors
+        }
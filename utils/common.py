@@ -1,3 +1,6 @@
+import os
+import time
+from contextlib import contextmanager
 from brownie import web3
 
 
@@ -7,3 +10,25 @@ def is_almost_equal(a, b, epsilon=100):
 
 def typed_solidity_error(error_signature):
     return f"typed error: {web3.keccak(text=error_signature)[:4].hex()}"
+
+
+@contextmanager
+def file_lock(path, timeout=60, poll_interval=0.05):
+    """
+    Exclusive lock between processes (e.g. pytest-xdist workers) based on
+    the atomic creation of the lock file
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Can't acquire lock {path}")
+            time.sleep(poll_interval)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(path)
@@ -2,8 +2,16 @@ import os
 import sys
 from brownie import network, accounts
 
+# development network without mainnet fork, see README
+LOCAL_NETWORK = "development-local"
+
+
 def get_is_live():
-    return network.show_active() != "development"
+    return network.show_active() not in ("development", LOCAL_NETWORK)
+
+
+def get_is_local_backend():
+    return network.show_active() == LOCAL_NETWORK
 
 
 def get_deployer_account(is_live):
@@ -1,17 +1,24 @@
+import os
+import json
+import hashlib
 from pathlib import Path
-from brownie import (
-    Contract,
-    AaveAStETHIncentivesController,
-    config,
-    ZERO_ADDRESS,
-    project,
-)
+from brownie import Contract, config, ZERO_ADDRESS, chain, project
 from utils.common import is_almost_equal
 from utils import aave, constants
 
 AAVE_DEPENDENCY_NAME = "lidofinance/aave-protocol-v2@1.0+1"
 REWARDS_MANAGER_DEPENDENCY_NAME = "lidofinance/staking-rewards-sushi@0.1.0"
 
+DEPENDENCY_CACHE_DIR = Path(__file__).parent.parent / "build" / "dependency_cache"
+# changes of the format of the cached artifacts invalidate the cache
+DEPENDENCY_CACHE_FORMAT = "full-build"
+# contracts which are loaded from the on-disk cache instead of the package project.
+# They must not require linking of libraries, which are deployed via the package project
+CACHED_CONTRACTS = {
+    AAVE_DEPENDENCY_NAME: ["AStETH", "VariableDebtStETH", "StableDebtStETH"],
+    REWARDS_MANAGER_DEPENDENCY_NAME: ["RewardsManager"],
+}
+
 
 def add_aave_reserve(
     lending_pool_configurator,
@@ -22,13 +29,14 @@ def add_aave_reserve(
     underlying_asset,
     pool_admin,
     deployer,
+    interest_rate_strategy=aave.WETH9_INTEREST_RATE_STRATEGY_ADDRESS,
 ):
     lending_pool_configurator.initReserve(
         atoken_impl,
         stable_debt_token_impl,
         variable_debt_token_impl,
         18,
-        aave.WETH9_INTEREST_RATE_STRATEGY_ADDRESS,
+        interest_rate_strategy,
         {"from": pool_admin},
     )
 
@@ -107,11 +115,33 @@ def deploy_incentives_controller(
     rewards_duration=constants.DEFAULT_REWARDS_DURATION,
     tx_params=None,
 ):
+    # contract containers are imported on the first use to keep the module
+    # cheap to import by the scripts before the project is needed
+    from brownie import AaveAStETHIncentivesController
+
     return AaveAStETHIncentivesController.deploy(
         reward_token, rewards_duration, rewards_distributor, tx_params
     )
 
 
+def deploy_merkle_incentives_controller(
+    reward_token,
+    rewards_distributor,
+    merkle_root_updater,
+    rewards_duration=constants.DEFAULT_REWARDS_DURATION,
+    tx_params=None,
+):
+    from brownie import MerkleAStETHIncentivesController
+
+    return MerkleAStETHIncentivesController.deploy(
+        reward_token,
+        rewards_duration,
+        rewards_distributor,
+        merkle_root_updater,
+        tx_params,
+    )
+
+
 def deploy_rewards_manager(tx_params):
     RewardsManager = DependencyLoader.load(
         REWARDS_MANAGER_DEPENDENCY_NAME, "RewardsManager"
@@ -119,23 +149,147 @@ def deploy_rewards_manager(tx_params):
     return RewardsManager.deploy(tx_params)
 
 
+def deploy_multicall(tx_params):
+    from brownie import Multicall
+
+    return Multicall.deploy(tx_params)
+
+
 class DependencyLoader(object):
+    """
+    Loads contracts from the brownie packages. Loading of the package project reparses
+    and possibly recompiles the whole package, so artifacts of the contracts listed in
+    CACHED_CONTRACTS are cached on disk and later loaded without the package project.
+    The full build artifact is cached, so the program counter map and the revert
+    strings are kept. Coverage requires the sources of the package, so the package
+    project is loaded instead of the cache when the coverage is evaluated
+    """
+
     dependencies = {}
+    containers = {}
+    cache_dir = DEPENDENCY_CACHE_DIR
 
     @staticmethod
     def load(dependency_name, contract_name):
+        key = (dependency_name, contract_name)
+        if key not in DependencyLoader.containers:
+            DependencyLoader.containers[key] = DependencyLoader._load_container(
+                dependency_name, contract_name
+            )
+        return DependencyLoader.containers[key]
+
+    @staticmethod
+    def load_project(dependency_name):
         if dependency_name not in DependencyLoader.dependencies:
-            dependency_index = config["dependencies"].index(dependency_name)
             DependencyLoader.dependencies[dependency_name] = project.load(
-                Path.home()
-                / ".brownie"
-                / "packages"
-                / config["dependencies"][dependency_index]
+                _package_path(dependency_name)
+            )
+        return DependencyLoader.dependencies[dependency_name]
+
+    @staticmethod
+    def _load_container(dependency_name, contract_name):
+        from brownie._config import CONFIG
+
+        is_cached = contract_name in CACHED_CONTRACTS.get(dependency_name, [])
+        if not is_cached or CONFIG.argv.get("coverage"):
+            return getattr(
+                DependencyLoader.load_project(dependency_name), contract_name
             )
-        return getattr(DependencyLoader.dependencies[dependency_name], contract_name)
+
+        build_path = (
+            Path(DependencyLoader.cache_dir)
+            / _dependency_cache_key(dependency_name)
+            / f"{contract_name}.json"
+        )
+        if build_path.exists():
+            from brownie.network.contract import ContractContainer
+
+            with open(build_path) as f:
+                build = json.load(f)
+            main_project = project.get_loaded_projects()[0]
+            # restores the integer keys of pcMap and registers the revert strings
+            main_project._build._add_contract(build)
+            return ContractContainer(main_project, build)
+
+        container = getattr(
+            DependencyLoader.load_project(dependency_name), contract_name
+        )
+        build_path.parent.mkdir(parents=True, exist_ok=True)
+        # several processes might write the same artifact simultaneously
+        tmp_path = build_path.with_name(f"{build_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(container._build, f)
+        os.replace(tmp_path, build_path)
+        return container
+
+
+def _package_path(dependency_name):
+    dependency_index = config["dependencies"].index(dependency_name)
+    return (
+        Path.home() / ".brownie" / "packages" / config["dependencies"][dependency_index]
+    )
+
+
+def _dependency_cache_key(dependency_name):
+    """
+    Hash of the dependency version and the settings which affect the compiled
+    artifacts: brownie version, compiler settings of the project and the package
+    """
+    import brownie
+
+    package_config = ""
+    for config_name in [
+        "brownie-config.yaml",
+        "brownie-config.yml",
+        "brownie-config.json",
+    ]:
+        config_path = _package_path(dependency_name) / config_name
+        if config_path.exists():
+            package_config = config_path.read_text()
+            break
+    key_source = "\n".join(
+        [
+            DEPENDENCY_CACHE_FORMAT,
+            dependency_name,
+            brownie.__version__,
+            json.dumps(config["compiler"], sort_keys=True, default=str),
+            package_config,
+        ]
+    )
+    return hashlib.sha256(key_source.encode()).hexdigest()[:16]
+
+
+class ChainSnapshot(object):
+    """
+    Snapshot of the chain which might be reverted to multiple times. Unlike
+    chain.snapshot() it doesn't replace the snapshot reverted by chain.revert(),
+    so it might be used together with the isolation of the tests. The chain is
+    reverted via brownie, so the transaction history, the deployed contracts
+    and the time offset are synced with the reverted chain.
+
+    Note: brownie has no public API for the additional snapshots, so the revert
+    uses the internals of Chain. The brownie version is pinned in pyproject.toml
+    and the behaviour is covered by tests/unit_tests/test_chain_snapshot.py
+    """
+
+    def __init__(self):
+        from brownie.network import rpc
+
+        self.snapshot_id = rpc.Rpc().snapshot()
+
+    def revert(self):
+        # the undo buffer keeps the snapshots taken after this one, which are
+        # removed by the node on revert
+        chain._undo_buffer.clear()
+        chain._redo_buffer.clear()
+        # reverted snapshot is removed by the node, so it's taken again
+        self.snapshot_id = chain._revert(self.snapshot_id)
 
 
 class AaveReserve:
+    # utils.gas_profile.GasProfiler set by the tests marked with gas_profile
+    gas_profiler = None
+
     def __init__(
         self,
         lending_pool,
@@ -166,6 +320,7 @@ class AaveReserve:
             underlying_asset_balance_before_deposit - amount,
             self.underlying_asset.balanceOf(depositor),
         )
+        self._profile("deposit", tx)
         return tx
 
     def withdraw(self, depositor, amount=constants.MAX_UINT256, epsilon=100):
@@ -195,6 +350,7 @@ class AaveReserve:
         assert is_almost_equal(
             self.atoken.balanceOf(depositor), expected_atoken_depositor_balance, epsilon
         )
+        self._profile("withdraw", tx)
         return tx
 
     def transfer(self, sender, recipient, amount, epsilon=100):
@@ -209,4 +365,9 @@ class AaveReserve:
         assert is_almost_equal(
             self.atoken.balanceOf(recipient), expected_recipient_balance, epsilon
         )
+        self._profile("transfer", tx)
         return tx
+
+    def _profile(self, name, tx):
+        if self.gas_profiler is not None:
+            self.gas_profiler.record(name, tx)
@@ -1,6 +1,10 @@
-from brownie import web3
-import eth_abi
-from eth_typing.evm import HexAddress
+from eth_utils import to_checksum_address
+
+SPEC_ID_SIZE = 4
+ADDRESS_SIZE = 20
+CALLDATA_LENGTH_SIZE = 4
+ACTION_HEADER_SIZE = ADDRESS_SIZE + CALLDATA_LENGTH_SIZE
+MAX_CALLDATA_LENGTH = 2 ** (8 * CALLDATA_LENGTH_SIZE) - 1
 
 
 def create_executor_id(id):
@@ -12,10 +16,71 @@ def strip_byte_prefix(hexstr):
 
 
 def encode_call_script(actions, spec_id=1):
-    result = create_executor_id(spec_id)
-    for to, calldata in actions:
-        addr_bytes = web3.toBytes(hexstr=HexAddress(to)).hex()
-        calldata_bytes = strip_byte_prefix(calldata)
-        length = eth_abi.encode_single("int256", len(calldata_bytes) // 2).hex()
-        result += addr_bytes + length[56:] + calldata_bytes
-    return result
+    return "0x" + encode_call_script_bytes(actions, spec_id).hex()
+
+
+def encode_call_script_bytes(actions, spec_id=1):
+    """
+    Encodes (to, calldata) actions into the Aragon's CallsScript: spec id followed by
+    [20 bytes address][4 bytes calldata length][calldata] for each action. Calldata might be
+    passed as bytes or hex string. The script is written into the preallocated buffer
+    """
+    encoded_actions = [(_to_bytes(str(to)), _to_bytes(data)) for to, data in actions]
+    size = SPEC_ID_SIZE
+    for address, calldata in encoded_actions:
+        if len(address) != ADDRESS_SIZE:
+            raise ValueError(f"Invalid address 0x{address.hex()}")
+        if len(calldata) > MAX_CALLDATA_LENGTH:
+            raise ValueError(f"Calldata of {len(calldata)} bytes is too long")
+        size += ACTION_HEADER_SIZE + len(calldata)
+
+    script = bytearray(size)
+    script[:SPEC_ID_SIZE] = _to_bytes(create_executor_id(spec_id))
+    offset = SPEC_ID_SIZE
+    for address, calldata in encoded_actions:
+        length = len(calldata)
+        script[offset : offset + ADDRESS_SIZE] = address
+        offset += ADDRESS_SIZE
+        script[offset : offset + CALLDATA_LENGTH_SIZE] = length.to_bytes(
+            CALLDATA_LENGTH_SIZE, "big"
+        )
+        offset += CALLDATA_LENGTH_SIZE
+        script[offset : offset + length] = calldata
+        offset += length
+    return bytes(script)
+
+
+def decode_call_script(script):
+    """
+    Decodes the CallsScript encoded by encode_call_script(). Returns the spec id and
+    the list of (to, calldata) actions with checksummed addresses and hex calldata
+    """
+    script = _to_bytes(script)
+    if len(script) < SPEC_ID_SIZE:
+        raise ValueError("Script is shorter than the spec id")
+    spec_id = int(script[:SPEC_ID_SIZE].hex())
+    actions = []
+    offset = SPEC_ID_SIZE
+    while offset < len(script):
+        if offset + ACTION_HEADER_SIZE > len(script):
+            raise ValueError(f"Truncated action header at offset {offset}")
+        address = script[offset : offset + ADDRESS_SIZE]
+        offset += ADDRESS_SIZE
+        length = int.from_bytes(script[offset : offset + CALLDATA_LENGTH_SIZE], "big")
+        offset += CALLDATA_LENGTH_SIZE
+        if offset + length > len(script):
+            raise ValueError(f"Truncated calldata at offset {offset}")
+        actions.append(
+            (
+                to_checksum_address(address),
+                "0x" + script[offset : offset + length].hex(),
+            )
+        )
+        offset += length
+    return spec_id, actions
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return bytes(value)
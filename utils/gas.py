@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+from utils.common import file_lock
+
+DEFAULT_REGRESSION_THRESHOLD = 0.02
+
+# Scenarios of the handleAction hot path. "first" and "repeat" tell whether the
+# depositor has touched the incentives controller before the measured action.
+# The rest of the name describes the state of the reward period at the moment
+# of the measured action.
+FIRST_ACTION_WITHOUT_REWARDS = "first_action_without_rewards"
+FIRST_ACTION_INSIDE_PERIOD = "first_action_inside_period"
+REPEAT_ACTION_WITHOUT_REWARDS = "repeat_action_without_rewards"
+REPEAT_ACTION_INSIDE_PERIOD = "repeat_action_inside_period"
+REPEAT_ACTION_AFTER_PERIOD = "repeat_action_after_period"
+REPEAT_ACTION_AFTER_SETTLED_PERIOD = "repeat_action_after_settled_period"
+# The sender of the transfer is touched by the setup, which mints the tokens to
+# it, so only the recipient might not have touched the controller before
+NEW_RECIPIENT_WITHOUT_REWARDS = "new_recipient_without_rewards"
+NEW_RECIPIENT_INSIDE_PERIOD = "new_recipient_inside_period"
+
+FIRST_ACTION_SCENARIOS = [FIRST_ACTION_WITHOUT_REWARDS, FIRST_ACTION_INSIDE_PERIOD]
+NEW_RECIPIENT_SCENARIOS = [NEW_RECIPIENT_WITHOUT_REWARDS, NEW_RECIPIENT_INSIDE_PERIOD]
+REPEAT_ACTION_SCENARIOS = [
+    REPEAT_ACTION_WITHOUT_REWARDS,
+    REPEAT_ACTION_INSIDE_PERIOD,
+    REPEAT_ACTION_AFTER_PERIOD,
+    REPEAT_ACTION_AFTER_SETTLED_PERIOD,
+]
+SCENARIOS = FIRST_ACTION_SCENARIOS + REPEAT_ACTION_SCENARIOS
+TRANSFER_SCENARIOS = NEW_RECIPIENT_SCENARIOS + REPEAT_ACTION_SCENARIOS
+WITHOUT_REWARDS_SCENARIOS = [
+    FIRST_ACTION_WITHOUT_REWARDS,
+    NEW_RECIPIENT_WITHOUT_REWARDS,
+    REPEAT_ACTION_WITHOUT_REWARDS,
+]
+
+# whether the repeated action accrues non-zero reward to the depositor
+REPEAT_ACTION_EARNS = {
+    REPEAT_ACTION_WITHOUT_REWARDS: False,
+    REPEAT_ACTION_INSIDE_PERIOD: True,
+    REPEAT_ACTION_AFTER_PERIOD: True,
+    REPEAT_ACTION_AFTER_SETTLED_PERIOD: False,
+}
+
+
+class GasBaseline:
+    """
+    Keeps the gas used by the benchmarked actions. The measured values are
+    compared with the baseline loaded from the JSON file and written back by save()
+    """
+
+    def __init__(self, path, threshold=DEFAULT_REGRESSION_THRESHOLD):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.baseline = {}
+        self.measured = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                self.baseline = json.load(f)
+
+    def record(self, name, gas_used):
+        self.measured[name] = gas_used
+
+    def regression(self, name):
+        """
+        Returns description of the regression or None if there is no one. The
+        action missing in the baseline is reported as the regression too
+        """
+        expected, actual = self.baseline.get(name), self.measured[name]
+        if expected is None:
+            return f"{name}: {actual} gas used, baseline is missing in {self.path}"
+        if actual <= expected * (1 + self.threshold):
+            return None
+        return (
+            f"{name}: {actual} gas used, baseline is {expected} "
+            f"(+{100 * (actual - expected) / expected:.2f}%, "
+            f"threshold {100 * self.threshold:.2f}%)"
+        )
+
+    def save(self):
+        # when tests run in parallel, every xdist worker saves its own measurements,
+        # so the file is reread under the lock to keep the values saved by others
+        with file_lock(self.path.with_name(self.path.name + ".lock")):
+            baseline = self.baseline
+            if self.path.exists():
+                with open(self.path) as f:
+                    baseline = {**self.baseline, **json.load(f)}
+            with open(self.path, "w") as f:
+                json.dump({**baseline, **self.measured}, f, indent=2, sort_keys=True)
+                f.write("\n")
@@ -0,0 +1,150 @@
+"""
+Attribution of the gas used by the transaction to the functions it executes. The
+steps of debug_traceTransaction annotated by brownie (tx.trace) are folded into
+stacks of the external and internal function calls. SSTOREs and the overhead of the
+external calls are kept as the separate leaves of the stacks. The folded stacks are
+written in the format consumed by flamegraph.pl and speedscope:
+    frame1;frame2;...;frameN gas
+"""
+from collections import Counter
+from pathlib import Path
+
+CALL_OPS = {"CALL", "CALLCODE", "DELEGATECALL", "STATICCALL", "CREATE", "CREATE2"}
+LEAF_OPS = CALL_OPS | {"SSTORE"}
+
+
+def fold_trace(trace):
+    """Returns Counter of the gas used by every stack of the trace"""
+    folded = Counter()
+    frames = []
+    # calls waiting for the return: (stack, depth, gas before the call, attributed gas)
+    pending_calls = []
+    attributed = 0
+    for i, step in enumerate(trace):
+        depth = step["depth"]
+        while pending_calls and depth <= pending_calls[-1][1]:
+            stack, _, gas_before, attributed_before = pending_calls.pop()
+            overhead = gas_before - step["gas"] - (attributed - attributed_before)
+            folded[stack] += overhead
+            attributed += overhead
+
+        key = (depth, step["jumpDepth"])
+        while frames and frames[-1][0] > key:
+            frames.pop()
+        if frames and frames[-1][0] == key:
+            frames[-1] = (key, _frame_name(step["fn"]))
+        else:
+            frames.append((key, _frame_name(step["fn"])))
+
+        stack = ";".join(frame for _, frame in frames)
+        op = step["op"]
+        if op in LEAF_OPS:
+            stack += ";" + op
+        next_step = trace[i + 1] if i + 1 < len(trace) else None
+        if op in CALL_OPS and next_step is not None and next_step["depth"] > depth:
+            pending_calls.append((stack, depth, step["gas"], attributed))
+            continue
+        if op in CALL_OPS and next_step is not None:
+            # calls of precompiles and accounts without code have no steps
+            cost = step["gas"] - next_step["gas"]
+        else:
+            cost = step["gasCost"]
+        folded[stack] += cost
+        attributed += cost
+    return folded
+
+
+class GasProfile:
+    def __init__(self, name, gas_used, folded):
+        self.name = name
+        self.gas_used = gas_used
+        self.folded = folded
+
+    @property
+    def traced_gas(self):
+        return sum(self.folded.values())
+
+    def gas_of(self, name):
+        """
+        Gas used by the stacks containing the frame with the given name. The name
+        might be the full name of the function ("RewardsUtils.rewardPerToken"), its
+        contract ("RewardsUtils") or function ("handleAction") or the leaf op ("SSTORE")
+        """
+        return sum(
+            gas
+            for stack, gas in self.folded.items()
+            if any(_frame_matches(frame, name) for frame in stack.split(";"))
+        )
+
+    def leaf_gas(self, ops, within=None):
+        """Gas of the given leaf ops optionally limited by the stacks containing within"""
+        return sum(
+            gas
+            for stack, gas in self.folded.items()
+            if stack.rsplit(";", 1)[-1] in ops
+            and (
+                within is None
+                or any(_frame_matches(frame, within) for frame in stack.split(";"))
+            )
+        )
+
+    def summary(self):
+        return {
+            "gas_used": self.gas_used,
+            # intrinsic gas of the transaction minus refunds
+            "untraced": self.gas_used - self.traced_gas,
+            "handleAction": self.gas_of("handleAction"),
+            "RewardsUtils": self.gas_of("RewardsUtils"),
+            "SSTORE": self.leaf_gas({"SSTORE"}),
+            "handleAction SSTORE": self.leaf_gas({"SSTORE"}, within="handleAction"),
+            "external calls": self.leaf_gas(CALL_OPS),
+        }
+
+
+def profile_transaction(tx, name=None):
+    return GasProfile(name or tx.fn_name, tx.gas_used, fold_trace(tx.trace))
+
+
+class GasProfiler:
+    """Collects the profiles of the transactions made by the test"""
+
+    def __init__(self):
+        self.profiles = []
+
+    def record(self, name, tx):
+        profile = profile_transaction(tx, name)
+        self.profiles.append(profile)
+        return profile
+
+    def folded(self):
+        """Returns the stacks of all profiles prefixed with the names of the profiles"""
+        folded = Counter()
+        for profile in self.profiles:
+            for stack, gas in profile.folded.items():
+                folded[f"{_frame_name(profile.name)};{stack}"] += gas
+        return folded
+
+    def write_folded(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for stack, gas in sorted(self.folded().items()):
+                if gas > 0:
+                    f.write(f"{stack} {gas}\n")
+
+
+def read_folded(path):
+    folded = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, gas = line.rsplit(" ", 1)
+            folded[stack] += int(gas)
+    return folded
+
+
+def _frame_name(name):
+    return name.replace(";", ":").replace(" ", "_")
+
+
+def _frame_matches(frame, name):
+    return frame == name or name in frame.split(".", 1)
@@ -0,0 +1,424 @@
+import json
+import os
+from pathlib import Path
+from brownie import web3, ZERO_ADDRESS
+from eth_utils import keccak, to_checksum_address
+from utils import rewards, rewards_store
+from utils.async_rpc import rpc_client
+from utils.log_fetcher import (
+    DEFAULT_CONFIRMATIONS,
+    EventDecoder,
+    LogCache,
+    LogFetcher,
+    serialize_log,
+)
+
+DEFAULT_BLOCK_RANGE = 2_000
+
+CONTROLLER_EVENTS = (
+    "RewardsAccrued",
+    "RewardPaid",
+    "RewardsPaid",
+    "RewardAdded",
+    "RewardsDurationUpdated",
+)
+STAKING_TOKEN_EVENTS = ("Transfer",)
+# args added to the Transfer events by the RewardsIndexer
+SENDER_INTERNAL_BALANCE = "fromInternalBalance"
+RECIPIENT_INTERNAL_BALANCE = "toInternalBalance"
+INTERNAL_TOTAL_SUPPLY = "internalTotalSupply"
+# arg added to the RewardsPaid events by the RewardsIndexer
+PAID_REWARDS = "paidRewards"
+TRANSFER_TOPIC = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+
+
+class RewardsLedger:
+    """
+    Per-depositor reward ledger rebuilt from the events of the incentives controller
+    and its staking token. Balance changes of the staking token replay handleAction()
+    through utils.rewards. Rewards are accrued on the internal balances of the
+    staking token, so Transfer events are expected to carry the internal balances
+    of the sender and the recipient and the internal total supply, added by the
+    RewardsIndexer. Without them the ledger falls back to the transferred value,
+    which is exact only while the rebasing index of the token is 1. RewardsAccrued
+    and RewardPaid values reported by the controller take precedence over the
+    replayed ones. RewardsPaid reports only the number of the depositors and the
+    total reward of the batched claim, the rewards paid to the depositors are
+    expected to be added by the RewardsIndexer from the transfers of the reward
+    token. Only the total is validated.
+
+    Note: updatePeriodFinish() and claims with zero reward don't emit events, so
+    they can't be replayed. The depositors of the batched claim with zero reward
+    aren't known either. Each divergence found on the next reported event is
+    counted in the mismatches field.
+    """
+
+    def __init__(self, incentives_controller=None, staking_token=None):
+        self.incentives_controller = incentives_controller
+        self.staking_token = staking_token
+        self.state = rewards.RewardsState()
+        self.rewards_duration = 0
+        self.total_supply = 0
+        self.balances = {}
+        self.last_block = None
+        self.mismatches = 0
+        self._pending_accruals = {}
+
+    def earned(self, depositor, timestamp):
+        return rewards.earned_reward(
+            self.state,
+            self.total_supply,
+            depositor,
+            self.balances.get(depositor, 0),
+            timestamp,
+        )
+
+    def apply(self, name, args, timestamp, tx_hash):
+        if name == "Transfer":
+            self._on_transfer(args, timestamp, tx_hash)
+        elif name == "RewardsAccrued":
+            self._pending_accruals[(tx_hash, args["depositor"])] = args["earnedRewards"]
+        elif name == "RewardPaid":
+            self._on_reward_paid(args["user"], args["reward"], timestamp)
+        elif name == "RewardsPaid":
+            self._on_rewards_paid(
+                args.get(PAID_REWARDS, []), args["totalReward"], timestamp
+            )
+        elif name == "RewardAdded":
+            rewards.notify_reward_amount(
+                self.state,
+                args["rewardAmount"],
+                self.rewards_duration,
+                self.total_supply,
+                timestamp,
+            )
+        elif name == "RewardsDurationUpdated":
+            self.rewards_duration = args["newDuration"]
+
+    def end_block(self, block_number):
+        # all events of the transaction are processed within the same block range
+        self._pending_accruals.clear()
+        self.last_block = block_number
+
+    def _on_transfer(self, args, timestamp, tx_hash):
+        sender, recipient, amount = args["from"], args["to"], args["value"]
+        if sender != ZERO_ADDRESS:
+            self._handle_action(sender, timestamp, tx_hash)
+        if recipient != ZERO_ADDRESS and recipient != sender:
+            self._handle_action(recipient, timestamp, tx_hash)
+
+        if INTERNAL_TOTAL_SUPPLY in args:
+            # balances at the end of the block are exact, because the rest actions
+            # of the block have the same timestamp and accrue nothing
+            self.total_supply = args[INTERNAL_TOTAL_SUPPLY]
+            if sender != ZERO_ADDRESS:
+                self.balances[sender] = args[SENDER_INTERNAL_BALANCE]
+            if recipient != ZERO_ADDRESS:
+                self.balances[recipient] = args[RECIPIENT_INTERNAL_BALANCE]
+            return
+
+        if sender == ZERO_ADDRESS:
+            self.total_supply += amount
+        else:
+            # the sender might receive tokens before the start block of the indexer
+            self.balances[sender] = self.balances.get(sender, 0) - amount
+        if recipient == ZERO_ADDRESS:
+            self.total_supply -= amount
+        else:
+            self.balances[recipient] = self.balances.get(recipient, 0) + amount
+
+    def _handle_action(self, depositor, timestamp, tx_hash):
+        earned = rewards.update_depositor_reward(
+            self.state,
+            self.total_supply,
+            depositor,
+            self.balances.get(depositor, 0),
+            timestamp,
+        )
+        accrued = self._pending_accruals.pop((tx_hash, depositor), None)
+        if accrued is not None and accrued != earned:
+            self.state.rewards[depositor].upcoming_reward = accrued
+            self.mismatches += 1
+
+    def _on_reward_paid(self, depositor, reward, timestamp):
+        depositor_reward = self.state.reward(depositor)
+        paid_before = depositor_reward.paid_reward
+        paid = rewards.pay_depositor_reward(
+            self.state,
+            self.total_supply,
+            depositor,
+            self.balances.get(depositor, 0),
+            timestamp,
+        )
+        if paid != reward:
+            depositor_reward.paid_reward = paid_before + reward
+            self.mismatches += 1
+
+    def _on_rewards_paid(self, paid_rewards, total_reward, timestamp):
+        for depositor, reward in paid_rewards:
+            self._on_reward_paid(depositor, reward, timestamp)
+        if sum(reward for _, reward in paid_rewards) != total_reward:
+            self.mismatches += 1
+
+    def to_dict(self):
+        return {
+            "incentives_controller": self.incentives_controller,
+            "staking_token": self.staking_token,
+            "last_block": self.last_block,
+            "rewards_duration": self.rewards_duration,
+            "total_supply": self.total_supply,
+            "mismatches": self.mismatches,
+            "state": list(self.state.as_tuple()),
+            "rewards": {
+                depositor: list(reward.as_tuple())
+                for depositor, reward in self.state.rewards.items()
+            },
+            "balances": self.balances,
+        }
+
+    @staticmethod
+    def from_dict(data):
+        ledger = RewardsLedger(data["incentives_controller"], data["staking_token"])
+        ledger.last_block = data["last_block"]
+        ledger.rewards_duration = data["rewards_duration"]
+        ledger.total_supply = data["total_supply"]
+        ledger.mismatches = data["mismatches"]
+        ledger.state = rewards.RewardsState.from_tuple(data["state"])
+        for depositor, reward in data["rewards"].items():
+            ledger.state.rewards[depositor] = rewards.Reward(*reward)
+        ledger.balances = data["balances"]
+        return ledger
+
+    def write_store(self, path):
+        """Writes the depositors' rewards and balances into the columnar store"""
+        depositors = sorted(set(self.balances) | set(self.state.rewards))
+        depositor_rewards = [
+            self.state.rewards.get(depositor) or rewards.Reward()
+            for depositor in depositors
+        ]
+        columns = {
+            "balance": [self.balances.get(depositor, 0) for depositor in depositors],
+            "paid_reward": [reward.paid_reward for reward in depositor_rewards],
+            "upcoming_reward": [reward.upcoming_reward for reward in depositor_rewards],
+            "accumulated_reward_per_token_paid": [
+                reward.accumulated_reward_per_token_paid for reward in depositor_rewards
+            ],
+        }
+        meta = {
+            "incentives_controller": self.incentives_controller,
+            "staking_token": self.staking_token,
+            "last_block": self.last_block,
+            "rewards_duration": self.rewards_duration,
+            "total_supply": self.total_supply,
+            "mismatches": self.mismatches,
+            "state": list(self.state.as_tuple()),
+        }
+        rewards_store.write_store(path, depositors, columns, meta)
+
+    @staticmethod
+    def from_store(path):
+        depositors, columns, meta = rewards_store.read_store(path)
+        ledger = RewardsLedger.from_dict({**meta, "rewards": {}, "balances": {}})
+        for i, depositor in enumerate(depositors):
+            ledger.balances[depositor] = columns["balance"][i]
+            ledger.state.rewards[depositor] = rewards.Reward(
+                columns["paid_reward"][i],
+                columns["upcoming_reward"][i],
+                columns["accumulated_reward_per_token_paid"][i],
+            )
+        return ledger
+
+    def save(self, path):
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        with open(path) as f:
+            return RewardsLedger.from_dict(json.load(f))
+
+
+class RewardsIndexer:
+    """
+    Streams logs of the incentives controller and the staking token in fixed-size
+    block ranges, folds them into the RewardsLedger and checkpoints the ledger to
+    disk after every range. Transfer events are completed with the internal
+    balances of the holders and the internal total supply read at the block of the
+    event, the balances of the whole range are read concurrently by the async RPC
+    client. RewardsPaid events are completed with the rewards paid to the
+    depositors taken from the transfers of the reward token in the receipt of the
+    transaction. The rewards duration of the new ledger is read at the start block.
+    When the checkpoint exists, indexing resumes from the block next to the last
+    processed one. Logs are fetched by LogFetcher, when log_cache_path is passed,
+    the raw logs are cached there and the repeated walks over the indexed history
+    don't make requests to the node. The logs of the last log_confirmations blocks
+    aren't cached.
+    """
+
+    def __init__(
+        self,
+        incentives_controller,
+        staking_token,
+        checkpoint_path,
+        start_block=0,
+        block_range=DEFAULT_BLOCK_RANGE,
+        log_cache_path=None,
+        log_confirmations=DEFAULT_CONFIRMATIONS,
+    ):
+        self.incentives_controller = incentives_controller
+        self.staking_token = staking_token
+        self.checkpoint_path = Path(checkpoint_path)
+        self.start_block = start_block
+        self.block_range = block_range
+        self.addresses = [incentives_controller.address, staking_token.address]
+        self.decoders = {
+            incentives_controller.address: EventDecoder(
+                incentives_controller.abi, CONTROLLER_EVENTS
+            ),
+            staking_token.address: EventDecoder(
+                staking_token.abi, STAKING_TOKEN_EVENTS
+            ),
+        }
+        self.log_fetcher = LogFetcher(
+            LogCache(log_cache_path) if log_cache_path is not None else None,
+            block_range=block_range,
+            confirmations=log_confirmations,
+        )
+        self.block_timestamps = {}
+        self._reward_token = None
+
+        if self.checkpoint_path.exists():
+            self.ledger = RewardsLedger.load(self.checkpoint_path)
+            indexed = [self.ledger.incentives_controller, self.ledger.staking_token]
+            if indexed != self.addresses:
+                raise ValueError(
+                    f"Checkpoint {self.checkpoint_path} was built for other contracts"
+                )
+        else:
+            self.ledger = self.new_ledger()
+
+    def new_ledger(self):
+        """Returns the empty ledger to replay the events from the start block"""
+        ledger = RewardsLedger(*self.addresses)
+        # RewardsDurationUpdated might be emitted before the start block
+        ledger.rewards_duration = self.incentives_controller.rewardsDuration(
+            block_identifier=self.start_block
+        )
+        return ledger
+
+    @property
+    def next_block(self):
+        if self.ledger.last_block is None:
+            return self.start_block
+        return self.ledger.last_block + 1
+
+    def run(self, to_block=None):
+        if to_block is None:
+            to_block = web3.eth.block_number
+        from_block = self.next_block
+        while from_block <= to_block:
+            range_end = min(from_block + self.block_range - 1, to_block)
+            for event in self.fetch_events(from_block, range_end):
+                self.ledger.apply(*event)
+            self.ledger.end_block(range_end)
+            self.ledger.save(self.checkpoint_path)
+            self.block_timestamps.clear()
+            from_block = range_end + 1
+        return self.ledger
+
+    def fetch_events(self, from_block, to_block):
+        events = []
+        for address in self.addresses:
+            logs = self.log_fetcher.iter_logs(address, from_block, to_block)
+            events.extend(self.decoders[address].decode(logs))
+        events.sort(key=lambda event: (event[2]["blockNumber"], event[2]["logIndex"]))
+        internal_balances = self._read_internal_balances(
+            (args, log["blockNumber"])
+            for name, args, log in events
+            if name == "Transfer"
+        )
+        for name, args, log in events:
+            if name == "Transfer":
+                args = self._with_internal_balances(
+                    args, log["blockNumber"], internal_balances
+                )
+            elif name == "RewardsPaid":
+                args = self._with_paid_rewards(args, log)
+            yield (
+                name,
+                args,
+                self.block_timestamp(log["blockNumber"]),
+                log["transactionHash"],
+            )
+
+    def _read_internal_balances(self, transfers):
+        """
+        Returns internal balances and supply of the holders of the (args, block
+        number) transfers read at the blocks of the transfers
+        """
+        keys = list(
+            dict.fromkeys(
+                (holder, block_number)
+                for args, block_number in transfers
+                for holder in [args["from"], args["to"]]
+                if holder != ZERO_ADDRESS
+            )
+        )
+        if not keys:
+            return {}
+        values = rpc_client().read(
+            [
+                (self.staking_token.getInternalUserBalanceAndSupply, [holder], block)
+                for holder, block in keys
+            ]
+        )
+        return dict(zip(keys, values))
+
+    @staticmethod
+    def _with_internal_balances(args, block_number, internal_balances):
+        args = dict(args)
+        for holder, key in [
+            (args["from"], SENDER_INTERNAL_BALANCE),
+            (args["to"], RECIPIENT_INTERNAL_BALANCE),
+        ]:
+            if holder != ZERO_ADDRESS:
+                args[key], args[INTERNAL_TOTAL_SUPPLY] = internal_balances[
+                    (holder, block_number)
+                ]
+        return args
+
+    def _with_paid_rewards(self, args, rewards_paid_log):
+        if self._reward_token is None:
+            self._reward_token = self.incentives_controller.REWARD_TOKEN()
+        controller_topic = "0x" + "00" * 12 + self.incentives_controller.address[2:]
+        receipt = web3.eth.get_transaction_receipt(rewards_paid_log["transactionHash"])
+        paid_rewards = []
+        for log in map(serialize_log, receipt["logs"]):
+            if log["logIndex"] >= rewards_paid_log["logIndex"]:
+                break
+            # transfers of the batched claim follow the previous event of the controller
+            if log["address"] == self.incentives_controller.address:
+                paid_rewards = []
+            elif log["address"] == self._reward_token and log["topics"][:2] == [
+                TRANSFER_TOPIC,
+                controller_topic.lower(),
+            ]:
+                depositor = to_checksum_address("0x" + log["topics"][2][-40:])
+                paid_rewards.append((depositor, int(log["data"], 16)))
+        return {**args, PAID_REWARDS: paid_rewards}
+
+    def block_timestamp(self, block_number):
+        if block_number not in self.block_timestamps:
+            cache = self.log_fetcher.cache
+            timestamp = None if cache is None else cache.block_timestamp(block_number)
+            if timestamp is None:
+                timestamp = web3.eth.get_block(block_number)["timestamp"]
+                if cache is not None and block_number <= (
+                    web3.eth.block_number - self.log_fetcher.confirmations
+                ):
+                    cache.append_block_timestamp(block_number, timestamp)
+            self.block_timestamps[block_number] = timestamp
+        return self.block_timestamps[block_number]
@@ -57,4 +57,21 @@ def execute_voting(voting_id):
     chain.sleep(3 * 60 * 60 * 24)
     chain.mine()
     assert voting().canExecute(voting_id)
-    voting().executeVote(voting_id, {"from": accounts[0]})
+    return voting().executeVote(voting_id, {"from": accounts[0]})
+
+
+def execute_votings(voting_ids):
+    """
+    Votes for all votings before the single wait of the voting time. Votings
+    created in the same block can't be executed one by one with execute_voting(),
+    because the rest of them are closed for voting after the first wait
+    """
+    for voting_id in voting_ids:
+        voting().vote(voting_id, True, False, {"from": AGENT_ADDRESS})
+    chain.sleep(3 * 60 * 60 * 24)
+    chain.mine()
+    txs = []
+    for voting_id in voting_ids:
+        assert voting().canExecute(voting_id)
+        txs.append(voting().executeVote(voting_id, {"from": accounts[0]}))
+    return txs
@@ -0,0 +1,111 @@
+"""
+Fork-free replacement of the mainnet contracts used by the tests. LDO, stETH and
+Aragon apps are replaced with mocks placed at their mainnet addresses, so the code
+which refers to these addresses keeps working. AAVE market is deployed from the
+aave-protocol-v2 dependency with the mocked lending rate oracle.
+"""
+from brownie import (
+    Contract,
+    LdoMock,
+    StETHMock,
+    AgentMock,
+    VotingMock,
+    TokenManagerMock,
+    LendingRateOracleMock,
+    Wei,
+    web3,
+)
+from utils import lido, aave, deployment
+
+AGENT_LDO_BALANCE = Wei("10000000 ether")
+AGENT_ETH_BALANCE = Wei("100 ether")
+POOL_ADMIN_ETH_BALANCE = Wei("10 ether")
+
+RAY = 10 ** 27
+# parameters of the WETH interest rate strategy of the AAVE v2 mainnet market
+WETH9_INTEREST_RATE_STRATEGY_PARAMS = (
+    RAY * 65 // 100,  # optimal utilization rate
+    0,  # base variable borrow rate
+    RAY * 8 // 100,  # variable rate slope 1
+    RAY,  # variable rate slope 2
+    RAY * 10 // 100,  # stable rate slope 1
+    RAY,  # stable rate slope 2
+)
+AAVE_MARKET_ID = "Aave genesis market"
+
+
+def deploy_at(container, address, tx_params):
+    """
+    Deploys the contract and copies its runtime code to the given address.
+    Contracts deployed this way must not initialize any storage in the constructor
+    """
+    template = container.deploy(tx_params)
+    response = web3.provider.make_request(
+        "evm_setAccountCode", [address, web3.eth.get_code(template.address).hex()]
+    )
+    if "error" in response:
+        raise RuntimeError(
+            f"Can't set code of {container._name} at {address}: {response['error']}"
+        )
+    return Contract.from_abi(container._name, address, container.abi)
+
+
+def deploy_lido(deployer):
+    tx_params = {"from": deployer}
+    ldo = deploy_at(LdoMock, lido.LDO_ADDRESS, tx_params)
+    deploy_at(StETHMock, lido.STETH_ADDRESS, tx_params)
+    deploy_at(AgentMock, lido.AGENT_ADDRESS, tx_params)
+    deploy_at(VotingMock, lido.VOTING_ADDRESS, tx_params)
+    deploy_at(TokenManagerMock, lido.TOKEN_MANAGER_ADDRESS, tx_params)
+
+    ldo.mint(lido.AGENT_ADDRESS, AGENT_LDO_BALANCE, tx_params)
+    deployer.transfer(lido.AGENT_ADDRESS, AGENT_ETH_BALANCE)
+
+
+def deploy_aave_market(pool_admin, deployer):
+    tx_params = {"from": deployer}
+
+    def load(contract_name):
+        return deployment.DependencyLoader.load(
+            deployment.AAVE_DEPENDENCY_NAME, contract_name
+        )
+
+    LendingPoolAddressesProvider = load("LendingPoolAddressesProvider")
+    constructor_abi = [
+        abi for abi in LendingPoolAddressesProvider.abi if abi["type"] == "constructor"
+    ]
+    # the market id constructor argument was added in the later versions of AAVE v2
+    market_id = (
+        [AAVE_MARKET_ID] if constructor_abi and constructor_abi[0]["inputs"] else []
+    )
+    addresses_provider = LendingPoolAddressesProvider.deploy(*market_id, tx_params)
+    addresses_provider.setPoolAdmin(pool_admin, tx_params)
+    addresses_provider.setLendingRateOracle(
+        LendingRateOracleMock.deploy(tx_params), tx_params
+    )
+
+    # libraries are linked with the latest deployed instances
+    for library_name in ["ReserveLogic", "GenericLogic", "ValidationLogic"]:
+        load(library_name).deploy(tx_params)
+    LendingPool = load("LendingPool")
+    addresses_provider.setLendingPoolImpl(LendingPool.deploy(tx_params), tx_params)
+    LendingPoolConfigurator = load("LendingPoolConfigurator")
+    addresses_provider.setLendingPoolConfiguratorImpl(
+        LendingPoolConfigurator.deploy(tx_params), tx_params
+    )
+
+    interest_rate_strategy = load("DefaultReserveInterestRateStrategy").deploy(
+        addresses_provider, *WETH9_INTEREST_RATE_STRATEGY_PARAMS, tx_params
+    )
+    deployer.transfer(pool_admin, POOL_ADMIN_ETH_BALANCE)
+    return aave.AaveMarket(
+        lending_pool=Contract.from_abi(
+            "LendingPool", addresses_provider.getLendingPool(), LendingPool.abi
+        ),
+        lending_pool_configurator=Contract.from_abi(
+            "LendingPoolConfigurator",
+            addresses_provider.getLendingPoolConfigurator(),
+            LendingPoolConfigurator.abi,
+        ),
+        interest_rate_strategy=interest_rate_strategy,
+    )
@@ -0,0 +1,329 @@
+"""
+Pipeline of fetching and decoding of the event logs. LogFetcher walks the block
+range with eth_getLogs requests of the adaptive size: the range is halved when the
+node rejects the request because of too many results and doubled again while the
+responses are sparse. Fetched logs are stored in the append-only LogCache, so the
+repeated walks over the same history are served from disk. Only the blocks deeper
+than the confirmations count below the head are cached, the newer ones might be
+reorganized and are always requested from the node. EventDecoder decodes
+the raw logs with the types prepared once from the contract ABI.
+"""
+import json
+import os
+from pathlib import Path
+from brownie import web3
+from eth_abi import decode_abi, decode_single
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+
+DEFAULT_BLOCK_RANGE = 2_000
+MAX_BLOCK_RANGE = 100_000
+# block range grows while responses have fewer logs
+SPARSE_RESPONSE_SIZE = 1_000
+# blocks below the head which aren't cached, ~2 epochs of the beacon chain after
+# which the block is finalized
+DEFAULT_CONFIRMATIONS = 64
+# fragments of the errors returned by the nodes when the response is too large
+TOO_MANY_RESULTS_ERRORS = (
+    "more than",
+    "too many",
+    "limit exceeded",
+    "response size",
+    "too large",
+    "range is too wide",
+)
+TOO_MANY_RESULTS_ERROR_CODE = -32005
+
+ALL_TOPICS = "all"
+BLOCKS_FILE_NAME = "blocks.jsonl"
+
+
+class LogCache:
+    """
+    Append-only on-disk store of the raw logs. Logs of every (address, topic) pair
+    are kept in <path>/<address>/<topic>.jsonl, each line holds the fetched block
+    range and all its logs. Lines are never rewritten, so the interrupted write
+    loses at most the last range, which is dropped on the next load. Timestamps of
+    the blocks with logs are kept in <path>/blocks.jsonl the same way.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._segments = {}
+        self._block_timestamps = None
+
+    def file_path(self, address, topic=None):
+        return self.path / address.lower() / f"{(topic or ALL_TOPICS).lower()}.jsonl"
+
+    def segments(self, address, topic=None):
+        """Returns the list of cached (from_block, to_block, logs) sorted by from_block"""
+        key = (address.lower(), (topic or ALL_TOPICS).lower())
+        if key not in self._segments:
+            segments = self._load(self.file_path(address, topic))
+            self._segments[key] = sorted(
+                (tuple(segment) for segment in segments), key=lambda segment: segment[0]
+            )
+        return self._segments[key]
+
+    def plan(self, address, topic, from_block, to_block):
+        """
+        Splits the block range into the list of (from_block, to_block, cached)
+        intervals, where the cached ones are served from disk
+        """
+        intervals = []
+        position = from_block
+        for start, end in self._covered(address, topic):
+            if end < position:
+                continue
+            if start > to_block:
+                break
+            if start > position:
+                intervals.append((position, start - 1, False))
+            intervals.append((max(start, position), min(end, to_block), True))
+            position = end + 1
+        if position <= to_block:
+            intervals.append((position, to_block, False))
+        return intervals
+
+    def logs(self, address, topic, from_block, to_block):
+        """Returns cached logs of the block range sorted by block number and log index"""
+        logs = [
+            log
+            for start, end, segment_logs in self.segments(address, topic)
+            if start <= to_block and end >= from_block
+            for log in segment_logs
+            if from_block <= log["blockNumber"] <= to_block
+        ]
+        return sorted(logs, key=_log_position)
+
+    def append(self, address, topic, from_block, to_block, logs):
+        segments = self.segments(address, topic)
+        self._append(self.file_path(address, topic), [from_block, to_block, logs])
+        segments.append((from_block, to_block, logs))
+        segments.sort(key=lambda segment: segment[0])
+
+    def block_timestamp(self, block_number):
+        """Returns cached timestamp of the block or None when it's missing"""
+        if self._block_timestamps is None:
+            self._block_timestamps = {
+                block_number: timestamp
+                for block_number, timestamp in self._load(self.path / BLOCKS_FILE_NAME)
+            }
+        return self._block_timestamps.get(block_number)
+
+    def append_block_timestamp(self, block_number, timestamp):
+        if self.block_timestamp(block_number) is not None:
+            return
+        self._append(self.path / BLOCKS_FILE_NAME, [block_number, timestamp])
+        self._block_timestamps[block_number] = timestamp
+
+    def _covered(self, address, topic):
+        covered = []
+        for start, end, _ in self.segments(address, topic):
+            if covered and start <= covered[-1][1] + 1:
+                covered[-1] = (covered[-1][0], max(covered[-1][1], end))
+            else:
+                covered.append((start, end))
+        return covered
+
+    @staticmethod
+    def _append(file_path, record):
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "a") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    @staticmethod
+    def _load(file_path):
+        """Returns records of the file skipping the partially written last line"""
+        if not file_path.exists():
+            return []
+        records = []
+        valid_size = 0
+        with open(file_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                valid_size += len(line)
+        # drop the partially written record to keep the next appends readable
+        if valid_size < os.path.getsize(file_path):
+            os.truncate(file_path, valid_size)
+        return records
+
+
+class LogFetcher:
+    """
+    Fetches logs of the address, optionally filtered by the first topic, with the
+    adaptive block range. When the cache is passed, only the block ranges missing
+    in it are requested from the node. Blocks newer than head - confirmations are
+    neither cached nor served from the cache. Logs might be filtered by the rest of
+    the topics only without the cache.
+    """
+
+    def __init__(
+        self,
+        cache=None,
+        block_range=DEFAULT_BLOCK_RANGE,
+        max_block_range=MAX_BLOCK_RANGE,
+        sparse_response_size=SPARSE_RESPONSE_SIZE,
+        confirmations=DEFAULT_CONFIRMATIONS,
+    ):
+        self.cache = cache
+        self.confirmations = confirmations
+        self.block_range = block_range
+        self.max_block_range = max_block_range
+        self.sparse_response_size = sparse_response_size
+        self.requests = 0
+
+    def get_logs(self, address, from_block, to_block, topic=None, topics=None):
+        return list(self.iter_logs(address, from_block, to_block, topic, topics))
+
+    def iter_logs(self, address, from_block, to_block, topic=None, topics=None):
+        """
+        Yields raw logs of the block range sorted by block number and log index.
+        topics filters the topics following the first one, None matches any topic
+        """
+        if self.cache is None:
+            yield from self._fetch(address, topic, from_block, to_block, topics=topics)
+            return
+        if topics is not None:
+            raise ValueError("Cached logs can't be filtered by the rest of the topics")
+        confirmed_block = min(web3.eth.block_number - self.confirmations, to_block)
+        if from_block <= confirmed_block:
+            for start, end, cached in self.cache.plan(
+                address, topic, from_block, confirmed_block
+            ):
+                if cached:
+                    yield from self.cache.logs(address, topic, start, end)
+                else:
+                    yield from self._fetch(address, topic, start, end, cache=True)
+        yield from self._fetch(
+            address, topic, max(from_block, confirmed_block + 1), to_block
+        )
+
+    def _fetch(self, address, topic, from_block, to_block, cache=False, topics=None):
+        position = from_block
+        while position <= to_block:
+            range_end = min(position + self.block_range - 1, to_block)
+            log_filter = {
+                "address": address,
+                "fromBlock": position,
+                "toBlock": range_end,
+            }
+            if topic is not None or topics is not None:
+                log_filter["topics"] = [topic, *(topics or [])]
+            try:
+                self.requests += 1
+                logs = web3.eth.get_logs(log_filter)
+            except ValueError as error:
+                if not is_too_many_results_error(error) or range_end == position:
+                    raise
+                self.block_range = max(1, (range_end - position + 1) // 2)
+                continue
+            logs = sorted((serialize_log(log) for log in logs), key=_log_position)
+            if cache:
+                self.cache.append(address, topic, position, range_end, logs)
+            yield from logs
+            position = range_end + 1
+            if len(logs) < self.sparse_response_size:
+                self.block_range = min(2 * self.block_range, self.max_block_range)
+
+
+def is_too_many_results_error(error):
+    details = error.args[0] if error.args else None
+    if isinstance(details, dict):
+        if details.get("code") == TOO_MANY_RESULTS_ERROR_CODE:
+            return True
+        message = str(details.get("message", ""))
+    else:
+        message = str(error)
+    message = message.lower()
+    return any(fragment in message for fragment in TOO_MANY_RESULTS_ERRORS)
+
+
+def serialize_log(log):
+    """Converts the log returned by web3 into the JSON-compatible dict"""
+    return {
+        "address": to_checksum_address(log["address"]),
+        "topics": [_hex(topic) for topic in log["topics"]],
+        "data": _hex(log["data"]),
+        "blockNumber": log["blockNumber"],
+        "blockHash": _hex(log["blockHash"]),
+        "transactionHash": _hex(log["transactionHash"]),
+        "transactionIndex": log["transactionIndex"],
+        "logIndex": log["logIndex"],
+    }
+
+
+def _hex(value):
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    return value.lower()
+
+
+def _log_position(log):
+    return log["blockNumber"], log["logIndex"]
+
+
+class EventDecoder:
+    """Decodes the serialized logs of the events declared in the ABI"""
+
+    def __init__(self, abi, event_names=None):
+        self.events = {}
+        for item in abi:
+            if item["type"] != "event" or item.get("anonymous"):
+                continue
+            if event_names is not None and item["name"] not in event_names:
+                continue
+            topic = "0x" + event_abi_to_log_topic(item).hex()
+            indexed = [inputs for inputs in item["inputs"] if inputs["indexed"]]
+            not_indexed = [inputs for inputs in item["inputs"] if not inputs["indexed"]]
+            self.events[topic] = (
+                item["name"],
+                [(inputs["name"], _abi_type(inputs)) for inputs in indexed],
+                [inputs["name"] for inputs in not_indexed],
+                [_abi_type(inputs) for inputs in not_indexed],
+            )
+
+    def decode(self, logs):
+        """Yields (event name, args, log) of the logs of the known events"""
+        for log in logs:
+            if not log["topics"] or log["topics"][0] not in self.events:
+                continue
+            name, indexed, names, types = self.events[log["topics"][0]]
+            args = {}
+            for (arg_name, arg_type), topic in zip(indexed, log["topics"][1:]):
+                topic = bytes.fromhex(topic[2:])
+                # indexed values of the dynamic types are stored as their hashes
+                if _is_dynamic(arg_type):
+                    args[arg_name] = topic
+                else:
+                    args[arg_name] = _normalize(
+                        arg_type, decode_single(arg_type, topic)
+                    )
+            values = decode_abi(types, bytes.fromhex(log["data"][2:]))
+            for arg_name, arg_type, value in zip(names, types, values):
+                args[arg_name] = _normalize(arg_type, value)
+            yield name, args, log
+
+
+def _abi_type(inputs):
+    if not inputs["type"].startswith("tuple"):
+        return inputs["type"]
+    components = ",".join(_abi_type(component) for component in inputs["components"])
+    return f"({components}){inputs['type'][len('tuple'):]}"
+
+
+def _is_dynamic(abi_type):
+    return abi_type in ("string", "bytes") or abi_type.endswith("]") or "(" in abi_type
+
+
+def _normalize(abi_type, value):
+    if abi_type == "address":
+        return to_checksum_address(value)
+    if abi_type.startswith("address[") and abi_type.endswith("]"):
+        item_type = abi_type[: abi_type.rindex("[")]
+        return [_normalize(item_type, item) for item in value]
+    return value
@@ -0,0 +1,277 @@
+"""
+Off-chain settlement of the rewards of MerkleAStETHIncentivesController. The events
+of the controller and its staking token are replayed by RewardsIndexer with the
+RewardsUtils arithmetic, and the cumulative rewards of the depositors at the end
+of the epoch are written into the Merkle distribution. The distribution is a
+directory:
+    meta.json - root of the tree, number of the leaves and arbitrary metadata
+    leaves.bin - 20 bytes address and 32 bytes big-endian cumulative reward of each
+        depositor, sorted by the address in ascending order
+    level_<k>.bin - 32 bytes hashes of the k-th level of the tree, level_0 keeps the
+        hashes of the leaves
+Pairs of the nodes are sorted before hashing, like in OpenZeppelin's MerkleProof.
+The last node of the level with odd length is promoted to the next level as is.
+Levels are built by streaming over the previous level in chunks, so the memory of
+the tree building doesn't depend on the number of the depositors. Only the tree
+building is bounded: the ledger is kept in memory by the indexer and epoch_rewards
+sorts all the depositors in memory. Like the rewards store, the distribution path
+is the symlink to the version directory swapped on every write.
+"""
+import json
+import mmap
+import shutil
+from pathlib import Path
+from brownie import web3
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+from utils.indexer import DEFAULT_BLOCK_RANGE, RewardsIndexer
+from utils.rewards_store import map_files, new_version_path, publish_version
+
+ADDRESS_SIZE = 20
+WORD_SIZE = 32
+HASH_SIZE = 32
+LEAF_SIZE = ADDRESS_SIZE + WORD_SIZE
+# number of leaves or nodes processed at once
+CHUNK_SIZE = 65_536
+
+META_FILE_NAME = "meta.json"
+LEAVES_FILE_NAME = "leaves.bin"
+EMPTY_ROOT = bytes(HASH_SIZE)
+
+
+def leaf_hash(depositor, cumulative_reward):
+    return keccak(
+        to_canonical_address(depositor) + cumulative_reward.to_bytes(WORD_SIZE, "big")
+    )
+
+
+def hash_pair(a, b):
+    return keccak(a + b) if a <= b else keccak(b + a)
+
+
+def verify_proof(root, depositor, cumulative_reward, proof):
+    computed_hash = leaf_hash(depositor, cumulative_reward)
+    for node in proof:
+        computed_hash = hash_pair(computed_hash, bytes.fromhex(node[2:]))
+    return "0x" + computed_hash.hex() == root
+
+
+def write_distribution(path, rewards, meta=None):
+    """
+    Writes the iterable of (depositor, cumulative reward) sorted by the address of
+    the depositor into the new version of the distribution at the given path and
+    publishes it
+    """
+    path = Path(path)
+    tmp_path = new_version_path(path)
+
+    count = total = 0
+    previous_address = None
+    with open(tmp_path / LEAVES_FILE_NAME, "wb") as leaves_file, open(
+        tmp_path / _level_file_name(0), "wb"
+    ) as hashes_file:
+        leaves, hashes = [], []
+        for depositor, cumulative_reward in rewards:
+            address = to_canonical_address(depositor)
+            if previous_address is not None and address <= previous_address:
+                shutil.rmtree(tmp_path)
+                raise ValueError("Depositors must be unique and sorted by address")
+            previous_address = address
+            amount = cumulative_reward.to_bytes(WORD_SIZE, "big")
+            leaves.append(address + amount)
+            hashes.append(keccak(address + amount))
+            count += 1
+            total += cumulative_reward
+            if len(leaves) == CHUNK_SIZE:
+                leaves_file.write(b"".join(leaves))
+                hashes_file.write(b"".join(hashes))
+                leaves, hashes = [], []
+        leaves_file.write(b"".join(leaves))
+        hashes_file.write(b"".join(hashes))
+
+    level, level_count = 0, count
+    while level_count > 1:
+        _write_next_level(tmp_path, level)
+        level, level_count = level + 1, (level_count + 1) // 2
+    if count == 0:
+        root = EMPTY_ROOT
+    else:
+        with open(tmp_path / _level_file_name(level), "rb") as f:
+            root = f.read(HASH_SIZE)
+
+    with open(tmp_path / META_FILE_NAME, "w") as f:
+        json.dump(
+            {
+                "root": "0x" + root.hex(),
+                "count": count,
+                "total": total,
+                "meta": meta or {},
+            },
+            f,
+        )
+
+    publish_version(path, tmp_path)
+    return MerkleDistribution(path)
+
+
+def _write_next_level(path, level):
+    chunk_bytes = 2 * CHUNK_SIZE * HASH_SIZE
+    with open(path / _level_file_name(level), "rb") as level_file, open(
+        path / _level_file_name(level + 1), "wb"
+    ) as next_level_file:
+        while True:
+            data = level_file.read(chunk_bytes)
+            if not data:
+                break
+            nodes = []
+            for offset in range(0, len(data), 2 * HASH_SIZE):
+                left = data[offset : offset + HASH_SIZE]
+                right = data[offset + HASH_SIZE : offset + 2 * HASH_SIZE]
+                nodes.append(hash_pair(left, right) if right else left)
+            next_level_file.write(b"".join(nodes))
+
+
+def _level_file_name(level):
+    return f"level_{level}.bin"
+
+
+class MerkleDistribution:
+    """
+    Read-only memory-mapped view of the distribution. The version is resolved and
+    all its files are mapped on open
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        with open(self.path / META_FILE_NAME) as f:
+            info = json.load(f)
+        self.root = info["root"]
+        self.count = info["count"]
+        self.total = info["total"]
+        self.meta = info["meta"]
+        self._files = map_files(self.path)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        for file_map in self._files.values():
+            if isinstance(file_map, mmap.mmap):
+                file_map.close()
+        self._files.clear()
+
+    def leaf(self, position):
+        """Returns (depositor, cumulative reward) of the leaf at the given position"""
+        if not 0 <= position < self.count:
+            raise IndexError(f"Position {position} is out of range")
+        offset = position * LEAF_SIZE
+        data = self._file(LEAVES_FILE_NAME)[offset : offset + LEAF_SIZE]
+        return (
+            to_checksum_address(data[:ADDRESS_SIZE]),
+            int.from_bytes(data[ADDRESS_SIZE:], "big"),
+        )
+
+    def position(self, depositor):
+        """Returns position of the depositor's leaf or None when it's missing"""
+        address = to_canonical_address(depositor)
+        leaves = self._file(LEAVES_FILE_NAME)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * LEAF_SIZE
+            if leaves[offset : offset + ADDRESS_SIZE] < address:
+                low = middle + 1
+            else:
+                high = middle
+        offset = low * LEAF_SIZE
+        if low == self.count or leaves[offset : offset + ADDRESS_SIZE] != address:
+            return None
+        return low
+
+    def proof(self, position):
+        """Returns the list of hex encoded sibling hashes from the leaf to the root"""
+        if not 0 <= position < self.count:
+            raise IndexError(f"Position {position} is out of range")
+        proof = []
+        level, level_count = 0, self.count
+        while level_count > 1:
+            sibling = position ^ 1
+            if sibling < level_count:
+                offset = sibling * HASH_SIZE
+                data = self._file(_level_file_name(level))
+                proof.append("0x" + data[offset : offset + HASH_SIZE].hex())
+            position //= 2
+            level, level_count = level + 1, (level_count + 1) // 2
+        return proof
+
+    def claim(self, depositor):
+        """Returns the arguments of claim() of the depositor"""
+        position = self.position(depositor)
+        if position is None:
+            raise KeyError(depositor)
+        depositor, cumulative_reward = self.leaf(position)
+        return depositor, cumulative_reward, self.proof(position)
+
+    def iter_claims(self):
+        """Yields the arguments of claim() of every depositor"""
+        for position in range(self.count):
+            yield (*self.leaf(position), self.proof(position))
+
+    def _file(self, file_name):
+        return self._files[file_name]
+
+
+def epoch_rewards(ledger, timestamp):
+    """
+    Returns cumulative rewards of the depositors at the given timestamp sorted by
+    the address. Rewards are never paid by the controller in the Merkle mode, so
+    the earned reward replayed by the ledger is the cumulative one
+    """
+    depositors = sorted(
+        set(ledger.balances) | set(ledger.state.rewards), key=to_canonical_address
+    )
+    for depositor in depositors:
+        reward = ledger.earned(depositor, timestamp)
+        if reward > 0:
+            yield depositor, reward
+
+
+def settle_epoch(
+    incentives_controller,
+    staking_token,
+    path,
+    block_number=None,
+    start_block=0,
+    block_range=DEFAULT_BLOCK_RANGE,
+):
+    """
+    Indexes the events till the given block and writes the distribution of the
+    cumulative rewards at its timestamp into <path>/epochs/<block number>. The
+    indexed ledger is kept in <path>/ledger.json, so the next epoch replays only
+    the new events
+    """
+    if block_number is None:
+        block_number = web3.eth.block_number
+    path = Path(path)
+    ledger = RewardsIndexer(
+        incentives_controller,
+        staking_token,
+        path / "ledger.json",
+        start_block=start_block,
+        block_range=block_range,
+    ).run(block_number)
+    timestamp = web3.eth.get_block(block_number)["timestamp"]
+    return write_distribution(
+        path / "epochs" / f"{block_number:012d}",
+        epoch_rewards(ledger, timestamp),
+        meta={
+            "incentives_controller": incentives_controller.address,
+            "block_number": block_number,
+            "timestamp": timestamp,
+        },
+    )
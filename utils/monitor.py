@@ -0,0 +1,335 @@
+"""
+Health monitor of the incentives controller. Every poll handles all blocks mined
+since the previous one at once: logs of the controller and incoming transfers of
+the reward token are fetched for the new block range, the period end and the
+reward per second are read from the rewardsState storage slots at the head block.
+The slot of the rewards distributor and the balance of the reward token are read
+only after the events which might change them. The reads of the poll are sent
+concurrently by the async RPC client, the logs are fetched by LogFetcher in the
+adaptive block ranges, so the catch-up after the downtime doesn't hit the limits
+of the node. The failed poll is logged, counted and retried on the next interval.
+Values are exported as Prometheus metrics, alerts are raised when they become
+active:
+    insufficient_balance - balance of the reward token is less than the reward
+        left to distribute, rewardPerSecond * (periodFinish - now)
+    period_ending - the reward period ends in less than period_ending_threshold
+    rewards_distributor_changed - rewardsDistributor differs from the expected one
+    unexpected_recovery - Recovered event of the token which isn't allowed
+"""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from brownie import web3
+from eth_utils import keccak, to_checksum_address
+from utils.async_rpc import rpc_client
+from utils.constants import ONE_WEEK
+from utils.log_fetcher import EventDecoder, LogFetcher
+
+DEFAULT_POLL_INTERVAL = 12
+DEFAULT_PERIOD_ENDING_THRESHOLD = ONE_WEEK
+DEFAULT_METRICS_PORT = 9_101
+
+
+class StorageLayout(NamedTuple):
+    rewards_distributor: int
+    rewards_state: int
+
+
+CONTROLLER_STORAGE_LAYOUT = StorageLayout(rewards_distributor=2, rewards_state=4)
+MERKLE_CONTROLLER_STORAGE_LAYOUT = StorageLayout(rewards_distributor=2, rewards_state=5)
+# storage layouts by the type of the controller
+STORAGE_LAYOUTS = {
+    "aave": CONTROLLER_STORAGE_LAYOUT,
+    "merkle": MERKLE_CONTROLLER_STORAGE_LAYOUT,
+}
+# offsets of the RewardsState fields from the first slot of the struct
+END_DATE_OFFSET = 0
+REWARD_PER_SECOND_OFFSET = 2
+
+# events of the controller transferring the reward token
+BALANCE_EVENTS = frozenset(
+    ["RewardAdded", "RewardPaid", "RewardsPaid", "RewardClaimed", "Recovered"]
+)
+TRANSFER_TOPIC = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+
+ALERTS = (
+    "insufficient_balance",
+    "period_ending",
+    "rewards_distributor_changed",
+    "unexpected_recovery",
+)
+METRICS = {
+    "block_number": ("gauge", "Number of the last processed block"),
+    "block_timestamp": ("gauge", "Timestamp of the last processed block"),
+    "reward_token_balance": ("gauge", "Balance of the reward token"),
+    "period_finish": ("gauge", "End date of the reward period"),
+    "reward_per_second": ("gauge", "Reward per second of the current period"),
+    "period_time_left_seconds": ("gauge", "Time left till the end of the period"),
+    "reward_left": ("gauge", "Reward left to distribute in the current period"),
+    "rewards_distributor_changes_total": (
+        "counter",
+        "Number of RewardsDistributorChanged events",
+    ),
+    "recovered_total": ("counter", "Number of Recovered events"),
+    "unexpected_recovered_total": (
+        "counter",
+        "Number of Recovered events of not allowed tokens",
+    ),
+    "poll_errors_total": ("counter", "Number of the failed polls"),
+    "last_success_timestamp_seconds": (
+        "gauge",
+        "Unix time of the last successful poll",
+    ),
+}
+METRICS_PREFIX = "incentives_controller"
+
+
+class ControllerMonitor:
+    def __init__(
+        self,
+        incentives_controller,
+        reward_token,
+        storage_layout=CONTROLLER_STORAGE_LAYOUT,
+        expected_rewards_distributor=None,
+        allowed_recovered_tokens=(),
+        period_ending_threshold=DEFAULT_PERIOD_ENDING_THRESHOLD,
+        on_alert=None,
+    ):
+        self.address = incentives_controller.address
+        self.reward_token = reward_token
+        self.storage_layout = storage_layout
+        self.expected_rewards_distributor = (
+            to_checksum_address(expected_rewards_distributor)
+            if expected_rewards_distributor is not None
+            else None
+        )
+        self.allowed_recovered_tokens = {
+            to_checksum_address(token) for token in allowed_recovered_tokens
+        }
+        self.period_ending_threshold = period_ending_threshold
+        self.on_alert = on_alert or _print_alert
+        self.decoder = EventDecoder(incentives_controller.abi)
+        # the range since the last poll is walked in chunks, like by the indexer
+        self.log_fetcher = LogFetcher()
+
+        self.last_block = None
+        self.block_timestamp = None
+        self.balance = None
+        self.period_finish = None
+        self.reward_per_second = None
+        self.rewards_distributor = None
+        self.rewards_distributor_changes = 0
+        self.recovered = 0
+        self.unexpected_recovered = 0
+        self.poll_errors = 0
+        self.last_success_timestamp = None
+        self.alerts = dict.fromkeys(ALERTS, False)
+        self.metrics = {}
+
+    def poll(self):
+        """Processes the blocks mined since the last poll. Returns False when there are none"""
+        block = web3.eth.get_block("latest")
+        if self.last_block is not None and block["number"] <= self.last_block:
+            return False
+        events = []
+        if self.last_block is None:
+            read_rewards_distributor = read_balance = True
+        else:
+            from_block, to_block = self.last_block + 1, block["number"]
+            events = self._fetch_events(from_block, to_block)
+            names = {name for name, _ in events}
+            read_rewards_distributor = "RewardsDistributorChanged" in names
+            read_balance = bool(names & BALANCE_EVENTS) or self._has_incoming_transfers(
+                from_block, to_block
+            )
+        self._read_state(block["number"], read_rewards_distributor, read_balance)
+        # counters are updated after all reads, so the failed poll is retried as a whole
+        self._count_events(events)
+        if self.expected_rewards_distributor is None:
+            self.expected_rewards_distributor = self.rewards_distributor
+        self.last_block = block["number"]
+        self.block_timestamp = block["timestamp"]
+        self._update_metrics()
+        self._update_alerts()
+        return True
+
+    def run(self, poll_interval=DEFAULT_POLL_INTERVAL, stop_event=None):
+        """
+        Polls the node until the stop event is set. Errors of the poll are logged and
+        counted, the failed poll is retried on the next interval
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as error:
+                self.poll_errors += 1
+                self.metrics["poll_errors_total"] = self.poll_errors
+                print(f"Poll failed: {error!r}", flush=True)
+            else:
+                self.last_success_timestamp = int(time.time())
+                self.metrics[
+                    "last_success_timestamp_seconds"
+                ] = self.last_success_timestamp
+            stop_event.wait(poll_interval)
+
+    @property
+    def period_time_left(self):
+        return max(self.period_finish - self.block_timestamp, 0)
+
+    @property
+    def reward_left(self):
+        return self.reward_per_second * self.period_time_left
+
+    def render_metrics(self):
+        """Returns metrics in the Prometheus text exposition format"""
+        metrics, alerts = self.metrics, self.alerts
+        labels = f'controller="{self.address}"'
+        lines = []
+        for name, value in metrics.items():
+            metric_type, description = METRICS[name]
+            lines.append(f"# HELP {METRICS_PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} {metric_type}")
+            lines.append(f"{METRICS_PREFIX}_{name}{{{labels}}} {value}")
+        lines.append(f"# HELP {METRICS_PREFIX}_alert Whether the alert is active")
+        lines.append(f"# TYPE {METRICS_PREFIX}_alert gauge")
+        for name, is_active in alerts.items():
+            lines.append(
+                f'{METRICS_PREFIX}_alert{{{labels},alert="{name}"}} {int(is_active)}'
+            )
+        return "\n".join(lines) + "\n"
+
+    def _fetch_events(self, from_block, to_block):
+        logs = self.log_fetcher.iter_logs(self.address, from_block, to_block)
+        return [(name, args) for name, args, _ in self.decoder.decode(logs)]
+
+    def _count_events(self, events):
+        for name, args in events:
+            if name == "RewardsDistributorChanged":
+                self.rewards_distributor_changes += 1
+            elif name == "Recovered":
+                self.recovered += 1
+                if args["token"] not in self.allowed_recovered_tokens:
+                    self.unexpected_recovered += 1
+
+    def _has_incoming_transfers(self, from_block, to_block):
+        logs = self.log_fetcher.iter_logs(
+            self.reward_token.address,
+            from_block,
+            to_block,
+            TRANSFER_TOPIC,
+            topics=[None, _address_topic(self.address)],
+        )
+        return next(logs, None) is not None
+
+    def _read_state(self, block_number, read_rewards_distributor, read_balance):
+        """
+        Reads the rewards state and, when requested, the rewards distributor and
+        the balance at the given block
+        """
+        client = rpc_client()
+        state_slot = self.storage_layout.rewards_state
+        slots = [state_slot + END_DATE_OFFSET, state_slot + REWARD_PER_SECOND_OFFSET]
+        if read_rewards_distributor:
+            slots.append(self.storage_layout.rewards_distributor)
+        values = client.run(
+            self._read(client.client, slots, read_balance, block_number)
+        )
+        self.period_finish, self.reward_per_second = values[:2]
+        if read_rewards_distributor:
+            self.rewards_distributor = to_checksum_address(
+                values[2].to_bytes(32, "big")[12:]
+            )
+        if read_balance:
+            self.balance = values[-1]
+
+    async def _read(self, client, slots, read_balance, block_number):
+        reads = [
+            client.get_storage_at(self.address, slot, block_number) for slot in slots
+        ]
+        if read_balance:
+            reads.append(
+                client.call(
+                    self.reward_token.balanceOf,
+                    self.address,
+                    block_identifier=block_number,
+                )
+            )
+        return await asyncio.gather(*reads)
+
+    def _update_metrics(self):
+        self.metrics = {
+            "block_number": self.last_block,
+            "block_timestamp": self.block_timestamp,
+            "reward_token_balance": self.balance,
+            "period_finish": self.period_finish,
+            "reward_per_second": self.reward_per_second,
+            "period_time_left_seconds": self.period_time_left,
+            "reward_left": self.reward_left,
+            "rewards_distributor_changes_total": self.rewards_distributor_changes,
+            "recovered_total": self.recovered,
+            "unexpected_recovered_total": self.unexpected_recovered,
+            "poll_errors_total": self.poll_errors,
+        }
+        if self.last_success_timestamp is not None:
+            self.metrics["last_success_timestamp_seconds"] = self.last_success_timestamp
+
+    def _update_alerts(self):
+        messages = {
+            "insufficient_balance": (
+                f"Balance {self.balance} is less than the reward left {self.reward_left}"
+                if self.balance < self.reward_left
+                else None
+            ),
+            "period_ending": (
+                f"Reward period ends in {self.period_time_left} seconds"
+                if 0 < self.period_time_left <= self.period_ending_threshold
+                else None
+            ),
+            "rewards_distributor_changed": (
+                f"Rewards distributor is changed to {self.rewards_distributor}"
+                if self.rewards_distributor != self.expected_rewards_distributor
+                else None
+            ),
+            "unexpected_recovery": (
+                f"{self.unexpected_recovered} unexpected Recovered events"
+                if self.unexpected_recovered > 0
+                else None
+            ),
+        }
+        alerts = {}
+        for name, message in messages.items():
+            alerts[name] = message is not None
+            if alerts[name] and not self.alerts[name]:
+                self.on_alert(name, message)
+        self.alerts = alerts
+
+
+def serve_metrics(monitor, port=DEFAULT_METRICS_PORT, host=""):
+    """Serves the metrics of the monitor via HTTP in the background thread"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = monitor.render_metrics().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _address_topic(address):
+    return "0x" + "00" * 12 + address[2:].lower()
+
+
+def _print_alert(name, message):
+    print(f"ALERT {name}: {message}", flush=True)
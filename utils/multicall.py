@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+from brownie import web3
+from brownie.exceptions import VirtualMachineError
+
+DEFAULT_GAS_LIMIT = 25_000_000
+DEFAULT_MAX_CALLS_PER_CHUNK = 2_000
+DEFAULT_MAX_RESPONSE_SIZE = 4 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 8
+
+# ABI encoding overhead of the single Result item in the returned array:
+# offset, success flag, data offset and data length words
+RESULT_ENCODING_OVERHEAD = 4 * 32
+
+
+class BatchReader:
+    """
+    Packs many view calls into aggregated eth_calls through the Multicall contract.
+    The size of the chunk is derived from the gas and the response size measured
+    on the first chunk of every read and the rejected chunks are split in halves.
+    Chunks are executed concurrently, results are returned in the input order.
+    """
+
+    def __init__(
+        self,
+        multicall,
+        gas_limit=DEFAULT_GAS_LIMIT,
+        max_calls_per_chunk=DEFAULT_MAX_CALLS_PER_CHUNK,
+        max_response_size=DEFAULT_MAX_RESPONSE_SIZE,
+        max_workers=DEFAULT_MAX_WORKERS,
+    ):
+        self.multicall = multicall
+        self.gas_limit = gas_limit
+        self.max_response_size = max_response_size
+        self.max_workers = max_workers
+        self.max_calls_per_chunk = max_calls_per_chunk
+        # chunk size fitted on the last read
+        self.chunk_size = None
+
+    def read(self, calls):
+        """
+        Executes calls given as (contract_method, args) pairs, for example
+        (incentives_controller.earned, [depositor]). Returns the list of decoded
+        results, failed calls are returned as None.
+        """
+        calls = [(method, method.encode_input(*args)) for method, args in calls]
+        if not calls:
+            return []
+
+        # the first chunk is executed synchronously to fit chunk size to the limits
+        probe = calls[: min(len(calls), max(1, self.max_calls_per_chunk // 10))]
+        results = self._aggregate(probe)
+        chunk_size = self.chunk_size = self._fit_chunk_size(probe, results)
+
+        rest = calls[len(probe) :]
+        chunks = [rest[i : i + chunk_size] for i in range(0, len(rest), chunk_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for chunk_results in executor.map(self._aggregate, chunks):
+                results.extend(chunk_results)
+
+        return [
+            method.decode_output(return_data) if success else None
+            for (method, _), (success, return_data) in zip(calls, results)
+        ]
+
+    def _aggregate(self, chunk):
+        payload = [(method._address, calldata) for method, calldata in chunk]
+        try:
+            return [
+                (success, bytes(return_data))
+                for success, return_data in self.multicall.aggregate.call(
+                    payload, {"gas": self.gas_limit}
+                )
+            ]
+        except (ValueError, VirtualMachineError):
+            # out of gas or the response is too large, split the chunk in halves
+            if len(chunk) == 1:
+                raise
+            middle = len(chunk) // 2
+            return self._aggregate(chunk[:middle]) + self._aggregate(chunk[middle:])
+
+    def _fit_chunk_size(self, probe, results):
+        """Returns the chunk size fitting the limits measured on the probe"""
+        payload = [(method._address, calldata) for method, calldata in probe]
+        gas_used = web3.eth.estimate_gas(
+            {
+                "to": self.multicall.address,
+                "data": self.multicall.aggregate.encode_input(payload),
+            }
+        )
+        gas_per_call = gas_used / len(probe)
+        response_size_per_call = sum(
+            RESULT_ENCODING_OVERHEAD + len(return_data) for _, return_data in results
+        ) / len(probe)
+        return max(
+            1,
+            min(
+                self.max_calls_per_chunk,
+                int(self.gas_limit / gas_per_call),
+                int(self.max_response_size / response_size_per_call),
+            ),
+        )
+
+
+def earned(reader, incentives_controller, depositors):
+    return reader.read(
+        [(incentives_controller.earned, [depositor]) for depositor in depositors]
+    )
+
+
+def internal_balances_and_supply(reader, staking_token, depositors):
+    return reader.read(
+        [
+            (staking_token.getInternalUserBalanceAndSupply, [depositor])
+            for depositor in depositors
+        ]
+    )
@@ -0,0 +1,204 @@
+"""
+Timeline of the RewardsUtils state transitions. accumulatedRewardPerToken moves
+only on handleAction(), claims, notifyRewardAmount() and updatePeriodFinish(), and
+between the transitions rewardPerToken() is a closed-form function of the time.
+The timeline keeps the state after every transition, so rewardPerToken() at any
+past timestamp is found by the binary search of the last transition before it and
+the same integer arithmetic as in RewardsUtils. The updates of every depositor are
+kept the same way, so the earned reward is computed without the replay of the
+history.
+
+Transitions are recorded from the events replayed by RewardsLedger.
+updatePeriodFinish() doesn't emit events, so its transitions might be added by
+add() from the rewardsState read at the block of the call.
+"""
+import bisect
+import json
+import os
+from pathlib import Path
+from typing import NamedTuple
+from brownie import web3, ZERO_ADDRESS
+from utils import rewards
+from utils.indexer import PAID_REWARDS
+
+
+class Transition(NamedTuple):
+    timestamp: int
+    end_date: int
+    updated_at: int
+    reward_per_second: int
+    accumulated_reward_per_token: int
+    total_staked: int
+
+    def state(self):
+        return rewards.RewardsState(
+            self.end_date,
+            self.updated_at,
+            self.reward_per_second,
+            self.accumulated_reward_per_token,
+        )
+
+
+class DepositorUpdate(NamedTuple):
+    timestamp: int
+    staked: int
+    reward_per_token_paid: int
+    # paid and upcoming reward of the depositor after the update
+    earned: int
+
+
+class RewardTimeline:
+    def __init__(self):
+        self.transitions = []
+        self.depositor_updates = {}
+        self._timestamps = []
+        self._depositor_timestamps = {}
+
+    def add(self, timestamp, state, total_staked):
+        """Records rewardsState and the total staked amount after the given timestamp"""
+        _append(
+            self.transitions,
+            self._timestamps,
+            Transition(timestamp, *state.as_tuple(), total_staked),
+        )
+
+    def add_depositor_update(self, depositor, timestamp, staked, reward):
+        """Records the Reward entry and the staked amount of the depositor"""
+        _append(
+            self.depositor_updates.setdefault(depositor, []),
+            self._depositor_timestamps.setdefault(depositor, []),
+            DepositorUpdate(
+                timestamp,
+                staked,
+                reward.accumulated_reward_per_token_paid,
+                reward.paid_reward + reward.upcoming_reward,
+            ),
+        )
+
+    def record(self, ledger, name, args, timestamp):
+        """Records the state of the ledger after the event is applied to it"""
+        self.add(timestamp, ledger.state, ledger.total_supply)
+        for depositor in _event_depositors(name, args):
+            self.add_depositor_update(
+                depositor,
+                timestamp,
+                ledger.balances.get(depositor, 0),
+                ledger.state.rewards.get(depositor) or rewards.Reward(),
+            )
+
+    def transition_at(self, timestamp):
+        """Returns the last transition at or before the timestamp"""
+        return _last_before(self.transitions, self._timestamps, timestamp)
+
+    def reward_per_token(self, timestamp):
+        transition = self.transition_at(timestamp)
+        if transition is None:
+            return 0
+        return rewards.reward_per_token(
+            transition.state(), transition.total_staked, timestamp
+        )
+
+    def earned(self, depositor, timestamp):
+        """Returns the reward earned by the depositor till the timestamp including the paid one"""
+        update = _last_before(
+            self.depositor_updates.get(depositor, []),
+            self._depositor_timestamps.get(depositor, []),
+            timestamp,
+        )
+        if update is None:
+            return 0
+        unpaid = update.staked * (
+            self.reward_per_token(timestamp) - update.reward_per_token_paid
+        )
+        return update.earned + unpaid // rewards.PRECISION
+
+    def earned_between(self, depositor, from_timestamp, to_timestamp):
+        return self.earned(depositor, to_timestamp) - self.earned(
+            depositor, from_timestamp
+        )
+
+    def to_dict(self):
+        return {
+            "transitions": [list(transition) for transition in self.transitions],
+            "depositor_updates": {
+                depositor: [list(update) for update in updates]
+                for depositor, updates in self.depositor_updates.items()
+            },
+        }
+
+    @staticmethod
+    def from_dict(data):
+        timeline = RewardTimeline()
+        timeline.transitions = [Transition(*item) for item in data["transitions"]]
+        timeline._timestamps = [item.timestamp for item in timeline.transitions]
+        for depositor, updates in data["depositor_updates"].items():
+            updates = [DepositorUpdate(*item) for item in updates]
+            timeline.depositor_updates[depositor] = updates
+            timeline._depositor_timestamps[depositor] = [
+                update.timestamp for update in updates
+            ]
+        return timeline
+
+    def save(self, path):
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        with open(path) as f:
+            return RewardTimeline.from_dict(json.load(f))
+
+
+def build_timeline(indexer, to_block=None):
+    """
+    Replays the events fetched by the indexer from its start block into the new
+    ledger and records the transitions of its state
+    """
+    if to_block is None:
+        to_block = web3.eth.block_number
+    ledger = indexer.new_ledger()
+    timeline = RewardTimeline()
+    from_block = indexer.start_block
+    while from_block <= to_block:
+        range_end = min(from_block + indexer.block_range - 1, to_block)
+        for name, args, timestamp, tx_hash in indexer.fetch_events(
+            from_block, range_end
+        ):
+            ledger.apply(name, args, timestamp, tx_hash)
+            timeline.record(ledger, name, args, timestamp)
+        ledger.end_block(range_end)
+        from_block = range_end + 1
+    indexer.block_timestamps.clear()
+    return timeline
+
+
+def _append(items, timestamps, item):
+    if items:
+        if item.timestamp < timestamps[-1]:
+            raise ValueError("Transitions must be added in chronological order")
+        if item[1:] == items[-1][1:]:
+            return
+        # only the state at the end of the timestamp is kept
+        if item.timestamp == timestamps[-1]:
+            items[-1] = item
+            return
+    items.append(item)
+    timestamps.append(item.timestamp)
+
+
+def _last_before(items, timestamps, timestamp):
+    index = bisect.bisect_right(timestamps, timestamp)
+    return items[index - 1] if index > 0 else None
+
+
+def _event_depositors(name, args):
+    if name == "Transfer":
+        return {args["from"], args["to"]} - {ZERO_ADDRESS}
+    if name == "RewardPaid":
+        return {args["user"]}
+    if name == "RewardsPaid":
+        return {depositor for depositor, _ in args.get(PAID_REWARDS, [])}
+    return set()
@@ -0,0 +1,195 @@
+"""
+Off-chain port of contracts/utils/RewardsUtils.sol.
+
+All arithmetic mirrors the checked uint256 arithmetic of the library: values are
+python ints, divisions are floor divisions and any result which would revert
+on-chain (overflow or underflow) raises ArithmeticError instead.
+"""
+
+PRECISION = 10 ** 18
+MAX_UINT256 = 2 ** 256 - 1
+
+
+class Reward:
+    __slots__ = ("paid_reward", "upcoming_reward", "accumulated_reward_per_token_paid")
+
+    def __init__(
+        self, paid_reward=0, upcoming_reward=0, accumulated_reward_per_token_paid=0
+    ):
+        self.paid_reward = paid_reward
+        self.upcoming_reward = upcoming_reward
+        self.accumulated_reward_per_token_paid = accumulated_reward_per_token_paid
+
+    def as_tuple(self):
+        return (
+            self.paid_reward,
+            self.upcoming_reward,
+            self.accumulated_reward_per_token_paid,
+        )
+
+
+class RewardsState:
+    def __init__(
+        self,
+        end_date=0,
+        updated_at=0,
+        reward_per_second=0,
+        accumulated_reward_per_token=0,
+        rewards=None,
+    ):
+        self.end_date = end_date
+        self.updated_at = updated_at
+        self.reward_per_second = reward_per_second
+        self.accumulated_reward_per_token = accumulated_reward_per_token
+        self.rewards = {} if rewards is None else rewards
+
+    @staticmethod
+    def from_tuple(rewards_state):
+        # accepts the value returned by RewardsUtilsWrapper.rewardsState()
+        (
+            end_date,
+            updated_at,
+            reward_per_second,
+            accumulated_reward_per_token,
+        ) = rewards_state
+        return RewardsState(
+            end_date, updated_at, reward_per_second, accumulated_reward_per_token
+        )
+
+    def as_tuple(self):
+        return (
+            self.end_date,
+            self.updated_at,
+            self.reward_per_second,
+            self.accumulated_reward_per_token,
+        )
+
+    def reward(self, depositor):
+        if depositor not in self.rewards:
+            self.rewards[depositor] = Reward()
+        return self.rewards[depositor]
+
+
+def uint256(value):
+    if value < 0 or value > MAX_UINT256:
+        raise ArithmeticError(f"uint256 out of range: {value}")
+    return value
+
+
+def block_timestamp_or_end_date(state, timestamp):
+    return timestamp if state.end_date > timestamp else state.end_date
+
+
+def reward_per_token(state, total_staked, timestamp):
+    if total_staked == 0:
+        return state.accumulated_reward_per_token
+    time_delta = uint256(
+        block_timestamp_or_end_date(state, timestamp) - state.updated_at
+    )
+    unaccounted_reward_per_token = (
+        uint256(PRECISION * time_delta * state.reward_per_second) // total_staked
+    )
+    return uint256(state.accumulated_reward_per_token + unaccounted_reward_per_token)
+
+
+def update_reward_period(state, total_staked, reward_per_second, end_date, timestamp):
+    if end_date < timestamp:
+        raise ValueError("END_DATE_TOO_LOW")
+    state.accumulated_reward_per_token = reward_per_token(
+        state, total_staked, timestamp
+    )
+    state.end_date = end_date
+    state.updated_at = timestamp
+    state.reward_per_second = reward_per_second
+
+
+def earned_reward(state, total_staked, depositor, staked, timestamp):
+    depositor_reward = state.rewards.get(depositor) or Reward()
+    return _earned(
+        reward_per_token(state, total_staked, timestamp),
+        staked,
+        depositor_reward.upcoming_reward,
+        depositor_reward.accumulated_reward_per_token_paid,
+    )
+
+
+def update_depositor_reward(
+    state, prev_total_staked, depositor, prev_staked, timestamp
+):
+    new_reward_per_token = _update_reward_per_token(state, prev_total_staked, timestamp)
+    depositor_reward = state.reward(depositor)
+    earned = _earned(
+        new_reward_per_token,
+        prev_staked,
+        depositor_reward.upcoming_reward,
+        depositor_reward.accumulated_reward_per_token_paid,
+    )
+    depositor_reward.accumulated_reward_per_token_paid = new_reward_per_token
+    depositor_reward.upcoming_reward = earned
+    return earned
+
+
+def pay_depositor_reward(state, total_staked, depositor, staked, timestamp):
+    paid_reward = update_depositor_reward(
+        state, total_staked, depositor, staked, timestamp
+    )
+    depositor_reward = state.rewards[depositor]
+    depositor_reward.upcoming_reward = 0
+    depositor_reward.paid_reward = uint256(depositor_reward.paid_reward + paid_reward)
+    return paid_reward
+
+
+def earned_rewards(
+    state,
+    total_staked,
+    staked,
+    upcoming_rewards,
+    accumulated_reward_per_token_paid,
+    timestamp,
+):
+    """
+    Batched version of earned_reward over columnar depositor data. The reward per
+    token value is computed once and applied to all depositors in a single pass.
+    Columns may be any equally sized sequences of ints (lists, tuples, numpy
+    object arrays). Returns a list of earned rewards in the order of input.
+    """
+    if (
+        not len(staked)
+        == len(upcoming_rewards)
+        == len(accumulated_reward_per_token_paid)
+    ):
+        raise ValueError("Columns must have equal length")
+    current_reward_per_token = reward_per_token(state, total_staked, timestamp)
+    return [
+        _earned(current_reward_per_token, s, upcoming, paid)
+        for s, upcoming, paid in zip(
+            staked, upcoming_rewards, accumulated_reward_per_token_paid
+        )
+    ]
+
+
+def _earned(current_reward_per_token, staked, upcoming_reward, reward_per_token_paid):
+    if reward_per_token_paid > current_reward_per_token:
+        raise ArithmeticError("uint256 underflow")
+    unpaid = staked * (current_reward_per_token - reward_per_token_paid)
+    return uint256(upcoming_reward + uint256(unpaid) // PRECISION)
+
+
+def _update_reward_per_token(state, total_staked, timestamp):
+    new_reward_per_token = reward_per_token(state, total_staked, timestamp)
+    state.accumulated_reward_per_token = new_reward_per_token
+    state.updated_at = block_timestamp_or_end_date(state, timestamp)
+    return new_reward_per_token
+
+
+def notify_reward_amount(state, reward, rewards_duration, total_staked, timestamp):
+    # mirrors AaveAStETHIncentivesController.notifyRewardAmount()
+    if timestamp >= state.end_date:
+        reward_per_second = reward // rewards_duration
+    else:
+        leftover = uint256((state.end_date - timestamp) * state.reward_per_second)
+        reward_per_second = uint256(reward + leftover) // rewards_duration
+    update_reward_period(
+        state, total_staked, reward_per_second, timestamp + rewards_duration, timestamp
+    )
+    return reward_per_second
@@ -0,0 +1,71 @@
+from brownie import web3
+
+DEFAULT_CHUNK_SIZE = 1_000
+
+# order of the per-depositor columns returned by depositorsRewardsInfo()
+DEPOSITOR_COLUMNS = (
+    "earned",
+    "staked",
+    "paid_reward",
+    "upcoming_reward",
+    "accumulated_reward_per_token_paid",
+)
+# offset and length words precede the items of the ABI encoded dynamic array
+ARRAY_HEADER_SIZE = 64
+WORD_SIZE = 32
+
+
+def depositors_rewards_info(
+    incentives_controller,
+    depositors,
+    block_identifier="latest",
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """
+    Returns rewards data of the depositors as columns: dict with period_finish and
+    reward_per_second values and a list of values for each of DEPOSITOR_COLUMNS
+    in the order of depositors. Depositors are requested in chunks of chunk_size,
+    all chunks are read at the same block
+    """
+    if block_identifier == "latest":
+        block_identifier = web3.eth.block_number
+    info = {column: [] for column in DEPOSITOR_COLUMNS}
+    info["period_finish"] = info["reward_per_second"] = None
+    # empty depositors list still returns period finish and reward per second
+    for start in range(0, max(len(depositors), 1), chunk_size):
+        chunk = depositors[start : start + chunk_size]
+        data = web3.eth.call(
+            {
+                "to": incentives_controller.address,
+                "data": incentives_controller.depositorsRewardsInfo.encode_input(chunk),
+            },
+            block_identifier,
+        )
+        chunk_info = decode_depositors_rewards_info(data, len(chunk))
+        info["period_finish"] = chunk_info["period_finish"]
+        info["reward_per_second"] = chunk_info["reward_per_second"]
+        for column in DEPOSITOR_COLUMNS:
+            info[column].extend(chunk_info[column])
+    return info
+
+
+def decode_depositors_rewards_info(data, depositors_count):
+    """Decodes the raw result of depositorsRewardsInfo() into columns"""
+    data = bytes(data)
+    expected_size = ARRAY_HEADER_SIZE + WORD_SIZE * (
+        2 + len(DEPOSITOR_COLUMNS) * depositors_count
+    )
+    if len(data) != expected_size:
+        raise ValueError(
+            f"Unexpected size of depositorsRewardsInfo() result: {len(data)} bytes, "
+            f"expected {expected_size} bytes for {depositors_count} depositors"
+        )
+    words = [
+        int.from_bytes(data[offset : offset + WORD_SIZE], "big")
+        for offset in range(ARRAY_HEADER_SIZE, len(data), WORD_SIZE)
+    ]
+    info = {"period_finish": words[0], "reward_per_second": words[1]}
+    for index, column in enumerate(DEPOSITOR_COLUMNS):
+        start = 2 + index * depositors_count
+        info[column] = words[start : start + depositors_count]
+    return info
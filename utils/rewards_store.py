@@ -0,0 +1,258 @@
+"""
+Columnar on-disk format of the depositors' rewards data. The store is a directory:
+    meta.json - number of depositors, names of the columns and arbitrary metadata
+    addresses.bin - 20 bytes addresses of the depositors
+    address_index.bin - addresses sorted in ascending order, each followed by
+        the 8 bytes big-endian position of the depositor in the store
+    <column>.bin - 32 bytes big-endian uint256 value per depositor
+Values of the i-th depositor are placed at the i-th position of every file.
+RewardsStore memory-maps the files, so only the requested rows are read from disk.
+
+Every write creates the new version directory <name>.<pid>.<time> next to the
+store, and the store path is the symlink to the current version. The symlink is
+swapped with the single os.replace, so the readers see either the previous or the
+new version of the store, never the mix of them. Readers map all files of the
+version on open, so the removal of the previous version after the swap doesn't
+affect the opened views.
+"""
+import json
+import mmap
+import os
+import shutil
+import time
+from pathlib import Path
+from eth_utils import to_canonical_address, to_checksum_address
+
+ADDRESS_SIZE = 20
+WORD_SIZE = 32
+POSITION_SIZE = 8
+INDEX_ENTRY_SIZE = ADDRESS_SIZE + POSITION_SIZE
+# number of rows encoded or decoded at once by the writer and the aggregates
+CHUNK_SIZE = 65_536
+
+DEPOSITOR_COLUMNS = (
+    "balance",
+    "paid_reward",
+    "upcoming_reward",
+    "accumulated_reward_per_token_paid",
+)
+META_FILE_NAME = "meta.json"
+ADDRESSES_FILE_NAME = "addresses.bin"
+ADDRESS_INDEX_FILE_NAME = "address_index.bin"
+
+
+def write_store(path, addresses, columns, meta=None):
+    """
+    Writes the addresses and the dict of equally sized uint256 columns into the
+    new version of the store at the given path and publishes it
+    """
+    path = Path(path)
+    for name, values in columns.items():
+        if len(values) != len(addresses):
+            raise ValueError(f"Column {name} has {len(values)} values")
+    canonical_addresses = [to_canonical_address(address) for address in addresses]
+    if len(set(canonical_addresses)) != len(canonical_addresses):
+        raise ValueError("Addresses must be unique")
+
+    tmp_path = new_version_path(path)
+    (tmp_path / ADDRESSES_FILE_NAME).write_bytes(b"".join(canonical_addresses))
+    (tmp_path / ADDRESS_INDEX_FILE_NAME).write_bytes(
+        b"".join(
+            address + position.to_bytes(POSITION_SIZE, "big")
+            for address, position in sorted(
+                zip(canonical_addresses, range(len(canonical_addresses)))
+            )
+        )
+    )
+    for name, values in columns.items():
+        with open(tmp_path / f"{name}.bin", "wb") as f:
+            for start in range(0, len(values), CHUNK_SIZE):
+                f.write(
+                    b"".join(
+                        value.to_bytes(WORD_SIZE, "big")
+                        for value in values[start : start + CHUNK_SIZE]
+                    )
+                )
+    with open(tmp_path / META_FILE_NAME, "w") as f:
+        json.dump(
+            {"count": len(addresses), "columns": list(columns), "meta": meta or {}}, f
+        )
+
+    publish_version(path, tmp_path)
+
+
+def new_version_path(path):
+    """Creates the empty directory for the new version of the data published at path"""
+    version_path = path.with_name(f"{path.name}.{os.getpid()}.{time.time_ns()}")
+    version_path.mkdir(parents=True)
+    return version_path
+
+
+def publish_version(path, version_path):
+    """
+    Points the path to the version directory by swapping the symlink with the
+    single os.replace and removes the previous version
+    """
+    link_path = version_path.with_name(f"{version_path.name}.link")
+    os.symlink(version_path.name, link_path)
+    previous_path = path.resolve() if path.is_symlink() else None
+    if previous_path is None and path.exists():
+        # the directory written before the versioning is moved away once
+        previous_path = version_path.with_name(f"{version_path.name}.old")
+        os.replace(path, previous_path)
+    os.replace(link_path, path)
+    if previous_path is not None and previous_path.exists():
+        shutil.rmtree(previous_path)
+
+
+def read_store(path):
+    """Returns the addresses, the dict of columns and the metadata of the store"""
+    with RewardsStore(path) as store:
+        return (
+            store.addresses(),
+            {name: store.column(name) for name in store.columns},
+            store.meta,
+        )
+
+
+def map_files(path):
+    """Returns memory maps of the data files of the version directory by their names"""
+    files = {}
+    for file_path in path.iterdir():
+        if file_path.name == META_FILE_NAME:
+            continue
+        with open(file_path, "rb") as f:
+            # empty files can't be memory-mapped
+            files[file_path.name] = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if os.fstat(f.fileno()).st_size > 0
+                else b""
+            )
+    return files
+
+
+class RewardsStore:
+    """
+    Read-only memory-mapped view of the store. The version is resolved and all
+    its files are mapped on open, so the store published later isn't mixed into
+    the opened view
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        with open(self.path / META_FILE_NAME) as f:
+            info = json.load(f)
+        self.count = info["count"]
+        self.columns = tuple(info["columns"])
+        self.meta = info["meta"]
+        self._files = map_files(self.path)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        for file_map in self._files.values():
+            if isinstance(file_map, mmap.mmap):
+                file_map.close()
+        self._files.clear()
+
+    def address(self, position):
+        self._check_position(position)
+        data = self._file(ADDRESSES_FILE_NAME)
+        offset = position * ADDRESS_SIZE
+        return to_checksum_address(data[offset : offset + ADDRESS_SIZE])
+
+    def addresses(self, start=0, stop=None):
+        start, stop = self._range(start, stop)
+        data = self._file(ADDRESSES_FILE_NAME)[
+            start * ADDRESS_SIZE : stop * ADDRESS_SIZE
+        ]
+        return [
+            to_checksum_address(data[offset : offset + ADDRESS_SIZE])
+            for offset in range(0, len(data), ADDRESS_SIZE)
+        ]
+
+    def position(self, address):
+        """Returns position of the depositor in the store or None when it's missing"""
+        address = to_canonical_address(address)
+        index = self._file(ADDRESS_INDEX_FILE_NAME)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * INDEX_ENTRY_SIZE
+            if index[offset : offset + ADDRESS_SIZE] < address:
+                low = middle + 1
+            else:
+                high = middle
+        offset = low * INDEX_ENTRY_SIZE
+        if low == self.count or index[offset : offset + ADDRESS_SIZE] != address:
+            return None
+        return int.from_bytes(
+            index[offset + ADDRESS_SIZE : offset + INDEX_ENTRY_SIZE], "big"
+        )
+
+    def value(self, name, position):
+        self._check_position(position)
+        data = self._column_file(name)
+        offset = position * WORD_SIZE
+        return int.from_bytes(data[offset : offset + WORD_SIZE], "big")
+
+    def column(self, name, start=0, stop=None):
+        """Returns values of the column for positions in range [start, stop)"""
+        start, stop = self._range(start, stop)
+        data = self._column_file(name)[start * WORD_SIZE : stop * WORD_SIZE]
+        return [
+            int.from_bytes(data[offset : offset + WORD_SIZE], "big")
+            for offset in range(0, len(data), WORD_SIZE)
+        ]
+
+    def iter_column(self, name, start=0, stop=None, chunk_size=CHUNK_SIZE):
+        """Yields values of the column reading at most chunk_size rows at once"""
+        start, stop = self._range(start, stop)
+        for chunk_start in range(start, stop, chunk_size):
+            yield from self.column(
+                name, chunk_start, min(chunk_start + chunk_size, stop)
+            )
+
+    def row(self, address):
+        """Returns dict with values of all columns of the depositor"""
+        position = self.position(address)
+        if position is None:
+            raise KeyError(address)
+        return {name: self.value(name, position) for name in self.columns}
+
+    def sum(self, name, start=0, stop=None):
+        return sum(self.iter_column(name, start, stop))
+
+    def min(self, name, start=0, stop=None):
+        return min(self.iter_column(name, start, stop), default=None)
+
+    def max(self, name, start=0, stop=None):
+        return max(self.iter_column(name, start, stop), default=None)
+
+    def count_nonzero(self, name, start=0, stop=None):
+        return sum(1 for value in self.iter_column(name, start, stop) if value)
+
+    def _column_file(self, name):
+        if name not in self.columns:
+            raise KeyError(f"Unknown column {name}")
+        return self._file(f"{name}.bin")
+
+    def _file(self, file_name):
+        return self._files[file_name]
+
+    def _range(self, start, stop):
+        stop = self.count if stop is None else min(stop, self.count)
+        if start < 0 or start > stop:
+            raise IndexError(f"Invalid range [{start}, {stop})")
+        return start, stop
+
+    def _check_position(self, position):
+        if not 0 <= position < self.count:
+            raise IndexError(f"Position {position} is out of range")
@@ -0,0 +1,310 @@
+"""
+Discrete-event simulator of the incentives controller built on utils.rewards.
+
+Events are tuples (timestamp, kind, depositor, recipient, amount) ordered by
+timestamp. Depositors are identified by indices in range(depositors_count) and
+their rewards are kept in flat lists instead of the utils.rewards.Reward objects.
+The arithmetic of the hot path (handleAction) is the same as in utils.rewards,
+the rest of the actions are delegated to utils.rewards directly.
+"""
+import heapq
+import random
+from utils import rewards, rewards_store
+
+DEPOSIT = 0
+WITHDRAW = 1
+TRANSFER = 2
+CLAIM = 3
+NOTIFY_REWARD_AMOUNT = 4
+UPDATE_PERIOD_FINISH = 5
+SET_REWARDS_DURATION = 6
+
+PRECISION = rewards.PRECISION
+
+
+class RewardsSimulator:
+    """
+    Replays the actions of depositors and the controller's owner and tracks where
+    the reward tokens go. The funded tokens are split into:
+        - paid to depositors and owed to them (earned but not claimed yet)
+        - rounding dust: emitted to depositors but lost in the integer divisions
+        - emitted while nothing was staked: never accrued to anybody
+        - division remainder of notifyRewardAmount(): never scheduled for emission
+        - pending: scheduled for emission till the end of the current period
+        - cancelled: scheduled emission removed by updatePeriodFinish(). Negative
+            when the period was extended without funding
+    """
+
+    def __init__(self, depositors_count, rewards_duration):
+        self.state = rewards.RewardsState()
+        self.rewards_duration = rewards_duration
+        self.total_staked = 0
+        self.timestamp = 0
+        self.balances = [0] * depositors_count
+        self.upcoming_rewards = [0] * depositors_count
+        self.accumulated_reward_per_token_paid = [0] * depositors_count
+        self.paid_rewards = [0] * depositors_count
+
+        self.funded = 0
+        self.paid = 0
+        self.emitted_to_stakers = 0
+        self.emitted_while_unstaked = 0
+        self.division_remainder = 0
+        self.cancelled = 0
+        self.events_count = 0
+        self.handle_actions_count = 0
+
+    def run(self, events):
+        handlers = {
+            DEPOSIT: self.deposit,
+            WITHDRAW: self.withdraw,
+            TRANSFER: self.transfer,
+            CLAIM: self.claim,
+            NOTIFY_REWARD_AMOUNT: self.notify_reward_amount,
+            UPDATE_PERIOD_FINISH: self.update_period_finish,
+            SET_REWARDS_DURATION: self.set_rewards_duration,
+        }
+        for timestamp, kind, depositor, recipient, amount in events:
+            if timestamp < self.timestamp:
+                raise ValueError(
+                    f"Event at {timestamp} is earlier than {self.timestamp}"
+                )
+            self.timestamp = timestamp
+            handlers[kind](depositor, recipient, amount)
+            self.events_count += 1
+        return self
+
+    def deposit(self, depositor, _recipient, amount):
+        self._handle_action(depositor)
+        self.balances[depositor] += amount
+        self.total_staked += amount
+
+    def withdraw(self, depositor, _recipient, amount):
+        if amount > self.balances[depositor]:
+            raise ArithmeticError("Withdrawal amount exceeds balance")
+        self._handle_action(depositor)
+        self.balances[depositor] -= amount
+        self.total_staked -= amount
+
+    def transfer(self, sender, recipient, amount):
+        if amount > self.balances[sender]:
+            raise ArithmeticError("Transfer amount exceeds balance")
+        self._handle_action(sender)
+        if recipient != sender:
+            self._handle_action(recipient)
+        self.balances[sender] -= amount
+        self.balances[recipient] += amount
+
+    def claim(self, depositor, _recipient=None, _amount=None):
+        reward = self._handle_action(depositor)
+        if reward > self.funded - self.paid:
+            raise ArithmeticError("Reward exceeds balance of the incentives controller")
+        self.upcoming_rewards[depositor] = 0
+        self.paid_rewards[depositor] += reward
+        self.paid += reward
+        return reward
+
+    def notify_reward_amount(self, _depositor, _recipient, reward):
+        self._accrue_emission()
+        pending_before = self._pending()
+        reward_per_second = rewards.notify_reward_amount(
+            self.state,
+            reward,
+            self.rewards_duration,
+            self.total_staked,
+            self.timestamp,
+        )
+        self.funded += reward
+        self.division_remainder += (
+            reward + pending_before - reward_per_second * self.rewards_duration
+        )
+
+    def update_period_finish(self, _depositor, _recipient, end_date):
+        self._accrue_emission()
+        pending_before = self._pending()
+        rewards.update_reward_period(
+            self.state,
+            self.total_staked,
+            self.state.reward_per_second,
+            end_date,
+            self.timestamp,
+        )
+        self.cancelled += pending_before - self._pending()
+
+    def set_rewards_duration(self, _depositor, _recipient, rewards_duration):
+        if self.timestamp <= self.state.end_date:
+            raise ValueError("RewardsPeriodNotFinishedError")
+        self.rewards_duration = rewards_duration
+
+    def earned(self, depositor):
+        return rewards._earned(
+            rewards.reward_per_token(self.state, self.total_staked, self.timestamp),
+            self.balances[depositor],
+            self.upcoming_rewards[depositor],
+            self.accumulated_reward_per_token_paid[depositor],
+        )
+
+    def report(self):
+        """Returns rewards of the depositors and the split of the funded tokens"""
+        earned = rewards.earned_rewards(
+            self.state,
+            self.total_staked,
+            self.balances,
+            self.upcoming_rewards,
+            self.accumulated_reward_per_token_paid,
+            self.timestamp,
+        )
+        owed = sum(earned)
+        # emission since the last update isn't accrued into the state yet
+        emitted_to_stakers, emitted_while_unstaked = (
+            self.emitted_to_stakers,
+            self.emitted_while_unstaked,
+        )
+        unaccrued_emission = self._unaccrued_emission()
+        if self.total_staked == 0:
+            emitted_while_unstaked += unaccrued_emission
+        else:
+            emitted_to_stakers += unaccrued_emission
+        return {
+            "timestamp": self.timestamp,
+            "events_count": self.events_count,
+            "handle_actions_count": self.handle_actions_count,
+            "paid_rewards": list(self.paid_rewards),
+            "earned_rewards": earned,
+            "funded": self.funded,
+            "paid": self.paid,
+            "owed": owed,
+            "undistributed": self.funded - self.paid - owed,
+            "rounding_dust": emitted_to_stakers - self.paid - owed,
+            "emitted_while_unstaked": emitted_while_unstaked,
+            "division_remainder": self.division_remainder,
+            "pending": self._pending(),
+            "cancelled": self.cancelled,
+        }
+
+    def write_store(self, path, addresses=None):
+        """
+        Writes the state of the depositors into the columnar store. Unless the
+        addresses are passed, the depositor with index i gets the address i + 1
+        """
+        if addresses is None:
+            addresses = [f"0x{i + 1:040x}" for i in range(len(self.balances))]
+        columns = {
+            "balance": self.balances,
+            "paid_reward": self.paid_rewards,
+            "upcoming_reward": self.upcoming_rewards,
+            "accumulated_reward_per_token_paid": self.accumulated_reward_per_token_paid,
+        }
+        meta = {
+            "timestamp": self.timestamp,
+            "rewards_duration": self.rewards_duration,
+            "total_staked": self.total_staked,
+            "state": list(self.state.as_tuple()),
+        }
+        rewards_store.write_store(path, addresses, columns, meta)
+
+    def _handle_action(self, depositor):
+        # inlined rewards.update_depositor_reward() over the flat depositors state
+        state = self.state
+        timestamp = self.timestamp
+        total_staked = self.total_staked
+        updated_at = timestamp if state.end_date > timestamp else state.end_date
+        time_delta = updated_at - state.updated_at
+        if time_delta < 0:
+            raise ArithmeticError("uint256 underflow")
+        emission = time_delta * state.reward_per_second
+        if total_staked == 0:
+            self.emitted_while_unstaked += emission
+            reward_per_token = state.accumulated_reward_per_token
+        else:
+            self.emitted_to_stakers += emission
+            reward_per_token = (
+                state.accumulated_reward_per_token
+                + PRECISION * emission // total_staked
+            )
+        state.accumulated_reward_per_token = reward_per_token
+        state.updated_at = updated_at
+
+        reward_per_token_paid = self.accumulated_reward_per_token_paid[depositor]
+        if reward_per_token_paid > reward_per_token:
+            raise ArithmeticError("uint256 underflow")
+        earned = (
+            self.upcoming_rewards[depositor]
+            + self.balances[depositor]
+            * (reward_per_token - reward_per_token_paid)
+            // PRECISION
+        )
+        self.accumulated_reward_per_token_paid[depositor] = reward_per_token
+        self.upcoming_rewards[depositor] = earned
+        self.handle_actions_count += 1
+        return earned
+
+    def _accrue_emission(self):
+        # updateRewardPeriod() accrues the emission since the last update in the same way
+        emission = self._unaccrued_emission()
+        if self.total_staked == 0:
+            self.emitted_while_unstaked += emission
+        else:
+            self.emitted_to_stakers += emission
+
+    def _unaccrued_emission(self):
+        time_delta = (
+            rewards.block_timestamp_or_end_date(self.state, self.timestamp)
+            - self.state.updated_at
+        )
+        return max(time_delta, 0) * self.state.reward_per_second
+
+    def _pending(self):
+        """Emission scheduled from the current timestamp till the end of the period"""
+        time_left = max(self.state.end_date - self.timestamp, 0)
+        return time_left * self.state.reward_per_second
+
+
+def random_activity(
+    depositors_count,
+    start_timestamp,
+    end_timestamp,
+    events_count,
+    max_amount=10 * 10 ** 18,
+    seed=0,
+):
+    """
+    Generates valid random deposits, withdrawals, transfers and claims of the
+    depositors uniformly distributed in time. Yields events ordered by timestamp
+    """
+    rng = random.Random(seed)
+    balances = [0] * depositors_count
+    timestamps = sorted(
+        rng.randrange(start_timestamp, end_timestamp) for _ in range(events_count)
+    )
+    for timestamp in timestamps:
+        depositor = rng.randrange(depositors_count)
+        balance = balances[depositor]
+        kind = rng.random()
+        if balance == 0 or kind < 0.4:
+            amount = rng.randrange(1, max_amount)
+            balances[depositor] += amount
+            yield (timestamp, DEPOSIT, depositor, depositor, amount)
+        elif kind < 0.6:
+            amount = rng.randrange(1, balance + 1)
+            balances[depositor] -= amount
+            yield (timestamp, WITHDRAW, depositor, depositor, amount)
+        elif kind < 0.8:
+            recipient = rng.randrange(depositors_count)
+            amount = rng.randrange(1, balance + 1)
+            balances[depositor] -= amount
+            balances[recipient] += amount
+            yield (timestamp, TRANSFER, depositor, recipient, amount)
+        else:
+            yield (timestamp, CLAIM, depositor, depositor, 0)
+
+
+def top_ups(start_timestamp, end_timestamp, interval, amount):
+    """Yields notifyRewardAmount() calls made every interval seconds"""
+    for timestamp in range(start_timestamp, end_timestamp, interval):
+        yield (timestamp, NOTIFY_REWARD_AMOUNT, 0, 0, amount)
+
+
+def merge_events(*events):
+    """Merges the ordered streams of events into a single ordered stream"""
+    return heapq.merge(*events, key=lambda event: event[0])
@@ -0,0 +1,226 @@
+"""
+Planner of the reward top-ups made via RewardsManager.start_next_rewards_period().
+
+notifyRewardAmount() sets the reward per second to (reward + leftover) / rewardsDuration,
+where leftover is the not yet distributed reward of the current period. The remainder of
+the division is never distributed and every top-up with an arbitrary amount changes the
+rate of the emission. The planner sweeps the candidate schedules and rates, replays the
+top-ups of each candidate with utils.rewards and picks the plan which loses the least
+tokens and changes the rate the least.
+
+Note: RewardsManager starts the next period only when the current one is finished, so
+the top-ups inside the active period require the Agent to be the rewards distributor.
+"""
+import copy
+from typing import NamedTuple, Optional, Tuple
+from utils import rewards
+from utils.evm_script import encode_call_script
+from utils.lido import AGENT_ADDRESS, agent_forward
+
+# the rate jump of 1 token per second costs as much as the loss of 1 hour of its emission
+DEFAULT_RATE_JUMP_COST = 60 * 60
+
+
+class TopUp(NamedTuple):
+    timestamp: int
+    amount: int
+
+
+class Plan(NamedTuple):
+    top_ups: Tuple[TopUp, ...]
+    # end date set by updatePeriodFinish() after the last top-up
+    period_finish: Optional[int]
+    rewards_per_second: Tuple[int, ...]
+    spent: int
+    # rewards never distributed because of the truncating division
+    dust: int
+    # emission removed by updatePeriodFinish(). Negative value means unfunded extension
+    cancelled: int
+    # sum of the rate changes including drops to zero between the periods
+    rate_jumps: int
+    max_rate_jump: int
+
+    def score(self, budget, rate_jump_cost=DEFAULT_RATE_JUMP_COST):
+        """Tokens lost or left unspent plus the cost of the rate jumps, the lower the better"""
+        return (
+            budget
+            - self.spent
+            + self.dust
+            + self.cancelled
+            + self.rate_jumps * rate_jump_cost
+        )
+
+
+def read_rewards_state(incentives_controller, block_identifier="latest"):
+    """Returns the rewards state and the rewards duration used by notifyRewardAmount()"""
+    state = rewards.RewardsState(
+        end_date=incentives_controller.periodFinish(block_identifier=block_identifier),
+        reward_per_second=incentives_controller.rewardPerSecond(
+            block_identifier=block_identifier
+        ),
+    )
+    return state, incentives_controller.rewardsDuration(
+        block_identifier=block_identifier
+    )
+
+
+def simulate_top_ups(state, rewards_duration, top_ups, period_finish=None):
+    """Replays the top-ups on the copy of the state and returns the resulting Plan"""
+    state = copy.deepcopy(state)
+    rewards_per_second = []
+    dust = rate_jumps = max_rate_jump = 0
+    for timestamp, amount in top_ups:
+        # the rate drops to zero when the previous period is finished
+        rate_before = state.reward_per_second if timestamp < state.end_date else 0
+        if rate_before != state.reward_per_second:
+            jump = state.reward_per_second
+            rate_jumps += jump
+            max_rate_jump = max(max_rate_jump, jump)
+        leftover = _leftover(state, timestamp)
+        rate = rewards.notify_reward_amount(
+            state, amount, rewards_duration, 0, timestamp
+        )
+        dust += amount + leftover - rate * rewards_duration
+        jump = abs(rate - rate_before)
+        rate_jumps += jump
+        max_rate_jump = max(max_rate_jump, jump)
+        rewards_per_second.append(rate)
+
+    cancelled = 0
+    if period_finish is not None:
+        if not top_ups:
+            raise ValueError("updatePeriodFinish() is executed with the last top-up")
+        cancelled = (state.end_date - period_finish) * state.reward_per_second
+        rewards.update_reward_period(
+            state, 0, state.reward_per_second, period_finish, top_ups[-1][0]
+        )
+    return Plan(
+        top_ups=tuple(TopUp(*top_up) for top_up in top_ups),
+        period_finish=period_finish,
+        rewards_per_second=tuple(rewards_per_second),
+        spent=sum(amount for _, amount in top_ups),
+        dust=dust,
+        cancelled=cancelled,
+        rate_jumps=rate_jumps,
+        max_rate_jump=max_rate_jump,
+    )
+
+
+def constant_rate_top_ups(state, rewards_duration, timestamps, reward_per_second):
+    """
+    Returns top-ups which set the given rate at each of the timestamps. Every
+    amount tops up the leftover to reward_per_second * rewards_duration exactly,
+    so the division in notifyRewardAmount() leaves no remainder
+    """
+    state = copy.deepcopy(state)
+    top_ups = []
+    for timestamp in timestamps:
+        amount = max(
+            reward_per_second * rewards_duration - _leftover(state, timestamp), 0
+        )
+        rewards.notify_reward_amount(state, amount, rewards_duration, 0, timestamp)
+        top_ups.append(TopUp(timestamp, amount))
+    return top_ups
+
+
+def max_constant_rate(state, rewards_duration, timestamps, budget):
+    """Returns the max rate which constant_rate_top_ups() can set within the budget"""
+    low, high = 0, (budget + _leftover(state, timestamps[0])) // rewards_duration + 1
+    while high - low > 1:
+        middle = (low + high) // 2
+        top_ups = constant_rate_top_ups(state, rewards_duration, timestamps, middle)
+        if sum(amount for _, amount in top_ups) <= budget:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def candidate_plans(state, rewards_duration, budget, schedules, period_finish=None):
+    """
+    Sweeps the candidate schedules (sequences of the top-up timestamps). For each
+    schedule evaluates the top-ups with the max affordable constant rate, with the
+    current rate when it's affordable and the equal split of the budget.
+    """
+    plans = []
+    for timestamps in schedules:
+        timestamps = sorted(timestamps)
+        rates = {max_constant_rate(state, rewards_duration, timestamps, budget)}
+        if _leftover(state, timestamps[0]) > 0:
+            rates.add(state.reward_per_second)
+        candidates = [
+            constant_rate_top_ups(state, rewards_duration, timestamps, rate)
+            for rate in rates
+        ]
+        candidates.append(
+            [TopUp(timestamp, budget // len(timestamps)) for timestamp in timestamps]
+        )
+        for top_ups in candidates:
+            plan = simulate_top_ups(state, rewards_duration, top_ups, period_finish)
+            if plan.spent <= budget and plan.cancelled >= 0:
+                plans.append(plan)
+    return plans
+
+
+def plan_top_ups(
+    state,
+    rewards_duration,
+    budget,
+    schedules,
+    period_finish=None,
+    rate_jump_cost=DEFAULT_RATE_JUMP_COST,
+):
+    """Returns the candidate plan with the lowest score"""
+    plans = candidate_plans(state, rewards_duration, budget, schedules, period_finish)
+    if not plans:
+        raise ValueError("No plan fits into the budget")
+    return min(plans, key=lambda plan: plan.score(budget, rate_jump_cost))
+
+
+def top_up_evm_script(
+    top_up,
+    ldo,
+    incentives_controller,
+    rewards_manager=None,
+    period_finish=None,
+):
+    """
+    Returns EVM script of the vote which makes the top-up from the Agent. When the
+    rewards manager is passed, the amount is transferred to it and the next rewards
+    period is started by the manager. Otherwise, the Agent must be the rewards
+    distributor of the incentives controller and calls notifyRewardAmount() itself.
+    When period_finish is passed, the end date of the period is updated after the top-up
+    """
+    if rewards_manager is not None:
+        calls = [
+            (ldo.address, ldo.transfer.encode_input(rewards_manager, top_up.amount)),
+            (
+                rewards_manager.address,
+                rewards_manager.start_next_rewards_period.encode_input(),
+            ),
+        ]
+    else:
+        calls = [
+            (
+                ldo.address,
+                ldo.approve.encode_input(incentives_controller, top_up.amount),
+            ),
+            (
+                incentives_controller.address,
+                incentives_controller.notifyRewardAmount.encode_input(
+                    top_up.amount, AGENT_ADDRESS
+                ),
+            ),
+        ]
+    if period_finish is not None:
+        calls.append(
+            (
+                incentives_controller.address,
+                incentives_controller.updatePeriodFinish.encode_input(period_finish),
+            )
+        )
+    return encode_call_script([agent_forward(calls)])
+
+
+def _leftover(state, timestamp):
+    return max(state.end_date - timestamp, 0) * state.reward_per_second
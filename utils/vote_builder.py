@@ -0,0 +1,179 @@
+"""
+Builder of the Aragon votes which execute many operations on the incentives
+controllers from the Agent. The actions are dry-run on the snapshot of the chain
+to estimate the gas of their execution and are split across several votes when
+the execution of a single vote doesn't fit into the block gas limit.
+
+Note: build() and create_votes() work only on the fork of the mainnet. The dry
+runs revert the snapshots of the chain and impersonate the Voting and the Agent
+of the DAO to pass the votes.
+"""
+from typing import List, NamedTuple, Tuple
+from brownie import accounts, interface, web3
+from utils import lido
+from utils.deployment import ChainSnapshot
+from utils.evm_script import encode_call_script
+
+# share of the block gas limit available for the execution of the vote
+DEFAULT_GAS_LIMIT_RATIO = 0.8
+
+
+class Action(NamedTuple):
+    target: str
+    calldata: str
+    description: str
+
+
+class Vote(NamedTuple):
+    description: str
+    evm_script: str
+    actions: Tuple[Action, ...]
+    # gas used by executeVote() in the dry run
+    gas_used: int
+
+
+class VoteBuilder:
+    def __init__(self, description, gas_limit=None):
+        self.description = description
+        self.gas_limit = gas_limit
+        self.actions: List[Action] = []
+
+    def add(self, contract, method, *args, description=None):
+        """Adds the call of the contract's method executed by the Agent"""
+        self.actions.append(
+            Action(
+                contract.address,
+                getattr(contract, method).encode_input(*args),
+                description or f"{method}{args} on {contract.address}",
+            )
+        )
+        return self
+
+    def set_rewards_duration(self, incentives_controller, rewards_duration):
+        return self.add(incentives_controller, "setRewardsDuration", rewards_duration)
+
+    def set_rewards_distributor(self, incentives_controller, rewards_distributor):
+        return self.add(
+            incentives_controller, "setRewardsDistributor", rewards_distributor
+        )
+
+    def update_period_finish(self, incentives_controller, end_date):
+        return self.add(incentives_controller, "updatePeriodFinish", end_date)
+
+    def recover_erc20(self, incentives_controller, token, amount):
+        return self.add(incentives_controller, "recoverERC20", token, amount)
+
+    def vote_gas_limit(self):
+        if self.gas_limit is not None:
+            return self.gas_limit
+        return int(web3.eth.get_block("latest")["gasLimit"] * DEFAULT_GAS_LIMIT_RATIO)
+
+    def estimate_actions_gas(self):
+        """
+        Executes the actions one by one via Agent's forward() on the snapshot of the
+        chain and returns the gas used by each of them. The chain is reverted after
+        """
+        agent = interface.Agent(lido.AGENT_ADDRESS)
+        voting = accounts.at(lido.VOTING_ADDRESS, force=True)
+        snapshot = ChainSnapshot()
+        try:
+            forward_gas = agent.forward(
+                encode_call_script([]), {"from": voting}
+            ).gas_used
+            return [
+                agent.forward(
+                    encode_call_script([action[:2]]), {"from": voting}
+                ).gas_used
+                - forward_gas
+                for action in self.actions
+            ]
+        finally:
+            snapshot.revert()
+
+    def split(self, actions_gas, gas_limit):
+        """Greedily packs the consecutive actions into groups within the gas limit"""
+        groups, group, group_gas = [], [], 0
+        for action, gas in zip(self.actions, actions_gas):
+            if gas > gas_limit:
+                raise ValueError(f"{action.description} uses {gas} gas alone")
+            if group and group_gas + gas > gas_limit:
+                groups.append(group)
+                group, group_gas = [], 0
+            group.append(action)
+            group_gas += gas
+        if group:
+            groups.append(group)
+        return groups
+
+    def build(self, tx_params):
+        """
+        Splits the actions across the votes and dry-runs the creation and execution
+        of every vote on the snapshot of the chain. The groups of actions whose vote
+        doesn't fit into the gas limit are split in halves until they do. Works only
+        on the fork of the mainnet
+        """
+        gas_limit = self.vote_gas_limit()
+        groups = self.split(self.estimate_actions_gas(), gas_limit)
+        while True:
+            gas_used = self.dry_run(groups, tx_params)
+            if all(gas <= gas_limit for gas in gas_used):
+                break
+            next_groups = []
+            for group, gas in zip(groups, gas_used):
+                if gas > gas_limit and len(group) == 1:
+                    raise ValueError(f"{group[0].description} uses {gas} gas alone")
+                if gas > gas_limit:
+                    middle = len(group) // 2
+                    next_groups.extend([group[:middle], group[middle:]])
+                else:
+                    next_groups.append(group)
+            groups = next_groups
+
+        return [
+            Vote(
+                self._vote_description(i, len(groups)),
+                _evm_script(group),
+                tuple(group),
+                gas,
+            )
+            for i, (group, gas) in enumerate(zip(groups, gas_used))
+        ]
+
+    def dry_run(self, groups, tx_params):
+        """Returns the gas used by executeVote() of the vote of every group"""
+        snapshot = ChainSnapshot()
+        try:
+            gas_used = []
+            for i, group in enumerate(groups):
+                vote_id, _ = lido.create_voting(
+                    _evm_script(group),
+                    self._vote_description(i, len(groups)),
+                    tx_params,
+                )
+                gas_used.append(lido.execute_voting(vote_id).gas_used)
+            return gas_used
+        finally:
+            snapshot.revert()
+
+    def create_votes(self, tx_params):
+        """
+        Starts the votes of the built actions and returns their ids. The votes are
+        started in the same block, so they must be voted for before the voting time
+        passes, e.g. via lido.execute_votings(). Works only on the fork of the
+        mainnet
+        """
+        return [
+            lido.create_voting(vote.evm_script, vote.description, tx_params)[0]
+            for vote in self.build(tx_params)
+        ]
+
+    def _vote_description(self, index, votes_count):
+        if votes_count == 1:
+            return self.description
+        return f"{self.description} ({index + 1}/{votes_count})"
+
+
+def _evm_script(actions):
+    return encode_call_script(
+        [lido.agent_forward([(action.target, action.calldata) for action in actions])]
+    )